@@ -3,15 +3,22 @@ from __future__ import annotations
 import os
 from typing import Any
 
+import click
 from flask import Flask, request
 
 # Support both package and standalone imports
 try:
+    from .cli import shovo_cli
     from .database import close_db, init_db
     from .routes import bp as main_bp
+    from .upstream import schedule_prewarm
+    from .utils import env_flag
 except ImportError:
+    from cli import shovo_cli
     from database import close_db, init_db
     from routes import bp as main_bp
+    from upstream import schedule_prewarm
+    from utils import env_flag
 
 
 def create_app() -> Flask:
@@ -27,8 +34,9 @@ def create_app() -> Flask:
     # Register teardown to close database connections
     application.teardown_appcontext(close_db)
 
-    # Register blueprints
+    # Register blueprints and `flask shovo ...` commands
     application.register_blueprint(main_bp)
+    application.cli.add_command(shovo_cli)
 
     # Add cache control headers
     @application.after_request
@@ -53,9 +61,16 @@ def create_app() -> Flask:
             response.cache_control.must_revalidate = True
         return response
 
-    # Initialize database on first request
+    # Initialize the database; an up-to-date schema costs one PRAGMA read
     with application.app_context():
-        init_db()
+        pending = init_db(migrate=env_flag("SHOVO_MIGRATE_ON_STARTUP", True))
+    if pending:
+        application.logger.warning("Database schema is %d migration(s) behind; run `flask shovo migrate`.", pending)
+
+    # Open keep-alive connections to upstream APIs before the first search; maintenance
+    # commands run under the `flask` command line never search.
+    if click.get_current_context(silent=True) is None:
+        schedule_prewarm()
 
     return application
 
@@ -0,0 +1,30 @@
+"""Maintenance commands, available as `flask shovo <command>`."""
+from __future__ import annotations
+
+import click
+from flask.cli import AppGroup
+
+# Support both package and standalone imports
+try:
+    from .database import get_db_context, migrate_db, schema_version, schema_version_at_init
+except ImportError:
+    from database import get_db_context, migrate_db, schema_version, schema_version_at_init
+
+shovo_cli = AppGroup("shovo", help="Shovo maintenance commands.")
+
+
+@shovo_cli.command("migrate")
+def migrate_command() -> None:
+    """Apply pending database migrations (run once per deploy, before restarting uWSGI)."""
+    with get_db_context() as conn:
+        applied = migrate_db(conn)
+        after = schema_version(conn)
+    # Loading the app may already have migrated (SHOVO_MIGRATE_ON_STARTUP), so report
+    # against the version found when this process started.
+    before = schema_version_at_init()
+    if before is None:
+        before = after - applied
+    if before < after:
+        click.echo(f"Migrated database from schema version {before} to {after}.")
+    else:
+        click.echo(f"Database is up to date at schema version {after}.")
@@ -1,141 +1,505 @@
 from __future__ import annotations
 
+import json
 import os
+import random
 import sqlite3
+import threading
 import time
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Callable, Generator
 
 from flask import g
 
+# Support both package and standalone imports
+try:
+    from .utils import env_int
+except ImportError:
+    from utils import env_int
+
 APP_ROOT = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(APP_ROOT, "data.sqlite3")
 CACHE_TTL_SECONDS = 60 * 60 * 24  # 24 hours
+SEASON_AIRING_TTL_SECONDS = CACHE_TTL_SECONDS
+NEGATIVE_CACHE_TTL_SECONDS = env_int("SHOVO_NEGATIVE_CACHE_TTL", 60 * 60 * 24 * 7, minimum=0)
+ERROR_RETRY_BASE_SECONDS = env_int("SHOVO_ERROR_RETRY_BASE", 60, minimum=1)
+ERROR_RETRY_MAX_SECONDS = env_int("SHOVO_ERROR_RETRY_MAX", 60 * 60 * 6, minimum=1)
+CACHE_STATUS_OK = "ok"
+CACHE_STATUS_ABSENT = "absent"
+CACHE_STATUS_ERROR = "error"
+REFRESH_JOB_QUEUED = "queued"
+REFRESH_JOB_RUNNING = "running"
+REFRESH_JOB_DONE = "done"
+SQL_IN_BATCH_SIZE = 500
+# Spacing between list positions, so a move can take a free slot between two neighbours.
+POSITION_GAP = 1024
+# Title data shared by every room through the titles table (list rows hold only membership).
+TITLE_COLUMNS = (
+    "title_id",
+    "title",
+    "year",
+    "original_language",
+    "type_label",
+    "image",
+    "rating",
+    "rotten_tomatoes",
+    "runtime_minutes",
+    "total_seasons",
+    "total_episodes",
+    "avg_episode_length",
+)
+SUGGESTION_CACHE_TTL_SECONDS = env_int("SHOVO_SUGGESTION_CACHE_TTL", 60 * 60 * 6, minimum=0)
+TITLE_SUMMARY_TTL_SECONDS = env_int("SHOVO_TITLE_SUMMARY_TTL", 60 * 60 * 24 * 30, minimum=0)
+DB_BUSY_TIMEOUT_MS = env_int("SHOVO_DB_BUSY_TIMEOUT_MS", 5000, minimum=0)
+DB_CACHE_SIZE_KIB = env_int("SHOVO_DB_CACHE_SIZE_KIB", 8192, minimum=0)
+DB_MMAP_SIZE_BYTES = env_int("SHOVO_DB_MMAP_SIZE", 64 * 1024 * 1024, minimum=0)
+DB_POOL_SIZE = env_int("SHOVO_DB_POOL_SIZE", 8, minimum=0)
+
+_pool_lock = threading.Lock()
+_pool: list[sqlite3.Connection] = []
+_pool_key: tuple[int, str] | None = None
+# Connections inherited across a fork; never used or closed in the child, since
+# closing them could release SQLite file locks still held by the parent.
+_inherited: list[sqlite3.Connection] = []
+_pool_stats = {"opened": 0, "reused": 0, "discarded": 0}
+# Schema version each database had when this process first initialized it, before migrating.
+_schema_versions_at_init: dict[str, int] = {}
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a tuned connection; it may move between threads, but is used by one at a time."""
+    conn = sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size = {-int(DB_CACHE_SIZE_KIB)}")
+    conn.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE_BYTES)}")
+    return conn
+
+
+def _acquire_connection() -> sqlite3.Connection:
+    """Take an idle pooled connection, or open one when the pool is empty."""
+    global _pool_key
+    with _pool_lock:
+        key = (os.getpid(), DB_PATH)
+        if _pool_key != key:
+            if _pool_key is not None and _pool_key[0] != key[0]:
+                _inherited.extend(_pool)
+            else:
+                for conn in _pool:
+                    conn.close()
+            _pool.clear()
+            _pool_key = key
+        if _pool:
+            _pool_stats["reused"] += 1
+            return _pool.pop()
+        _pool_stats["opened"] += 1
+    return _connect()
+
+
+def _release_connection(conn: sqlite3.Connection) -> None:
+    """Return a connection to the pool, rolling back whatever its user did not commit."""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        conn.close()
+        with _pool_lock:
+            _pool_stats["discarded"] += 1
+        return
+    with _pool_lock:
+        if _pool_key == (os.getpid(), DB_PATH) and len(_pool) < DB_POOL_SIZE:
+            _pool.append(conn)
+            return
+        _pool_stats["discarded"] += 1
+    conn.close()
+
+
+def db_pool_stats() -> dict[str, int]:
+    """Return connection pool counters for this process."""
+    with _pool_lock:
+        stats = dict(_pool_stats)
+        stats["idle"] = len(_pool)
+    return stats
 
 
 def get_db() -> sqlite3.Connection:
-    """Get database connection from Flask's g object or create new one."""
+    """Get the request's database connection from Flask's g object, taking one from the pool."""
     if "db" not in g:
-        g.db = sqlite3.connect(DB_PATH)
-        g.db.row_factory = sqlite3.Row
+        g.db = _acquire_connection()
     return g.db
 
 
 def close_db(e=None) -> None:
-    """Close database connection stored in g."""
+    """Return the connection stored in g to the pool."""
     db = g.pop("db", None)
     if db is not None:
-        db.close()
+        _release_connection(db)
 
 
 @contextmanager
 def get_db_context() -> Generator[sqlite3.Connection, None, None]:
-    """Context manager for database connections outside of request context."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """Context manager for a pooled connection, usable inside or outside a request.
+
+    Nested contexts get separate connections, so an inner commit never commits the
+    outer block's work. Uncommitted changes are rolled back on exit, as they were when
+    each context opened and closed its own connection.
+    """
+    conn = _acquire_connection()
     try:
         yield conn
     finally:
-        conn.close()
+        _release_connection(conn)
 
 
-def migrate_db(conn: sqlite3.Connection) -> None:
-    """Run database migrations."""
-    conn.executescript(
-        """
-        CREATE TABLE IF NOT EXISTS lists (
-            room TEXT NOT NULL,
-            title_id TEXT NOT NULL,
-            title TEXT NOT NULL,
-            year TEXT,
-            original_language TEXT,
-            type_label TEXT,
-            image TEXT,
-            rating TEXT,
-            rotten_tomatoes TEXT,
-            added_at INTEGER NOT NULL,
-            position INTEGER,
-            PRIMARY KEY (room, title_id)
-        );
+_BASE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS lists (
+        room TEXT NOT NULL,
+        title_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        year TEXT,
+        original_language TEXT,
+        type_label TEXT,
+        image TEXT,
+        rating TEXT,
+        rotten_tomatoes TEXT,
+        added_at INTEGER NOT NULL,
+        position INTEGER,
+        PRIMARY KEY (room, title_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rating_cache (
+        title_id TEXT PRIMARY KEY,
+        rating TEXT,
+        rotten_tomatoes TEXT,
+        cached_at INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'ok',
+        failures INTEGER NOT NULL DEFAULT 0,
+        retry_at INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS metadata_cache (
+        title_id TEXT PRIMARY KEY,
+        runtime_minutes INTEGER,
+        total_seasons INTEGER,
+        total_episodes INTEGER,
+        avg_episode_length INTEGER,
+        original_language TEXT,
+        cached_at INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'ok',
+        failures INTEGER NOT NULL DEFAULT 0,
+        retry_at INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS season_cache (
+        title_id TEXT NOT NULL,
+        season INTEGER NOT NULL,
+        episode_count INTEGER NOT NULL,
+        is_complete INTEGER NOT NULL DEFAULT 0,
+        cached_at INTEGER NOT NULL,
+        PRIMARY KEY (title_id, season)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tmdb_external_ids (
+        media_type TEXT NOT NULL,
+        tmdb_id INTEGER NOT NULL,
+        imdb_id TEXT,
+        cached_at INTEGER NOT NULL,
+        PRIMARY KEY (media_type, tmdb_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS suggestion_cache (
+        query TEXT PRIMARY KEY,
+        items TEXT NOT NULL,
+        cached_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS title_summary_cache (
+        title_id TEXT PRIMARY KEY,
+        title TEXT,
+        year TEXT,
+        type_label TEXT,
+        image TEXT,
+        cached_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trending_snapshot (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        items TEXT NOT NULL,
+        fetched_at INTEGER NOT NULL,
+        revision INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS leases (
+        name TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS upstream_quota (
+        upstream TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        granted INTEGER NOT NULL DEFAULT 0,
+        throttled INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS room_settings (
+        room TEXT PRIMARY KEY,
+        is_private INTEGER NOT NULL DEFAULT 0,
+        password_hash TEXT,
+        created_at INTEGER NOT NULL
+    )
+    """,
+)
 
-        CREATE TABLE IF NOT EXISTS rating_cache (
-            title_id TEXT PRIMARY KEY,
-            rating TEXT,
-            rotten_tomatoes TEXT,
-            cached_at INTEGER NOT NULL
-        );
 
-        CREATE TABLE IF NOT EXISTS metadata_cache (
-            title_id TEXT PRIMARY KEY,
-            runtime_minutes INTEGER,
-            total_seasons INTEGER,
-            total_episodes INTEGER,
-            avg_episode_length INTEGER,
-            original_language TEXT,
-            cached_at INTEGER NOT NULL
-        );
+def _migrate_base_tables(conn: sqlite3.Connection) -> None:
+    """1: Create every table that is missing."""
+    for statement in _BASE_TABLES:
+        conn.execute(statement)
 
-        CREATE TABLE IF NOT EXISTS room_settings (
-            room TEXT PRIMARY KEY,
-            is_private INTEGER NOT NULL DEFAULT 0,
-            password_hash TEXT,
-            created_at INTEGER NOT NULL
-        );
-        """
-    )
+
+def _migrate_list_columns(conn: sqlite3.Connection) -> None:
+    """2: Add the watched, position and detail columns to lists and backfill them."""
     columns = {row["name"] for row in conn.execute("PRAGMA table_info(lists)")}
     if "watched" not in columns:
         conn.execute("ALTER TABLE lists ADD COLUMN watched INTEGER NOT NULL DEFAULT 0")
     conn.execute("UPDATE lists SET watched = 0 WHERE watched IS NULL")
-    columns = {row["name"] for row in conn.execute("PRAGMA table_info(lists)")}
     if "position" not in columns:
         conn.execute("ALTER TABLE lists ADD COLUMN position INTEGER")
         _backfill_positions(conn, force=True)
     else:
         conn.execute("UPDATE lists SET position = NULL WHERE position = 0")
         _backfill_positions(conn)
-    if "rotten_tomatoes" not in columns:
-        conn.execute("ALTER TABLE lists ADD COLUMN rotten_tomatoes TEXT")
-    if "runtime_minutes" not in columns:
-        conn.execute("ALTER TABLE lists ADD COLUMN runtime_minutes INTEGER")
-    if "total_seasons" not in columns:
-        conn.execute("ALTER TABLE lists ADD COLUMN total_seasons INTEGER")
-    if "total_episodes" not in columns:
-        conn.execute("ALTER TABLE lists ADD COLUMN total_episodes INTEGER")
-    if "avg_episode_length" not in columns:
-        conn.execute("ALTER TABLE lists ADD COLUMN avg_episode_length INTEGER")
-    if "original_language" not in columns:
-        conn.execute("ALTER TABLE lists ADD COLUMN original_language TEXT")
+    for column, column_type in (
+        ("rotten_tomatoes", "TEXT"),
+        ("runtime_minutes", "INTEGER"),
+        ("total_seasons", "INTEGER"),
+        ("total_episodes", "INTEGER"),
+        ("avg_episode_length", "INTEGER"),
+        ("original_language", "TEXT"),
+    ):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE lists ADD COLUMN {column} {column_type}")
+
+
+def _migrate_cache_columns(conn: sqlite3.Connection) -> None:
+    """3: Add detail, status and revision columns to the caches."""
     rating_columns = {row["name"] for row in conn.execute("PRAGMA table_info(rating_cache)")}
     if "rotten_tomatoes" not in rating_columns:
         conn.execute("ALTER TABLE rating_cache ADD COLUMN rotten_tomatoes TEXT")
     metadata_columns = {row["name"] for row in conn.execute("PRAGMA table_info(metadata_cache)")}
-    if "runtime_minutes" not in metadata_columns:
-        conn.execute("ALTER TABLE metadata_cache ADD COLUMN runtime_minutes INTEGER")
-    if "total_seasons" not in metadata_columns:
-        conn.execute("ALTER TABLE metadata_cache ADD COLUMN total_seasons INTEGER")
-    if "total_episodes" not in metadata_columns:
-        conn.execute("ALTER TABLE metadata_cache ADD COLUMN total_episodes INTEGER")
-    if "avg_episode_length" not in metadata_columns:
-        conn.execute("ALTER TABLE metadata_cache ADD COLUMN avg_episode_length INTEGER")
-    if "original_language" not in metadata_columns:
-        conn.execute("ALTER TABLE metadata_cache ADD COLUMN original_language TEXT")
-    # Migration: clear plaintext passwords (pre-hashing era)
+    for column, column_type in (
+        ("runtime_minutes", "INTEGER"),
+        ("total_seasons", "INTEGER"),
+        ("total_episodes", "INTEGER"),
+        ("avg_episode_length", "INTEGER"),
+        ("original_language", "TEXT"),
+    ):
+        if column not in metadata_columns:
+            conn.execute(f"ALTER TABLE metadata_cache ADD COLUMN {column} {column_type}")
+    trending_columns = {row["name"] for row in conn.execute("PRAGMA table_info(trending_snapshot)")}
+    if "revision" not in trending_columns:
+        conn.execute("ALTER TABLE trending_snapshot ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+    for table, table_columns in (("rating_cache", rating_columns), ("metadata_cache", metadata_columns)):
+        if "status" not in table_columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN status TEXT NOT NULL DEFAULT 'ok'")
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN retry_at INTEGER NOT NULL DEFAULT 0")
+    if "status" not in metadata_columns:
+        # Failed lookups used to be cached forever as empty rows; make them retryable.
+        conn.execute(
+            """
+            UPDATE metadata_cache SET status = 'error', failures = 1, retry_at = 0
+            WHERE runtime_minutes IS NULL AND total_seasons IS NULL AND total_episodes IS NULL
+                AND avg_episode_length IS NULL AND original_language IS NULL
+            """
+        )
+
+
+def _migrate_plaintext_passwords(conn: sqlite3.Connection) -> None:
+    """4: Clear plaintext passwords (pre-hashing era), making those rooms public."""
     # Detect plaintext passwords: they won't start with recognized hash prefixes
+    plaintext_rows = conn.execute(
+        "SELECT room, password_hash FROM room_settings WHERE password_hash IS NOT NULL AND password_hash != ''"
+    ).fetchall()
+    for row in plaintext_rows:
+        pwd = row["password_hash"]
+        if pwd and not pwd.startswith(("pbkdf2:", "scrypt:", "$2b$")):
+            conn.execute(
+                "UPDATE room_settings SET is_private = 0, password_hash = NULL WHERE room = ?",
+                (row["room"],),
+            )
+
+
+def _migrate_list_page_index(conn: sqlite3.Connection) -> None:
+    """5: Index list pages (including keyset cursors) and the per-status counts."""
+    conn.execute("DROP INDEX IF EXISTS idx_lists_room_order")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lists_room_page ON lists (room, watched, position, added_at, title_id)"
+    )
+
+
+def _migrate_position_gaps(conn: sqlite3.Connection) -> None:
+    """6: Respace positions POSITION_GAP apart so moves find free slots."""
+    for row in conn.execute("SELECT DISTINCT room, watched FROM lists").fetchall():
+        compact_positions(conn, row["room"], row["watched"])
+
+
+def _migrate_titles_table(conn: sqlite3.Connection) -> None:
+    """7: Move per-room copies of title data into one shared titles row per title."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS titles (
+            title_id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            year TEXT,
+            original_language TEXT,
+            type_label TEXT,
+            image TEXT,
+            rating TEXT,
+            rotten_tomatoes TEXT,
+            runtime_minutes INTEGER,
+            total_seasons INTEGER,
+            total_episodes INTEGER,
+            avg_episode_length INTEGER,
+            updated_at INTEGER NOT NULL
+        )
+        """
+    )
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(lists)")}
+    if "title" in columns:
+        # The most recently added copy wins (SQLite takes bare columns from the MAX row).
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO titles ({", ".join(TITLE_COLUMNS)}, updated_at)
+            SELECT {", ".join(TITLE_COLUMNS)}, MAX(added_at) FROM lists GROUP BY title_id
+            """
+        )
+        conn.execute(
+            """
+            UPDATE titles SET (rating, rotten_tomatoes) = (
+                SELECT rating, rotten_tomatoes FROM rating_cache WHERE rating_cache.title_id = titles.title_id
+            )
+            WHERE title_id IN (SELECT title_id FROM rating_cache WHERE status = 'ok')
+            """
+        )
+        conn.execute(
+            """
+            UPDATE titles
+            SET (runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language) = (
+                SELECT runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language
+                FROM metadata_cache WHERE metadata_cache.title_id = titles.title_id
+            )
+            WHERE title_id IN (SELECT title_id FROM metadata_cache WHERE status = 'ok')
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE lists_membership (
+                room TEXT NOT NULL,
+                title_id TEXT NOT NULL,
+                added_at INTEGER NOT NULL,
+                watched INTEGER NOT NULL DEFAULT 0,
+                position INTEGER,
+                PRIMARY KEY (room, title_id)
+            )
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO lists_membership (room, title_id, added_at, watched, position)
+            SELECT room, title_id, added_at, watched, position FROM lists
+            """
+        )
+        conn.execute("DROP TABLE lists")
+        conn.execute("ALTER TABLE lists_membership RENAME TO lists")
+        _migrate_list_page_index(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lists_title ON lists (title_id)")
+
+
+def _migrate_refresh_jobs(conn: sqlite3.Connection) -> None:
+    """8: Keep room refresh jobs and their per-title progress in shared tables."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS refresh_jobs (
+            room TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            user_agent TEXT,
+            total INTEGER NOT NULL DEFAULT 0,
+            processed INTEGER NOT NULL DEFAULT 0,
+            owner TEXT,
+            lease_expires_at REAL NOT NULL DEFAULT 0,
+            created_at INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS refresh_job_titles (
+            room TEXT NOT NULL,
+            title_id TEXT NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (room, title_id)
+        )
+        """
+    )
+
+
+# Numbered schema steps; PRAGMA user_version records how many have run. Append new
+# steps at the end and keep each one idempotent, since databases created before
+# versioning start at 0 with part of the schema already in place.
+MIGRATIONS: tuple[Callable[[sqlite3.Connection], None], ...] = (
+    _migrate_base_tables,
+    _migrate_list_columns,
+    _migrate_cache_columns,
+    _migrate_plaintext_passwords,
+    _migrate_list_page_index,
+    _migrate_position_gaps,
+    _migrate_titles_table,
+    _migrate_refresh_jobs,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Return how many numbered migrations the database has applied."""
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate_db(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations in one transaction and return how many ran.
+
+    An up-to-date database costs a single PRAGMA read. The write lock is taken before
+    re-reading the version, so concurrently starting processes migrate only once.
+    """
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return 0
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        plaintext_rows = conn.execute(
-            "SELECT room, password_hash FROM room_settings WHERE password_hash IS NOT NULL AND password_hash != ''"
-        ).fetchall()
-        for row in plaintext_rows:
-            pwd = row["password_hash"]
-            if pwd and not pwd.startswith(("pbkdf2:", "scrypt:", "$2b$")):
-                conn.execute(
-                    "UPDATE room_settings SET is_private = 0, password_hash = NULL WHERE room = ?",
-                    (row["room"],),
-                )
-    except Exception:
-        # If migration fails, continue - this is not critical
-        pass
+        version = schema_version(conn)
+        for number, step in enumerate(MIGRATIONS, start=1):
+            if number > version:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return max(SCHEMA_VERSION - version, 0)
 
 
 def _backfill_positions(conn: sqlite3.Connection, force: bool = False) -> None:
@@ -150,7 +514,7 @@ def _backfill_positions(conn: sqlite3.Connection, force: bool = False) -> None:
             for index, row in enumerate(rows, start=1):
                 conn.execute(
                     "UPDATE lists SET position = ? WHERE room = ? AND title_id = ?",
-                    (index, room, row["title_id"]),
+                    (index * POSITION_GAP, room, row["title_id"]),
                 )
             continue
         max_position = conn.execute(
@@ -164,28 +528,304 @@ def _backfill_positions(conn: sqlite3.Connection, force: bool = False) -> None:
         for offset, row in enumerate(rows, start=1):
             conn.execute(
                 "UPDATE lists SET position = ? WHERE room = ? AND title_id = ?",
-                (max_position + offset, room, row["title_id"]),
+                (max_position + offset * POSITION_GAP, room, row["title_id"]),
             )
 
 
-def init_db() -> None:
-    """Initialize the database with migrations."""
+def compact_positions(conn: sqlite3.Connection, room: str, watched: int) -> None:
+    """Respace a room's positions POSITION_GAP apart, keeping the displayed order.
+
+    Takes the write lock first, so moves made meanwhile are not overwritten with a
+    stale order. The caller commits.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    title_ids = [
+        row["title_id"]
+        for row in conn.execute(
+            """
+            SELECT title_id FROM lists WHERE room = ? AND watched = ?
+            ORDER BY position DESC, added_at DESC, title_id DESC
+            """,
+            (room, watched),
+        )
+    ]
+    total = len(title_ids)
+    conn.executemany(
+        "UPDATE lists SET position = ? WHERE room = ? AND title_id = ?",
+        [((total - index) * POSITION_GAP, room, title_id) for index, title_id in enumerate(title_ids)],
+    )
+
+
+def position_slot(
+    conn: sqlite3.Connection, room: str, watched: int, title_id: str, below: int | None, above: int | None
+) -> tuple[int, int | None] | None:
+    """Find a free position strictly between two neighbour positions for title_id.
+
+    Pass the position of the card that should end up directly below (lower position)
+    and/or directly above (higher position); a missing side is looked up through the
+    room index. Returns (position, gap left around it), with None for an open end, or
+    None when there is no free integer and the room must be compacted first.
+    """
+    if below is not None and above is None:
+        above = conn.execute(
+            "SELECT MIN(position) FROM lists WHERE room = ? AND watched = ? AND position > ? AND title_id != ?",
+            (room, watched, below, title_id),
+        ).fetchone()[0]
+    elif above is not None and below is None:
+        below = conn.execute(
+            "SELECT MAX(position) FROM lists WHERE room = ? AND watched = ? AND position < ? AND title_id != ?",
+            (room, watched, above, title_id),
+        ).fetchone()[0]
+    if above is None and below is None:
+        return POSITION_GAP, None
+    if above is None:
+        return below + POSITION_GAP, None
+    if below is None:
+        return above - POSITION_GAP, None
+    if above - below < 2:
+        return None
+    return (below + above) // 2, above - below
+
+
+def schema_version_at_init() -> int | None:
+    """Return the schema version init_db first found in this process, before migrating."""
+    return _schema_versions_at_init.get(DB_PATH)
+
+
+def init_db(migrate: bool = True) -> int:
+    """Prepare the database and return how many migrations are still pending.
+
+    With migrate=False (SHOVO_MIGRATE_ON_STARTUP=0) pending migrations are left for
+    `flask shovo migrate`.
+    """
     with get_db_context() as conn:
-        migrate_db(conn)
-        conn.commit()
+        # WAL lets readers continue while a refresh writes; the mode is stored in the file.
+        conn.execute("PRAGMA journal_mode = WAL")
+        _schema_versions_at_init.setdefault(DB_PATH, schema_version(conn))
+        if migrate:
+            migrate_db(conn)
+        return max(SCHEMA_VERSION - schema_version(conn), 0)
+
+
+def title_insert(conn: sqlite3.Connection, values: dict[str, Any]) -> None:
+    """Insert a shared title row unless it already exists.
+
+    Values come from the client adding the title, so they never overwrite a row
+    other rooms already list; only refreshed details update shared columns.
+    """
+    columns = [column for column in TITLE_COLUMNS if column in values]
+    conn.execute(
+        f"""
+        INSERT INTO titles ({", ".join(columns)}, updated_at) VALUES ({", ".join("?" for _ in columns)}, ?)
+        ON CONFLICT(title_id) DO NOTHING
+        """,
+        (*(values[column] for column in columns), int(time.time())),
+    )
+
+
+def title_set_details(
+    conn: sqlite3.Connection,
+    title_id: str,
+    rating: str | None,
+    rotten_tomatoes: str | None,
+    runtime_minutes: int | None,
+    total_seasons: int | None,
+    total_episodes: int | None,
+    avg_episode_length: int | None,
+    original_language: str | None,
+) -> None:
+    """Store refreshed details on the shared title row, seen by every room listing it."""
+    conn.execute(
+        """
+        UPDATE titles
+        SET rating = ?, rotten_tomatoes = ?, runtime_minutes = ?, total_seasons = ?,
+            total_episodes = ?, avg_episode_length = ?, original_language = ?, updated_at = ?
+        WHERE title_id = ?
+        """,
+        (
+            rating,
+            rotten_tomatoes,
+            runtime_minutes,
+            total_seasons,
+            total_episodes,
+            avg_episode_length,
+            original_language,
+            int(time.time()),
+            title_id,
+        ),
+    )
+
+
+def title_refreshed_since(conn: sqlite3.Connection, title_ids: list[str], since: int) -> set[str]:
+    """Return the titles whose ratings and metadata were both fetched successfully since a time."""
+    refreshed: set[str] = set()
+    for batch in _in_batches(title_ids):
+        placeholders = ",".join("?" for _ in batch)
+        rows = conn.execute(
+            f"""
+            SELECT rating_cache.title_id FROM rating_cache
+            JOIN metadata_cache ON metadata_cache.title_id = rating_cache.title_id
+            WHERE rating_cache.title_id IN ({placeholders})
+                AND rating_cache.cached_at >= ? AND rating_cache.status != ?
+                AND metadata_cache.cached_at >= ? AND metadata_cache.status != ?
+            """,
+            (*batch, since, CACHE_STATUS_ERROR, since, CACHE_STATUS_ERROR),
+        ).fetchall()
+        refreshed.update(row["title_id"] for row in rows)
+    return refreshed
+
+
+def title_sync_from_caches(conn: sqlite3.Connection, title_ids: list[str]) -> None:
+    """Copy cached ratings and metadata onto the shared title rows without fetching."""
+    for batch in _in_batches(title_ids):
+        placeholders = ",".join("?" for _ in batch)
+        conn.execute(
+            f"""
+            UPDATE titles
+            SET (rating, rotten_tomatoes, runtime_minutes, total_seasons, total_episodes,
+                avg_episode_length, original_language) = (
+                SELECT rating_cache.rating, rating_cache.rotten_tomatoes, metadata_cache.runtime_minutes,
+                    metadata_cache.total_seasons, metadata_cache.total_episodes,
+                    metadata_cache.avg_episode_length, metadata_cache.original_language
+                FROM rating_cache JOIN metadata_cache ON metadata_cache.title_id = rating_cache.title_id
+                WHERE rating_cache.title_id = titles.title_id
+            )
+            WHERE title_id IN ({placeholders})
+                AND EXISTS (
+                    SELECT 1 FROM rating_cache JOIN metadata_cache ON metadata_cache.title_id = rating_cache.title_id
+                    WHERE rating_cache.title_id = titles.title_id
+                )
+            """,
+            batch,
+        )
+
+
+def title_prune(conn: sqlite3.Connection, title_ids: list[str]) -> None:
+    """Delete title rows that no room lists any more."""
+    for batch in _in_batches(title_ids):
+        placeholders = ",".join("?" for _ in batch)
+        conn.execute(
+            f"""
+            DELETE FROM titles WHERE title_id IN ({placeholders})
+                AND NOT EXISTS (SELECT 1 FROM lists WHERE lists.title_id = titles.title_id)
+            """,
+            batch,
+        )
+
+
+def _cache_row_is_fresh(row: sqlite3.Row, ttl_seconds: int | None, now: int) -> bool:
+    """Return whether a cache row can be served without refetching.
+
+    Successful rows live for ttl_seconds (forever when None), rows where the upstream
+    had no data live for the negative TTL, and failed lookups until their retry time.
+    """
+    status = row["status"] or CACHE_STATUS_OK
+    if status == CACHE_STATUS_ERROR:
+        return now < int(row["retry_at"])
+    if status == CACHE_STATUS_ABSENT:
+        return int(row["cached_at"]) + NEGATIVE_CACHE_TTL_SECONDS >= now
+    return ttl_seconds is None or int(row["cached_at"]) + ttl_seconds >= now
+
+
+def _status_for(values: tuple[Any, ...]) -> str:
+    """Classify a successful upstream answer as data or known absence."""
+    return CACHE_STATUS_OK if any(value is not None for value in values) else CACHE_STATUS_ABSENT
+
+
+def _error_backoff_seconds(failures: int) -> int:
+    """Exponential backoff with jitter for the given number of consecutive failures."""
+    delay = min(ERROR_RETRY_BASE_SECONDS * 2 ** max(failures - 1, 0), ERROR_RETRY_MAX_SECONDS)
+    return int(delay / 2 + random.uniform(0, delay / 2))
+
+
+def _cache_mark_error(conn: sqlite3.Connection, table: str, title_id: str) -> None:
+    """Record a failed upstream lookup, keeping any previously cached values."""
+    row = conn.execute(f"SELECT failures, status FROM {table} WHERE title_id = ?", (title_id,)).fetchone()
+    failures = int(row["failures"]) + 1 if row and row["status"] == CACHE_STATUS_ERROR else 1
+    now = int(time.time())
+    conn.execute(
+        f"""
+        INSERT INTO {table} (title_id, cached_at, status, failures, retry_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(title_id) DO UPDATE SET
+            status = excluded.status, failures = excluded.failures, retry_at = excluded.retry_at
+        """,
+        (title_id, now, CACHE_STATUS_ERROR, failures, now + _error_backoff_seconds(failures)),
+    )
+
+
+def cache_state_counts(conn: sqlite3.Connection) -> dict[str, dict[str, int]]:
+    """Count rating and metadata cache rows per status."""
+    counts: dict[str, dict[str, int]] = {}
+    for table in ("rating_cache", "metadata_cache"):
+        states = {CACHE_STATUS_OK: 0, CACHE_STATUS_ABSENT: 0, CACHE_STATUS_ERROR: 0}
+        for row in conn.execute(f"SELECT status, COUNT(*) AS total FROM {table} GROUP BY status"):
+            states[row["status"]] = int(row["total"])
+        counts[table] = states
+    return counts
 
 
 def rating_cache_get(conn: sqlite3.Connection, title_id: str) -> tuple[str | None, str | None] | None:
     """Get cached rating for a title."""
     row = conn.execute(
-        "SELECT rating, rotten_tomatoes, cached_at FROM rating_cache WHERE title_id = ?",
+        "SELECT rating, rotten_tomatoes, cached_at, status, retry_at FROM rating_cache WHERE title_id = ?",
+        (title_id,),
+    ).fetchone()
+    if not row or not _cache_row_is_fresh(row, CACHE_TTL_SECONDS, int(time.time())):
+        return None
+    return row["rating"], row["rotten_tomatoes"]
+
+
+def rating_cache_get_stale(
+    conn: sqlite3.Connection, title_id: str, max_stale_seconds: int
+) -> tuple[tuple[str | None, str | None], bool] | None:
+    """Get a cached rating up to max_stale_seconds past its TTL as ((rating, rotten_tomatoes), is_stale).
+
+    Known-absent ratings are never served stale; failed lookups are served stale once
+    their retry time has come so the retry happens in the background.
+    """
+    row = conn.execute(
+        "SELECT rating, rotten_tomatoes, cached_at, status, retry_at FROM rating_cache WHERE title_id = ?",
         (title_id,),
     ).fetchone()
     if not row:
         return None
-    if int(row["cached_at"]) + CACHE_TTL_SECONDS < int(time.time()):
+    return _servable_rating(row, max_stale_seconds, int(time.time()))
+
+
+def rating_cache_get_stale_many(
+    conn: sqlite3.Connection, title_ids: list[str], max_stale_seconds: int
+) -> dict[str, tuple[tuple[str | None, str | None], bool]]:
+    """Bulk rating_cache_get_stale with one query per batch; unservable titles are left out."""
+    now = int(time.time())
+    cached: dict[str, tuple[tuple[str | None, str | None], bool]] = {}
+    for batch in _in_batches(title_ids):
+        placeholders = ", ".join("?" for _ in batch)
+        rows = conn.execute(
+            f"""
+            SELECT title_id, rating, rotten_tomatoes, cached_at, status, retry_at FROM rating_cache
+            WHERE title_id IN ({placeholders})
+            """,
+            batch,
+        ).fetchall()
+        for row in rows:
+            servable = _servable_rating(row, max_stale_seconds, now)
+            if servable is not None:
+                cached[row["title_id"]] = servable
+    return cached
+
+
+def _servable_rating(
+    row: sqlite3.Row, max_stale_seconds: int, now: int
+) -> tuple[tuple[str | None, str | None], bool] | None:
+    ratings = (row["rating"], row["rotten_tomatoes"])
+    if _cache_row_is_fresh(row, CACHE_TTL_SECONDS, now):
+        return ratings, False
+    if row["status"] == CACHE_STATUS_ABSENT:
         return None
-    return row["rating"], row["rotten_tomatoes"]
+    if int(row["cached_at"]) + CACHE_TTL_SECONDS + max_stale_seconds < now:
+        return None
+    return ratings, True
 
 
 def rating_cache_set(
@@ -194,27 +834,34 @@ def rating_cache_set(
     rating: str | None,
     rotten_tomatoes: str | None,
 ) -> None:
-    """Set cached rating for a title."""
+    """Set cached rating for a title (an empty answer is cached as known-absent)."""
     conn.execute(
-        "REPLACE INTO rating_cache (title_id, rating, rotten_tomatoes, cached_at) VALUES (?, ?, ?, ?)",
-        (title_id, rating, rotten_tomatoes, int(time.time())),
+        """
+        REPLACE INTO rating_cache (title_id, rating, rotten_tomatoes, cached_at, status, failures, retry_at)
+        VALUES (?, ?, ?, ?, ?, 0, 0)
+        """,
+        (title_id, rating, rotten_tomatoes, int(time.time()), _status_for((rating, rotten_tomatoes))),
     )
 
 
+def rating_cache_mark_error(conn: sqlite3.Connection, title_id: str) -> None:
+    """Record a failed rating lookup and schedule a retry with exponential backoff."""
+    _cache_mark_error(conn, "rating_cache", title_id)
+
+
 def metadata_cache_get(
     conn: sqlite3.Connection, title_id: str
 ) -> tuple[int | None, int | None, int | None, int | None, str | None] | None:
     """Get cached metadata for a title (with TTL)."""
     row = conn.execute(
         """
-        SELECT runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language, cached_at
+        SELECT runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language,
+            cached_at, status, retry_at
         FROM metadata_cache WHERE title_id = ?
         """,
         (title_id,),
     ).fetchone()
-    if not row:
-        return None
-    if int(row["cached_at"]) + CACHE_TTL_SECONDS < int(time.time()):
+    if not row or not _cache_row_is_fresh(row, CACHE_TTL_SECONDS, int(time.time())):
         return None
     return (
         row["runtime_minutes"],
@@ -228,15 +875,19 @@ def metadata_cache_get(
 def metadata_cache_get_no_ttl(
     conn: sqlite3.Connection, title_id: str
 ) -> tuple[int | None, int | None, int | None, int | None, str | None] | None:
-    """Get cached metadata ignoring TTL (metadata like runtime/language rarely changes)."""
+    """Get cached metadata ignoring TTL (metadata like runtime/language rarely changes).
+
+    Known-absent and failed lookups still expire so they get retried.
+    """
     row = conn.execute(
         """
-        SELECT runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language
+        SELECT runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language,
+            cached_at, status, retry_at
         FROM metadata_cache WHERE title_id = ?
         """,
         (title_id,),
     ).fetchone()
-    if not row:
+    if not row or not _cache_row_is_fresh(row, None, int(time.time())):
         return None
     return (
         row["runtime_minutes"],
@@ -247,17 +898,84 @@ def metadata_cache_get_no_ttl(
     )
 
 
-def rating_cache_get_no_ttl(
-    conn: sqlite3.Connection, title_id: str
-) -> tuple[str | None, str | None] | None:
-    """Get cached rating ignoring TTL (for search result display)."""
-    row = conn.execute(
-        "SELECT rating, rotten_tomatoes FROM rating_cache WHERE title_id = ?",
-        (title_id,),
-    ).fetchone()
-    if not row:
-        return None
-    return row["rating"], row["rotten_tomatoes"]
+def metadata_cache_get_no_ttl_many(
+    conn: sqlite3.Connection, title_ids: list[str]
+) -> dict[str, tuple[int | None, int | None, int | None, int | None, str | None]]:
+    """Bulk metadata_cache_get_no_ttl with one query per batch; expired misses are left out."""
+    now = int(time.time())
+    cached: dict[str, tuple[int | None, int | None, int | None, int | None, str | None]] = {}
+    for batch in _in_batches(title_ids):
+        placeholders = ", ".join("?" for _ in batch)
+        rows = conn.execute(
+            f"""
+            SELECT title_id, runtime_minutes, total_seasons, total_episodes, avg_episode_length,
+                original_language, cached_at, status, retry_at
+            FROM metadata_cache WHERE title_id IN ({placeholders})
+            """,
+            batch,
+        ).fetchall()
+        for row in rows:
+            if _cache_row_is_fresh(row, None, now):
+                cached[row["title_id"]] = (
+                    row["runtime_minutes"],
+                    row["total_seasons"],
+                    row["total_episodes"],
+                    row["avg_episode_length"],
+                    row["original_language"],
+                )
+    return cached
+
+
+def _in_batches(values: list[str], size: int = SQL_IN_BATCH_SIZE) -> Generator[list[str], None, None]:
+    """Split values into chunks that stay below SQLite's bound-parameter limit."""
+    unique = list(dict.fromkeys(values))
+    for start in range(0, len(unique), size):
+        yield unique[start : start + size]
+
+
+def rating_cache_get_many(
+    conn: sqlite3.Connection, title_ids: list[str], respect_ttl: bool = False
+) -> dict[str, tuple[str | None, str | None]]:
+    """Get cached ratings for several titles with one query per batch (TTL ignored by default)."""
+    min_cached_at = int(time.time()) - CACHE_TTL_SECONDS if respect_ttl else 0
+    cached: dict[str, tuple[str | None, str | None]] = {}
+    for batch in _in_batches(title_ids):
+        placeholders = ", ".join("?" for _ in batch)
+        rows = conn.execute(
+            f"""
+            SELECT title_id, rating, rotten_tomatoes FROM rating_cache
+            WHERE title_id IN ({placeholders}) AND cached_at >= ?
+            """,
+            [*batch, min_cached_at],
+        ).fetchall()
+        for row in rows:
+            cached[row["title_id"]] = (row["rating"], row["rotten_tomatoes"])
+    return cached
+
+
+def metadata_cache_get_many(
+    conn: sqlite3.Connection, title_ids: list[str]
+) -> dict[str, tuple[int | None, int | None, int | None, int | None, str | None]]:
+    """Get cached metadata for several titles with one query per batch (ignoring TTL)."""
+    cached: dict[str, tuple[int | None, int | None, int | None, int | None, str | None]] = {}
+    for batch in _in_batches(title_ids):
+        placeholders = ", ".join("?" for _ in batch)
+        rows = conn.execute(
+            f"""
+            SELECT title_id, runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language
+            FROM metadata_cache WHERE title_id IN ({placeholders})
+            """,
+            batch,
+        ).fetchall()
+        for row in rows:
+            cached[row["title_id"]] = (
+                row["runtime_minutes"],
+                row["total_seasons"],
+                row["total_episodes"],
+                row["avg_episode_length"],
+                row["original_language"],
+            )
+    return cached
 
 
 def metadata_cache_set(
@@ -269,21 +987,402 @@ def metadata_cache_set(
     avg_episode_length: int | None,
     original_language: str | None,
 ) -> None:
-    """Set cached metadata for a title."""
+    """Set cached metadata for a title (an empty answer is cached as known-absent)."""
+    values = (runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language)
     conn.execute(
         """
         REPLACE INTO metadata_cache (
             title_id, runtime_minutes, total_seasons, total_episodes, avg_episode_length,
-            original_language, cached_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            original_language, cached_at, status, failures, retry_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, 0)
         """,
-        (
-            title_id,
-            runtime_minutes,
-            total_seasons,
-            total_episodes,
-            avg_episode_length,
-            original_language,
-            int(time.time()),
-        ),
+        (title_id, *values, int(time.time()), _status_for(values)),
+    )
+
+
+def metadata_cache_mark_error(conn: sqlite3.Connection, title_id: str) -> None:
+    """Record a failed metadata lookup and schedule a retry with exponential backoff."""
+    _cache_mark_error(conn, "metadata_cache", title_id)
+
+
+def season_cache_get_many(conn: sqlite3.Connection, title_id: str) -> dict[int, int]:
+    """Get cached episode counts per season that do not need refetching.
+
+    Completed seasons never change; seasons that may still be airing expire after a day.
+    """
+    now = int(time.time())
+    rows = conn.execute(
+        "SELECT season, episode_count, is_complete, cached_at FROM season_cache WHERE title_id = ?",
+        (title_id,),
+    ).fetchall()
+    return {
+        int(row["season"]): int(row["episode_count"])
+        for row in rows
+        if row["is_complete"] or int(row["cached_at"]) + SEASON_AIRING_TTL_SECONDS >= now
+    }
+
+
+def season_cache_set_many(
+    conn: sqlite3.Connection, title_id: str, seasons: list[tuple[int, int, bool]]
+) -> None:
+    """Set cached episode counts for (season, episode_count, is_complete) entries."""
+    now = int(time.time())
+    conn.executemany(
+        "REPLACE INTO season_cache (title_id, season, episode_count, is_complete, cached_at) VALUES (?, ?, ?, ?, ?)",
+        [(title_id, season, episode_count, 1 if is_complete else 0, now) for season, episode_count, is_complete in seasons],
+    )
+
+
+def tmdb_external_ids_get_many(
+    conn: sqlite3.Connection, keys: list[tuple[str, int]]
+) -> dict[tuple[str, int], str | None]:
+    """Get cached IMDB IDs for (media_type, tmdb_id) keys in one query.
+
+    Known mappings never expire; titles without an IMDB ID are retried after the cache TTL.
+    """
+    if not keys:
+        return {}
+    wanted = set(keys)
+    tmdb_ids = sorted({tmdb_id for _, tmdb_id in wanted})
+    placeholders = ", ".join("?" for _ in tmdb_ids)
+    rows = conn.execute(
+        f"SELECT media_type, tmdb_id, imdb_id, cached_at FROM tmdb_external_ids WHERE tmdb_id IN ({placeholders})",
+        tmdb_ids,
+    ).fetchall()
+    now = int(time.time())
+    cached: dict[tuple[str, int], str | None] = {}
+    for row in rows:
+        key = (row["media_type"], int(row["tmdb_id"]))
+        if key not in wanted:
+            continue
+        if row["imdb_id"] is None and int(row["cached_at"]) + CACHE_TTL_SECONDS < now:
+            continue
+        cached[key] = row["imdb_id"]
+    return cached
+
+
+def tmdb_external_ids_set_many(conn: sqlite3.Connection, mappings: dict[tuple[str, int], str | None]) -> None:
+    """Set cached IMDB IDs for (media_type, tmdb_id) keys."""
+    now = int(time.time())
+    conn.executemany(
+        "REPLACE INTO tmdb_external_ids (media_type, tmdb_id, imdb_id, cached_at) VALUES (?, ?, ?, ?)",
+        [(media_type, tmdb_id, imdb_id, now) for (media_type, tmdb_id), imdb_id in mappings.items()],
+    )
+
+
+def suggestion_cache_get_many(
+    conn: sqlite3.Connection, queries: list[str]
+) -> dict[str, tuple[list[dict[str, Any]], int]]:
+    """Get unexpired raw suggestion items and their cache time for several queries in one query."""
+    if not queries:
+        return {}
+    placeholders = ", ".join("?" for _ in queries)
+    rows = conn.execute(
+        f"SELECT query, items, cached_at FROM suggestion_cache WHERE query IN ({placeholders}) AND cached_at >= ?",
+        [*queries, int(time.time()) - SUGGESTION_CACHE_TTL_SECONDS],
+    ).fetchall()
+    cached: dict[str, tuple[list[dict[str, Any]], int]] = {}
+    for row in rows:
+        try:
+            cached[row["query"]] = (json.loads(row["items"]), int(row["cached_at"]))
+        except json.JSONDecodeError:
+            continue
+    return cached
+
+
+def suggestion_cache_set(conn: sqlite3.Connection, query: str, items: list[dict[str, Any]]) -> None:
+    """Set cached raw suggestion items for a normalized query."""
+    conn.execute(
+        "REPLACE INTO suggestion_cache (query, items, cached_at) VALUES (?, ?, ?)",
+        (query, json.dumps(items), int(time.time())),
+    )
+
+
+def title_summary_get_many(
+    conn: sqlite3.Connection, title_ids: list[str]
+) -> dict[str, tuple[str, str | None, str | None, str | None] | None]:
+    """Get unexpired (title, year, type_label, image) summaries for several IMDB IDs.
+
+    A None value means the ID is known not to resolve; such entries expire after
+    NEGATIVE_CACHE_TTL_SECONDS instead of TITLE_SUMMARY_TTL_SECONDS.
+    """
+    now = int(time.time())
+    cached: dict[str, tuple[str, str | None, str | None, str | None] | None] = {}
+    for batch in _in_batches(title_ids):
+        placeholders = ", ".join("?" for _ in batch)
+        rows = conn.execute(
+            f"""
+            SELECT title_id, title, year, type_label, image FROM title_summary_cache
+            WHERE title_id IN ({placeholders})
+              AND cached_at >= CASE WHEN title IS NULL THEN ? ELSE ? END
+            """,
+            [*batch, now - NEGATIVE_CACHE_TTL_SECONDS, now - TITLE_SUMMARY_TTL_SECONDS],
+        ).fetchall()
+        for row in rows:
+            if row["title"] is None:
+                cached[row["title_id"]] = None
+            else:
+                cached[row["title_id"]] = (row["title"], row["year"], row["type_label"], row["image"])
+    return cached
+
+
+def title_summary_set_many(
+    conn: sqlite3.Connection, summaries: dict[str, tuple[str, str | None, str | None, str | None] | None]
+) -> None:
+    """Store title summaries keyed by IMDB ID; None records an ID that does not resolve."""
+    now = int(time.time())
+    conn.executemany(
+        "REPLACE INTO title_summary_cache (title_id, title, year, type_label, image, cached_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [(title_id, *(summary or (None, None, None, None)), now) for title_id, summary in summaries.items()],
+    )
+
+
+def trending_snapshot_version(conn: sqlite3.Connection) -> tuple[int, int] | None:
+    """Return (fetched_at, revision) of the shared trending snapshot, or None if there is none."""
+    row = conn.execute("SELECT fetched_at, revision FROM trending_snapshot WHERE id = 1").fetchone()
+    return (int(row["fetched_at"]), int(row["revision"])) if row else None
+
+
+def trending_snapshot_get(conn: sqlite3.Connection) -> tuple[list[dict[str, Any]], int, int] | None:
+    """Return the shared trending snapshot items with their fetch time and revision."""
+    row = conn.execute("SELECT items, fetched_at, revision FROM trending_snapshot WHERE id = 1").fetchone()
+    if row is None:
+        return None
+    try:
+        return json.loads(row["items"]), int(row["fetched_at"]), int(row["revision"])
+    except json.JSONDecodeError:
+        return None
+
+
+def trending_snapshot_set(
+    conn: sqlite3.Connection, items: list[dict[str, Any]], fetched_at: int | None = None
+) -> tuple[int, int]:
+    """Replace the shared trending snapshot and return its (fetched_at, revision).
+
+    fetched_at defaults to now; the revision increases on every write, so readers
+    notice in-place updates such as enrichment of the same fetch.
+    """
+    if fetched_at is None:
+        fetched_at = int(time.time())
+    conn.execute(
+        """
+        REPLACE INTO trending_snapshot (id, items, fetched_at, revision)
+        VALUES (1, ?, ?, COALESCE((SELECT revision FROM trending_snapshot WHERE id = 1), 0) + 1)
+        """,
+        (json.dumps(items), fetched_at),
+    )
+    return trending_snapshot_version(conn)
+
+
+def lease_acquire(conn: sqlite3.Connection, name: str, owner: str, ttl_seconds: float) -> bool:
+    """Take or extend a named cross-process lease; returns False while another owner holds it."""
+    now = time.time()
+    cursor = conn.execute(
+        """
+        INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+        WHERE leases.expires_at < ? OR leases.owner = excluded.owner
+        """,
+        (name, owner, now + ttl_seconds, now),
+    )
+    return cursor.rowcount == 1
+
+
+def lease_release(conn: sqlite3.Connection, name: str, owner: str) -> None:
+    """Release a lease if it is still held by owner."""
+    conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+
+def quota_take(
+    conn: sqlite3.Connection,
+    upstream: str,
+    rate: float,
+    burst: float,
+    floor: float = 0.0,
+    count_throttle: bool = True,
+) -> float:
+    """Take one token from an upstream's shared bucket if more than floor tokens would remain.
+
+    The bucket refills at rate tokens per second up to burst. Returns 0 when a token
+    was taken, otherwise the seconds until one is expected to be available.
+    """
+    now = time.time()
+    params = {"upstream": upstream, "rate": rate, "burst": burst, "floor": floor, "now": now}
+    cursor = conn.execute(
+        """
+        INSERT INTO upstream_quota (upstream, tokens, updated_at, granted) VALUES (:upstream, :burst - 1, :now, 1)
+        ON CONFLICT(upstream) DO UPDATE SET
+            tokens = MIN(:burst, upstream_quota.tokens + MAX(:now - upstream_quota.updated_at, 0) * :rate) - 1,
+            updated_at = :now,
+            granted = upstream_quota.granted + 1
+        WHERE MIN(:burst, upstream_quota.tokens + MAX(:now - upstream_quota.updated_at, 0) * :rate) - 1 >= :floor
+        """,
+        params,
+    )
+    if cursor.rowcount == 1:
+        return 0.0
+    if count_throttle:
+        conn.execute("UPDATE upstream_quota SET throttled = throttled + 1 WHERE upstream = ?", (upstream,))
+    row = conn.execute("SELECT tokens, updated_at FROM upstream_quota WHERE upstream = ?", (upstream,)).fetchone()
+    tokens = min(burst, row["tokens"] + max(now - row["updated_at"], 0) * rate)
+    return max((floor + 1 - tokens) / rate, 0.001)
+
+
+def quota_get_all(conn: sqlite3.Connection) -> dict[str, sqlite3.Row]:
+    """Return the stored bucket state of every upstream that has been called."""
+    rows = conn.execute("SELECT upstream, tokens, updated_at, granted, throttled FROM upstream_quota").fetchall()
+    return {row["upstream"]: row for row in rows}
+
+
+def refresh_job_create(
+    conn: sqlite3.Connection, room: str, user_agent: str, title_ids: list[str], done_ids: set[str]
+) -> bool:
+    """Queue a refresh job for a room, replacing a finished one; False while one is active.
+
+    Titles in done_ids count as processed straight away. Takes the write lock, so two
+    processes cannot both start a job for the room. The caller commits.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute("SELECT status FROM refresh_jobs WHERE room = ?", (room,)).fetchone()
+    if row is not None and row["status"] != REFRESH_JOB_DONE:
+        return False
+    now = int(time.time())
+    processed = sum(1 for title_id in title_ids if title_id in done_ids)
+    status = REFRESH_JOB_DONE if processed >= len(title_ids) else REFRESH_JOB_QUEUED
+    conn.execute(
+        """
+        REPLACE INTO refresh_jobs (room, status, user_agent, total, processed, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (room, status, user_agent, len(title_ids), processed, now, now),
     )
+    conn.execute("DELETE FROM refresh_job_titles WHERE room = ?", (room,))
+    if status != REFRESH_JOB_DONE:
+        conn.executemany(
+            "INSERT INTO refresh_job_titles (room, title_id, done) VALUES (?, ?, ?)",
+            [(room, title_id, 1 if title_id in done_ids else 0) for title_id in title_ids],
+        )
+    return True
+
+
+def refresh_job_claim(conn: sqlite3.Connection, owner: str, ttl_seconds: float) -> str | None:
+    """Claim the oldest queued job, or a running one whose lease expired, and return its room.
+
+    The caller commits.
+    """
+    now = time.time()
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute(
+        """
+        SELECT room FROM refresh_jobs
+        WHERE status = ? OR (status = ? AND lease_expires_at < ?)
+        ORDER BY created_at LIMIT 1
+        """,
+        (REFRESH_JOB_QUEUED, REFRESH_JOB_RUNNING, now),
+    ).fetchone()
+    if row is None:
+        return None
+    conn.execute(
+        "UPDATE refresh_jobs SET status = ?, owner = ?, lease_expires_at = ?, updated_at = ? WHERE room = ?",
+        (REFRESH_JOB_RUNNING, owner, now + ttl_seconds, int(now), row["room"]),
+    )
+    return row["room"]
+
+
+def refresh_job_renew(conn: sqlite3.Connection, room: str, owner: str, ttl_seconds: float) -> bool:
+    """Extend a running job's lease; False once the job finished or another owner took it over."""
+    cursor = conn.execute(
+        "UPDATE refresh_jobs SET lease_expires_at = ? WHERE room = ? AND owner = ? AND status = ?",
+        (time.time() + ttl_seconds, room, owner, REFRESH_JOB_RUNNING),
+    )
+    return cursor.rowcount == 1
+
+
+def refresh_job_get(conn: sqlite3.Connection, room: str) -> sqlite3.Row | None:
+    """Return a room's refresh job."""
+    return conn.execute(
+        "SELECT room, status, user_agent, total, processed, lease_expires_at FROM refresh_jobs WHERE room = ?",
+        (room,),
+    ).fetchone()
+
+
+def refresh_job_pending_titles(conn: sqlite3.Connection, room: str) -> list[tuple[str, str | None]]:
+    """Return (title_id, type_label) for the job's titles that are not processed yet."""
+    rows = conn.execute(
+        """
+        SELECT refresh_job_titles.title_id, titles.type_label FROM refresh_job_titles
+        LEFT JOIN titles ON titles.title_id = refresh_job_titles.title_id
+        WHERE refresh_job_titles.room = ? AND refresh_job_titles.done = 0
+        """,
+        (room,),
+    ).fetchall()
+    return [(row["title_id"], row["type_label"]) for row in rows]
+
+
+def refresh_job_mark_done(conn: sqlite3.Connection, room: str, title_ids: list[str]) -> None:
+    """Count titles as processed, finishing the job once every title is. The caller commits."""
+    conn.executemany(
+        "UPDATE refresh_job_titles SET done = 1 WHERE room = ? AND title_id = ?",
+        [(room, title_id) for title_id in title_ids],
+    )
+    conn.execute(
+        """
+        UPDATE refresh_jobs SET updated_at = ?, processed = (
+            SELECT COUNT(*) FROM refresh_job_titles WHERE refresh_job_titles.room = refresh_jobs.room AND done = 1
+        )
+        WHERE room = ? AND status != ?
+        """,
+        (int(time.time()), room, REFRESH_JOB_DONE),
+    )
+    cursor = conn.execute(
+        """
+        UPDATE refresh_jobs SET status = ?, owner = NULL
+        WHERE room = ? AND status != ?
+            AND NOT EXISTS (SELECT 1 FROM refresh_job_titles WHERE room = refresh_jobs.room AND done = 0)
+        """,
+        (REFRESH_JOB_DONE, room, REFRESH_JOB_DONE),
+    )
+    if cursor.rowcount:
+        conn.execute("DELETE FROM refresh_job_titles WHERE room = ?", (room,))
+
+
+def refresh_job_delete(conn: sqlite3.Connection, room: str) -> None:
+    """Forget a room's refresh job and its progress."""
+    conn.execute("DELETE FROM refresh_jobs WHERE room = ?", (room,))
+    conn.execute("DELETE FROM refresh_job_titles WHERE room = ?", (room,))
+
+
+def refresh_job_rename(conn: sqlite3.Connection, room: str, next_room: str) -> None:
+    """Move a room's refresh job to its new name. The caller commits.
+
+    A running job is queued again, since its owner tracks it under the old name; its
+    finished titles are kept, so only the rest are fetched.
+    """
+    refresh_job_delete(conn, next_room)
+    conn.execute(
+        """
+        UPDATE refresh_jobs
+        SET room = ?, owner = NULL, lease_expires_at = 0, updated_at = ?,
+            status = CASE WHEN status = ? THEN ? ELSE status END
+        WHERE room = ?
+        """,
+        (next_room, int(time.time()), REFRESH_JOB_RUNNING, REFRESH_JOB_QUEUED, room),
+    )
+    conn.execute("UPDATE refresh_job_titles SET room = ? WHERE room = ?", (next_room, room))
+
+
+def refresh_job_collect(conn: sqlite3.Connection, older_than: int) -> int:
+    """Delete jobs untouched since older_than (finished or abandoned) and return how many."""
+    cursor = conn.execute("DELETE FROM refresh_jobs WHERE updated_at < ?", (older_than,))
+    conn.execute("DELETE FROM refresh_job_titles WHERE room NOT IN (SELECT room FROM refresh_jobs)")
+    return cursor.rowcount
+
+
+def refresh_job_counts(conn: sqlite3.Connection) -> dict[str, int]:
+    """Count refresh jobs per status."""
+    counts = {REFRESH_JOB_QUEUED: 0, REFRESH_JOB_RUNNING: 0, REFRESH_JOB_DONE: 0}
+    for row in conn.execute("SELECT status, COUNT(*) AS total FROM refresh_jobs GROUP BY status"):
+        counts[row["status"]] = int(row["total"])
+    return counts
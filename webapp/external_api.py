@@ -1,35 +1,102 @@
 from __future__ import annotations
 
+import datetime
 import json
 import os
 import re
-from typing import Any, Iterable
+import sqlite3
+import threading
+from typing import Any, Callable, Iterable
 
 import requests
 
 # Support both package and standalone imports
 try:
     from .database import (
+        SUGGESTION_CACHE_TTL_SECONDS,
         get_db_context,
         metadata_cache_get,
+        metadata_cache_get_many,
         metadata_cache_get_no_ttl,
+        metadata_cache_get_no_ttl_many,
+        metadata_cache_mark_error,
         metadata_cache_set,
         rating_cache_get,
-        rating_cache_get_no_ttl,
+        rating_cache_get_many,
+        rating_cache_get_stale,
+        rating_cache_get_stale_many,
+        rating_cache_mark_error,
         rating_cache_set,
+        season_cache_get_many,
+        season_cache_set_many,
+        suggestion_cache_get_many,
+        suggestion_cache_set,
+        title_set_details,
+        title_summary_get_many,
+        title_summary_set_many,
+        tmdb_external_ids_get_many,
+        tmdb_external_ids_set_many,
     )
     from .models import SearchResult
+    from .singleflight import single_flight
+    from .upstream import (
+        UPSTREAM_IMDB,
+        UPSTREAM_IMDB_SUGGEST,
+        UPSTREAM_OMDB,
+        UPSTREAM_TMDB,
+        CircuitOpen,
+        Deadline,
+        UpstreamError,
+        capped_timeout,
+        deadline_expired,
+        http_get,
+        upstream_skipped,
+    )
+    from .utils import LRUCache, env_float, env_int
+    from .workers import BackgroundPool, bounded_map
 except ImportError:
     from database import (
+        SUGGESTION_CACHE_TTL_SECONDS,
         get_db_context,
         metadata_cache_get,
+        metadata_cache_get_many,
         metadata_cache_get_no_ttl,
+        metadata_cache_get_no_ttl_many,
+        metadata_cache_mark_error,
         metadata_cache_set,
         rating_cache_get,
-        rating_cache_get_no_ttl,
+        rating_cache_get_many,
+        rating_cache_get_stale,
+        rating_cache_get_stale_many,
+        rating_cache_mark_error,
         rating_cache_set,
+        season_cache_get_many,
+        season_cache_set_many,
+        suggestion_cache_get_many,
+        suggestion_cache_set,
+        title_set_details,
+        title_summary_get_many,
+        title_summary_set_many,
+        tmdb_external_ids_get_many,
+        tmdb_external_ids_set_many,
     )
     from models import SearchResult
+    from singleflight import single_flight
+    from upstream import (
+        UPSTREAM_IMDB,
+        UPSTREAM_IMDB_SUGGEST,
+        UPSTREAM_OMDB,
+        UPSTREAM_TMDB,
+        CircuitOpen,
+        Deadline,
+        UpstreamError,
+        capped_timeout,
+        deadline_expired,
+        http_get,
+        upstream_skipped,
+    )
+    from utils import LRUCache, env_float, env_int
+    from workers import BackgroundPool, bounded_map
 
 IMDB_SUGGESTION_URL = "https://v3.sg.media-imdb.com/suggestion/{first}/{query}.json"
 IMDB_TITLE_URL = "https://www.imdb.com/title/{title_id}/"
@@ -40,6 +107,20 @@ TMDB_EXTERNAL_IDS_URL = "https://api.themoviedb.org/3/{media_type}/{tmdb_id}/ext
 TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w185"
 DEFAULT_USER_AGENT = "shovo-movielist/1.0 (+https://example.com)"
 MAX_RESULTS = 10
+IMDB_SUGGESTION_PAGE_SIZE = 8
+SEASON_FETCH_WORKERS = env_int("SHOVO_SEASON_FETCH_WORKERS", 4, minimum=1)
+SEASON_FETCH_DEADLINE_SECONDS = env_float("SHOVO_SEASON_FETCH_DEADLINE", 15.0, minimum=1.0)
+TMDB_LOOKUP_WORKERS = env_int("SHOVO_TMDB_LOOKUP_WORKERS", 8, minimum=1)
+TMDB_LOOKUP_DEADLINE_SECONDS = env_float("SHOVO_TMDB_LOOKUP_DEADLINE", 10.0, minimum=1.0)
+TITLE_SUMMARY_WORKERS = env_int("SHOVO_TITLE_SUMMARY_WORKERS", 6, minimum=1)
+TITLE_SUMMARY_DEADLINE_SECONDS = env_float("SHOVO_TITLE_SUMMARY_DEADLINE", 10.0, minimum=1.0)
+DETAIL_ENRICH_WORKERS = env_int("SHOVO_DETAIL_ENRICH_WORKERS", 4, minimum=1)
+DETAIL_BATCH_WORKERS = env_int("SHOVO_DETAIL_BATCH_WORKERS", 4, minimum=1)
+DETAIL_BATCH_MAX_TITLES = env_int("SHOVO_DETAIL_BATCH_MAX_TITLES", 50, minimum=1)
+SUGGESTION_MEMORY_ENTRIES = env_int("SHOVO_SUGGESTION_CACHE_ENTRIES", 512, minimum=1)
+RATING_MAX_STALE_SECONDS = env_int("SHOVO_RATING_MAX_STALE", 60 * 60 * 24 * 7, minimum=0)
+EMPTY_RATINGS: tuple[str | None, str | None] = (None, None)
+EMPTY_METADATA: tuple[int | None, int | None, int | None, int | None, str | None] = (None, None, None, None, None)
 ALLOWED_TYPE_LABELS = {"feature", "movie", "tvseries", "tvminiseries", "tvmovie"}
 OMDB_API_KEY = os.environ.get("OMDB_API_KEY", "thewdb")
 TMDB_ACCESS_TOKEN = os.environ.get("TMDB_ACCESS_TOKEN")
@@ -53,6 +134,18 @@ DEFAULT_TRENDING_TITLE_IDS = tuple(
     if title_id.strip()
 )
 
+_OMDB_NOT_FOUND_RE = re.compile(r"not found|incorrect imdb id", re.I)
+_suggestion_memory = LRUCache(SUGGESTION_MEMORY_ENTRIES, SUGGESTION_CACHE_TTL_SECONDS)
+_suggestion_stats_lock = threading.Lock()
+_suggestion_stats = {"memory_hits": 0, "db_hits": 0, "prefix_hits": 0, "misses": 0}
+_rating_revalidation_pool = BackgroundPool(
+    "shovo-rating-refresh",
+    max_workers=env_int("SHOVO_RATING_REFRESH_WORKERS", 2, minimum=1),
+    max_pending=env_int("SHOVO_RATING_REFRESH_QUEUE", 100, minimum=1),
+)
+_rating_stats_lock = threading.Lock()
+_rating_stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0}
+
 
 def normalize_type_label(type_label: str | None) -> str:
     """Normalize a type label to lowercase alphanumeric."""
@@ -97,22 +190,29 @@ def _fetch_rotten_tomatoes(title_id: str, user_agent: str) -> str | None:
     return _parse_omdb_ratings(payload)[1]
 
 
-def _fetch_omdb_title(title_id: str, user_agent: str, season: int | None = None) -> dict[str, Any]:
+def _fetch_omdb_title(
+    title_id: str, user_agent: str, season: int | None = None, deadline: Deadline | None = None
+) -> dict[str, Any]:
     """Fetch title info from OMDB API."""
     if not OMDB_API_KEY:
         return {}
     params: dict[str, Any] = {"i": title_id, "apikey": OMDB_API_KEY}
     if season is not None:
         params["Season"] = season
-    response = requests.get(
+    response = http_get(
+        UPSTREAM_OMDB,
         OMDB_URL,
         params=params,
         headers={"User-Agent": user_agent},
-        timeout=10,
+        deadline=deadline,
     )
     response.raise_for_status()
     payload = response.json()
     if payload.get("Response") != "True":
+        error = str(payload.get("Error") or "")
+        if error and not _OMDB_NOT_FOUND_RE.search(error):
+            # Quota or API key problems are failures, not proof that the title has no data.
+            raise UpstreamError(f"OMDB error: {error}")
         return {}
     return payload
 
@@ -135,11 +235,82 @@ def _parse_original_language(value: str | None) -> str | None:
     return language or None
 
 
+def _show_has_ended(year: str | None) -> bool:
+    """Return whether an OMDB series year span is closed, e.g. "2019–2021" rather than "2019–"."""
+    if not year or year == "N/A":
+        return False
+    return not year.strip().endswith(("–", "-"))
+
+
+def _season_is_complete(
+    season_payload: dict[str, Any], season: int, total_seasons: int, show_ended: bool = False
+) -> bool:
+    """Return whether a season has finished airing and its episode list can be cached for good.
+
+    The last season of a show still on the air may gain episodes, so it only counts
+    once the show has ended.
+    """
+    if season >= total_seasons and not show_ended:
+        return False
+    episodes = season_payload.get("Episodes") or []
+    if not episodes:
+        return False
+    today = datetime.date.today().isoformat()
+    for episode in episodes:
+        released = episode.get("Released")
+        if not released or released == "N/A" or released > today:
+            return False
+    return True
+
+
+def _count_episodes(
+    title_id: str,
+    user_agent: str,
+    total_seasons: int,
+    deadline: Deadline | None = None,
+    show_ended: bool = False,
+) -> int | None:
+    """Count episodes across all seasons of a title.
+
+    Seasons are fetched concurrently under one overall deadline (cut to the request
+    budget); finished seasons are served from season_cache so later refreshes only
+    refetch airing or new seasons. Returns None when any season could not be fetched in time.
+    """
+    with get_db_context() as conn:
+        counts = season_cache_get_many(conn, title_id)
+
+    def _fetch_season(season: int) -> tuple[int, bool]:
+        season_payload = _fetch_omdb_title(title_id, user_agent, season=season, deadline=deadline)
+        episodes = season_payload.get("Episodes") or []
+        return len(episodes), _season_is_complete(season_payload, season, total_seasons, show_ended)
+
+    missing = [season for season in range(1, total_seasons + 1) if season not in counts]
+    fetched = bounded_map(
+        _fetch_season, missing, SEASON_FETCH_WORKERS, timeout=capped_timeout(deadline, SEASON_FETCH_DEADLINE_SECONDS)
+    )
+    if fetched:
+        with get_db_context() as conn:
+            season_cache_set_many(
+                conn, title_id, [(season, count, complete) for season, (count, complete) in fetched.items()]
+            )
+            conn.commit()
+    if len(fetched) < len(missing):
+        return None
+    counts.update({season: count for season, (count, _) in fetched.items()})
+    total_episodes_count = sum(counts[season] for season in range(1, total_seasons + 1))
+    return total_episodes_count if total_episodes_count else None
+
+
 def _fetch_metadata(
-    title_id: str, user_agent: str, normalized_type: str
+    title_id: str,
+    user_agent: str,
+    normalized_type: str,
+    payload: dict[str, Any] | None = None,
+    deadline: Deadline | None = None,
 ) -> tuple[int | None, int | None, int | None, int | None, str | None]:
-    """Fetch metadata from OMDB API."""
-    payload = _fetch_omdb_title(title_id, user_agent)
+    """Fetch metadata from OMDB API, reusing an already fetched title payload if given."""
+    if payload is None:
+        payload = _fetch_omdb_title(title_id, user_agent, deadline=deadline)
     runtime_minutes = _parse_runtime(payload.get("Runtime"))
     original_language = _parse_original_language(payload.get("Language"))
     total_seasons = payload.get("totalSeasons")
@@ -150,45 +321,72 @@ def _fetch_metadata(
     avg_episode_length = runtime_minutes if normalized_type in {"tvseries", "tvminiseries"} else None
     total_episodes = None
     if normalized_type == "tvminiseries" and total_seasons_int:
-        total_episodes_count = 0
-        for season in range(1, total_seasons_int + 1):
-            season_payload = _fetch_omdb_title(title_id, user_agent, season=season)
-            episodes = season_payload.get("Episodes") or []
-            total_episodes_count += len(episodes)
-        total_episodes = total_episodes_count if total_episodes_count else None
+        total_episodes = _count_episodes(
+            title_id,
+            user_agent,
+            total_seasons_int,
+            deadline=deadline,
+            show_ended=_show_has_ended(payload.get("Year")),
+        )
+        if total_episodes is None:
+            raise UpstreamError(f"Incomplete season data for {title_id}")
     return runtime_minutes, total_seasons_int, total_episodes, avg_episode_length, original_language
 
 
-def get_metadata(
-    title_id: str, user_agent: str, normalized_type: str
+def _store_metadata(
+    conn: sqlite3.Connection,
+    title_id: str,
+    metadata: tuple[int | None, int | None, int | None, int | None, str | None] | None,
+    deadline: Deadline | None = None,
 ) -> tuple[int | None, int | None, int | None, int | None, str | None]:
-    """Get metadata for a title, using cache if available (no TTL — metadata rarely changes)."""
-    with get_db_context() as conn:
-        cached = metadata_cache_get_no_ttl(conn, title_id)
-        if cached is not None:
-            return cached
-        try:
-            metadata = _fetch_metadata(title_id, user_agent, normalized_type)
-        except requests.RequestException:
-            metadata = (None, None, None, None, None)
+    """Cache fetched metadata, or record a failed fetch and fall back to the last known values.
+
+    Fetches skipped for the request budget or an open circuit breaker are not recorded.
+    """
+    if metadata is not None:
         metadata_cache_set(conn, title_id, *metadata)
-        conn.commit()
         return metadata
+    if not upstream_skipped(deadline):
+        metadata_cache_mark_error(conn, title_id)
+    return metadata_cache_get_many(conn, [title_id]).get(title_id, EMPTY_METADATA)
 
 
-def _fetch_ratings(title_id: str, user_agent: str) -> tuple[str | None, str | None]:
-    """Fetch IMDB and Rotten Tomatoes ratings, preferring OMDB over brittle IMDB scraping."""
-    try:
-        payload = _fetch_omdb_title(title_id, user_agent)
-        if payload:
-            imdb_rating, rotten_rating = _parse_omdb_ratings(payload)
-            if imdb_rating or rotten_rating:
-                return imdb_rating, rotten_rating
-    except requests.RequestException:
-        pass
+def _store_ratings(
+    conn: sqlite3.Connection,
+    title_id: str,
+    ratings: tuple[str | None, str | None] | None,
+    deadline: Deadline | None = None,
+) -> tuple[str | None, str | None]:
+    """Cache fetched ratings, or record a failed fetch and fall back to the last known values."""
+    if ratings is not None:
+        rating_cache_set(conn, title_id, *ratings)
+        return ratings
+    if not upstream_skipped(deadline):
+        rating_cache_mark_error(conn, title_id)
+    return rating_cache_get_many(conn, [title_id]).get(title_id, EMPTY_RATINGS)
+
+
+def _flight_wait(deadline: Deadline | None) -> float | None:
+    """Return how long a request may wait on another caller's in-flight fetch."""
+    return deadline.remaining() if deadline is not None else None
+
+
+def _last_known_details(
+    title_id: str,
+) -> tuple[tuple[str | None, str | None], tuple[int | None, int | None, int | None, int | None, str | None]]:
+    """Return whatever ratings and metadata are cached for a title, however old."""
+    with get_db_context() as conn:
+        ratings = rating_cache_get_many(conn, [title_id]).get(title_id, EMPTY_RATINGS)
+        metadata = metadata_cache_get_many(conn, [title_id]).get(title_id, EMPTY_METADATA)
+    return ratings, metadata
 
+
+def _fetch_imdb_rating(
+    title_id: str, user_agent: str, deadline: Deadline | None = None
+) -> tuple[str | None, str | None]:
+    """Scrape the IMDB rating from the title page JSON-LD block."""
     headers = {"User-Agent": user_agent}
-    response = requests.get(IMDB_TITLE_URL.format(title_id=title_id), headers=headers, timeout=10)
+    response = http_get(UPSTREAM_IMDB, IMDB_TITLE_URL.format(title_id=title_id), headers=headers, deadline=deadline)
     response.raise_for_status()
     match = re.search(r'<script type="application/ld\+json">(.*?)</script>', response.text, re.S)
     if not match:
@@ -201,26 +399,255 @@ def _fetch_ratings(title_id: str, user_agent: str) -> tuple[str | None, str | No
     return str(imdb_rating) if imdb_rating is not None else None, None
 
 
-def get_ratings(title_id: str, user_agent: str) -> tuple[str | None, str | None]:
-    """Get ratings for a title, using cache if available."""
+def _fetch_ratings(
+    title_id: str, user_agent: str, payload: dict[str, Any] | None = None, deadline: Deadline | None = None
+) -> tuple[str | None, str | None]:
+    """Fetch IMDB and Rotten Tomatoes ratings, preferring OMDB over brittle IMDB scraping."""
+    try:
+        if payload is None:
+            payload = _fetch_omdb_title(title_id, user_agent, deadline=deadline)
+        if payload:
+            imdb_rating, rotten_rating = _parse_omdb_ratings(payload)
+            if imdb_rating or rotten_rating:
+                return imdb_rating, rotten_rating
+    except requests.RequestException:
+        pass
+    return _fetch_imdb_rating(title_id, user_agent, deadline=deadline)
+
+
+def _count_rating(key: str) -> None:
+    with _rating_stats_lock:
+        _rating_stats[key] += 1
+
+
+def rating_cache_stats() -> dict[str, Any]:
+    """Return rating cache hit counters and background revalidation queue stats."""
+    with _rating_stats_lock:
+        stats: dict[str, Any] = dict(_rating_stats)
+    stats["revalidation"] = _rating_revalidation_pool.stats()
+    return stats
+
+
+def reset_rating_cache_stats() -> None:
+    """Clear rating cache counters (used by tests)."""
+    with _rating_stats_lock:
+        for key in _rating_stats:
+            _rating_stats[key] = 0
+    _rating_revalidation_pool.reset_stats()
+
+
+def _revalidate_ratings(title_id: str, user_agent: str) -> None:
+    """Refresh a stale cached rating in the background."""
+    single_flight(("ratings", title_id), lambda: _load_ratings(title_id, user_agent))
+
+
+def _cached_ratings(
+    conn: sqlite3.Connection, title_id: str, user_agent: str
+) -> tuple[str | None, str | None] | None:
+    """Return a fresh or acceptably stale cached rating (stale-while-revalidate).
+
+    Stale rows are served immediately while a bounded background pool refetches them;
+    rows older than the TTL plus SHOVO_RATING_MAX_STALE count as misses.
+    """
+    return _serve_cached_rating(title_id, user_agent, rating_cache_get_stale(conn, title_id, RATING_MAX_STALE_SECONDS))
+
+
+def _serve_cached_rating(
+    title_id: str, user_agent: str, cached: tuple[tuple[str | None, str | None], bool] | None
+) -> tuple[str | None, str | None] | None:
+    """Count a rating cache lookup and schedule revalidation for stale hits."""
+    if cached is None:
+        _count_rating("misses")
+        return None
+    ratings, is_stale = cached
+    if is_stale:
+        _count_rating("stale_hits")
+        _rating_revalidation_pool.submit(title_id, _revalidate_ratings, title_id, user_agent)
+    else:
+        _count_rating("fresh_hits")
+    return ratings
+
+
+def _load_ratings(
+    title_id: str, user_agent: str, deadline: Deadline | None = None
+) -> tuple[str | None, str | None]:
+    """Fetch and cache ratings unless a concurrent fetch has just cached them."""
     with get_db_context() as conn:
         cached = rating_cache_get(conn, title_id)
         if cached is not None:
             return cached
         try:
-            imdb_rating, rotten_rating = _fetch_ratings(title_id, user_agent)
+            ratings = _fetch_ratings(title_id, user_agent, deadline=deadline)
         except requests.RequestException:
-            imdb_rating, rotten_rating = None, None
-        rating_cache_set(conn, title_id, imdb_rating, rotten_rating)
+            ratings = None
+        ratings = _store_ratings(conn, title_id, ratings, deadline)
         conn.commit()
-        return imdb_rating, rotten_rating
+        return ratings
+
+
+def _fetch_title_details(
+    title_id: str,
+    user_agent: str,
+    normalized_type: str,
+    include_ratings: bool = True,
+    include_metadata: bool = True,
+    deadline: Deadline | None = None,
+) -> tuple[
+    tuple[str | None, str | None] | None,
+    tuple[int | None, int | None, int | None, int | None, str | None] | None,
+]:
+    """Fetch ratings and metadata from a single OMDB payload.
+
+    The IMDB title page is only scraped when OMDB has no ratings. Parts that were
+    not requested or could not be fetched are returned as None.
+    """
+    try:
+        payload: dict[str, Any] | None = _fetch_omdb_title(title_id, user_agent, deadline=deadline)
+    except requests.RequestException:
+        payload = None
+    ratings = None
+    if include_ratings:
+        try:
+            # An empty dict marks OMDB as already consulted, so only the IMDB fallback runs.
+            ratings = _fetch_ratings(title_id, user_agent, payload=payload or {}, deadline=deadline)
+        except requests.RequestException:
+            ratings = None
+    metadata = None
+    if include_metadata and payload is not None:
+        try:
+            metadata = _fetch_metadata(title_id, user_agent, normalized_type, payload=payload, deadline=deadline)
+        except requests.RequestException:
+            metadata = None
+    return ratings, metadata
+
+
+def get_title_details(
+    title_id: str, user_agent: str, normalized_type: str, deadline: Deadline | None = None
+) -> tuple[tuple[str | None, str | None], tuple[int | None, int | None, int | None, int | None, str | None]]:
+    """Get ratings and metadata for a title with at most one OMDB title request.
+
+    Both caches are read with one connection; whatever is missing is fetched from a
+    shared OMDB payload and written back in a single transaction. Concurrent misses
+    for the same title share one fetch. Once the deadline is spent, the last known
+    cached values (or None) are returned for whatever could not be fetched.
+    """
+    with get_db_context() as conn:
+        ratings = _cached_ratings(conn, title_id, user_agent)
+        metadata = metadata_cache_get_no_ttl(conn, title_id)
+    if ratings is not None and metadata is not None:
+        return ratings, metadata
+    try:
+        return _shared_title_details(title_id, user_agent, normalized_type, deadline)
+    except TimeoutError:
+        return _last_known_details(title_id)
 
 
+def get_many_title_details(
+    types: dict[str, str],
+    user_agent: str,
+    deadline: Deadline | None = None,
+    admit: Callable[[int], bool] | None = None,
+) -> tuple[
+    dict[str, tuple[tuple[str | None, str | None], tuple[int | None, int | None, int | None, int | None, str | None]]],
+    list[str],
+]:
+    """Get details for several titles, keyed by title ID with their normalized types.
+
+    Cached titles are answered with one bulk query per cache; misses are fetched
+    concurrently until the deadline. Returns the details found plus the IDs that are
+    still pending because their fetch did not finish or was skipped by the budget.
+    admit, when given, is called with the number of misses before fetching any; if
+    it refuses, nothing is fetched and every miss is pending.
+    """
+    title_ids = list(types)
+    with get_db_context() as conn:
+        cached_ratings = rating_cache_get_stale_many(conn, title_ids, RATING_MAX_STALE_SECONDS)
+        cached_metadata = metadata_cache_get_no_ttl_many(conn, title_ids)
+    details = {}
+    misses = []
+    for title_id in title_ids:
+        ratings = _serve_cached_rating(title_id, user_agent, cached_ratings.get(title_id))
+        metadata = cached_metadata.get(title_id)
+        if ratings is not None and metadata is not None:
+            details[title_id] = (ratings, metadata)
+        else:
+            misses.append(title_id)
+    if misses and admit is not None and not admit(len(misses)):
+        return details, misses
+
+    def fetch(title_id: str) -> Any:
+        # Each title gets its own view of the budget, so a call skipped for one title
+        # does not turn the titles that loaded fine into pending ones.
+        call_deadline = deadline.child() if deadline is not None else None
+        try:
+            loaded = _shared_title_details(title_id, user_agent, types[title_id], call_deadline)
+        except TimeoutError:
+            return None
+        finally:
+            if call_deadline is not None and call_deadline.degraded:
+                deadline.degraded = True
+        # Values returned for skipped calls are last-known fallbacks, not answers.
+        if call_deadline is not None and (call_deadline.degraded or call_deadline.exceeded):
+            return None
+        return loaded
+
+    fetched = bounded_map(fetch, misses, DETAIL_BATCH_WORKERS, timeout=_flight_wait(deadline))
+    pending = []
+    for title_id in misses:
+        if fetched.get(title_id) is None:
+            pending.append(title_id)
+        else:
+            details[title_id] = fetched[title_id]
+    return details, pending
+
+
+def _shared_title_details(
+    title_id: str, user_agent: str, normalized_type: str, deadline: Deadline | None = None
+) -> tuple[tuple[str | None, str | None], tuple[int | None, int | None, int | None, int | None, str | None]]:
+    """Load a title's missing details, sharing the fetch with concurrent callers.
+
+    Raises TimeoutError when the deadline runs out while waiting on another caller.
+    """
+    return single_flight(
+        ("details", title_id),
+        lambda: _load_title_details(title_id, user_agent, normalized_type, deadline),
+        wait_timeout=_flight_wait(deadline),
+    )
+
+
+def _load_title_details(
+    title_id: str, user_agent: str, normalized_type: str, deadline: Deadline | None = None
+) -> tuple[tuple[str | None, str | None], tuple[int | None, int | None, int | None, int | None, str | None]]:
+    """Fetch and cache whatever details are still missing for a title."""
+    with get_db_context() as conn:
+        ratings = rating_cache_get(conn, title_id)
+        metadata = metadata_cache_get_no_ttl(conn, title_id)
+        if ratings is not None and metadata is not None:
+            return ratings, metadata
+        fetched_ratings, fetched_metadata = _fetch_title_details(
+            title_id,
+            user_agent,
+            normalized_type,
+            include_ratings=ratings is None,
+            include_metadata=metadata is None,
+            deadline=deadline,
+        )
+        if ratings is None:
+            ratings = _store_ratings(conn, title_id, fetched_ratings, deadline)
+        if metadata is None:
+            metadata = _store_metadata(conn, title_id, fetched_metadata, deadline)
+        conn.commit()
+        return ratings, metadata
+
 
 def parse_suggestion_item(
     item: dict[str, Any], user_agent: str, include_details: bool = True
 ) -> SearchResult | None:
-    """Parse an IMDB suggestion item into a SearchResult."""
+    """Parse an IMDB suggestion item into a SearchResult.
+
+    Without details nothing is fetched; callers fill cached ratings and metadata for a
+    whole batch of results with enrich_from_cache().
+    """
     title_id = item.get("id")
     if not title_id:
         return None
@@ -233,23 +660,13 @@ def parse_suggestion_item(
     original_language = None
     rating = rotten_tomatoes = None
     if include_details:
-        (
+        (rating, rotten_tomatoes), (
             runtime_minutes,
             total_seasons,
             total_episodes,
             avg_episode_length,
             original_language,
-        ) = get_metadata(title_id, user_agent, normalized_type)
-        rating, rotten_tomatoes = get_ratings(title_id, user_agent)
-    else:
-        # For search results: serve cached data without fetching from external APIs
-        with get_db_context() as conn:
-            cached_meta = metadata_cache_get_no_ttl(conn, title_id)
-            if cached_meta:
-                runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language = cached_meta
-            cached_rating = rating_cache_get_no_ttl(conn, title_id)
-            if cached_rating:
-                rating, rotten_tomatoes = cached_rating
+        ) = get_title_details(title_id, user_agent, normalized_type)
     return SearchResult(
         title_id=title_id,
         title=item.get("l") or "Untitled",
@@ -266,36 +683,213 @@ def parse_suggestion_item(
     )
 
 
-def fetch_suggestions(query: str, user_agent: str) -> list[SearchResult]:
-    """Fetch search suggestions from IMDB."""
+def normalize_query(query: str | None) -> str:
+    """Normalize a search query for upstream requests and cache keys."""
     if not query:
-        return []
-    safe_query = query.strip().lower()
+        return ""
+    return " ".join(query.strip().lower().split())
+
+
+def _count_suggestion(key: str) -> None:
+    with _suggestion_stats_lock:
+        _suggestion_stats[key] += 1
+
+
+def suggestion_cache_stats() -> dict[str, int]:
+    """Return suggestion cache hit/miss counters."""
+    with _suggestion_stats_lock:
+        stats = dict(_suggestion_stats)
+    stats["memory_entries"] = len(_suggestion_memory)
+    return stats
+
+
+def reset_suggestion_cache() -> None:
+    """Clear the in-process suggestion cache and its counters (used by tests)."""
+    _suggestion_memory.clear()
+    with _suggestion_stats_lock:
+        for key in _suggestion_stats:
+            _suggestion_stats[key] = 0
+
+
+def _filter_prefix_items(
+    items: list[dict[str, Any]], query: str, complete_only: bool = True
+) -> list[dict[str, Any]] | None:
+    """Answer a longer query from the cached items of one of its prefixes.
+
+    Only a short (non-truncated) prefix result holds every title the longer query can
+    match; otherwise None is returned and the caller goes to the network. With
+    complete_only=False, matches from a truncated result are returned as a best effort.
+    """
+    if complete_only and len(items) >= IMDB_SUGGESTION_PAGE_SIZE:
+        return None
+    tokens = re.findall(r"[a-z0-9]+", query)
+    if not tokens:
+        return None
+    matches = []
+    for item in items:
+        words = re.findall(r"[a-z0-9]+", f"{item.get('l') or ''} {item.get('s') or ''}".lower())
+        if all(any(word.startswith(token) for word in words) for token in tokens):
+            matches.append(item)
+    return matches or None
+
+
+def _cached_suggestion_items(query: str) -> list[dict[str, Any]] | None:
+    """Look up raw suggestion items in memory, then SQLite, reusing cached prefixes."""
+    items = _suggestion_memory.get(query)
+    if items is not None:
+        _count_suggestion("memory_hits")
+        return items
+    prefixes = [query[:end] for end in range(len(query) - 1, 0, -1)]
+    for prefix in prefixes:
+        prefix_items = _suggestion_memory.get(prefix)
+        filtered = _filter_prefix_items(prefix_items, query) if prefix_items is not None else None
+        if filtered is not None:
+            _count_suggestion("prefix_hits")
+            return filtered
+    with get_db_context() as conn:
+        cached = suggestion_cache_get_many(conn, [query, *prefixes])
+    if query in cached:
+        items, cached_at = cached[query]
+        _suggestion_memory.set(query, items, stored_at=cached_at)
+        _count_suggestion("db_hits")
+        return items
+    for prefix in prefixes:
+        if prefix not in cached:
+            continue
+        prefix_items, cached_at = cached[prefix]
+        _suggestion_memory.set(prefix, prefix_items, stored_at=cached_at)
+        filtered = _filter_prefix_items(prefix_items, query)
+        if filtered is not None:
+            _count_suggestion("prefix_hits")
+            return filtered
+    _count_suggestion("misses")
+    return None
+
+
+def _degraded_suggestion_items(query: str) -> list[dict[str, Any]]:
+    """Best-effort matches from any cached prefix while the suggestion upstream is unavailable."""
+    prefixes = [query[:end] for end in range(len(query) - 1, 0, -1)]
+    with get_db_context() as conn:
+        cached = suggestion_cache_get_many(conn, prefixes)
+    for prefix in prefixes:
+        items = _suggestion_memory.get(prefix)
+        if items is None and prefix in cached:
+            items = cached[prefix][0]
+        matches = _filter_prefix_items(items, query, complete_only=False) if items else None
+        if matches:
+            return matches
+    return []
+
+
+def fetch_suggestions(query: str, user_agent: str, deadline: Deadline | None = None) -> list[SearchResult]:
+    """Fetch search suggestions from IMDB, serving repeated and type-ahead queries from cache.
+
+    While the suggestion upstream's circuit breaker is open, cached prefixes are used
+    as a best effort instead of failing the search.
+    """
+    safe_query = normalize_query(query)
     if not safe_query:
         return []
-    first = safe_query[0]
-    url = IMDB_SUGGESTION_URL.format(first=first, query=requests.utils.quote(safe_query))
-    headers = {"User-Agent": user_agent}
-    response = requests.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
-    payload = response.json()
-    items: Iterable[dict[str, Any]] = payload.get("d", [])
+    items = _cached_suggestion_items(safe_query)
+    if items is None:
+        first = safe_query[0]
+        url = IMDB_SUGGESTION_URL.format(first=first, query=requests.utils.quote(safe_query))
+        headers = {"User-Agent": user_agent}
+        try:
+            response = http_get(UPSTREAM_IMDB_SUGGEST, url, headers=headers, deadline=deadline)
+        except CircuitOpen:
+            items = _degraded_suggestion_items(safe_query)
+        else:
+            response.raise_for_status()
+            payload = response.json()
+            items = [item for item in payload.get("d", []) if isinstance(item, dict)]
+            _suggestion_memory.set(safe_query, items)
+            with get_db_context() as conn:
+                suggestion_cache_set(conn, safe_query, items)
+                conn.commit()
     results: list[SearchResult] = []
     for item in items:
         parsed = parse_suggestion_item(item, user_agent, include_details=False)
         if parsed:
             results.append(parsed)
+    return enrich_from_cache(results)
+
+
+def enrich_from_cache(results: list[SearchResult]) -> list[SearchResult]:
+    """Fill cached ratings and metadata (ignoring TTL) into results using one connection."""
+    if not results:
+        return results
+    title_ids = [result.title_id for result in results]
+    with get_db_context() as conn:
+        cached_metadata = metadata_cache_get_many(conn, title_ids)
+        cached_ratings = rating_cache_get_many(conn, title_ids)
+    for result in results:
+        cached_meta = cached_metadata.get(result.title_id)
+        if cached_meta:
+            (
+                result.runtime_minutes,
+                result.total_seasons,
+                result.total_episodes,
+                result.avg_episode_length,
+                result.original_language,
+            ) = cached_meta
+        cached_rating = cached_ratings.get(result.title_id)
+        if cached_rating:
+            result.rating, result.rotten_tomatoes = cached_rating
     return results
 
 
-def fetch_title_by_id(title_id: str, user_agent: str) -> SearchResult | None:
-    """Fetch a single title by its IMDB ID."""
+def enrich_with_details(
+    results: list[SearchResult], user_agent: str, timeout: float | None = None
+) -> list[SearchResult]:
+    """Fill ratings and metadata into results concurrently, going through the detail caches.
+
+    Each title is loaded with get_title_details, so cached titles cost no upstream call
+    and misses share in-flight fetches. Titles whose details arrived within timeout are
+    marked details_complete so clients skip their per-card /api/details request.
+    """
+    types = {}
+    for result in results:
+        normalized_type = normalize_type_label(result.type_label)
+        types[result.title_id] = normalized_type if normalized_type in ALLOWED_TYPE_LABELS else "movie"
+    details = bounded_map(
+        lambda title_id: get_title_details(title_id, user_agent, types[title_id]),
+        list(types),
+        DETAIL_ENRICH_WORKERS,
+        timeout=timeout,
+    )
+    for result in results:
+        loaded = details.get(result.title_id)
+        if loaded is None:
+            continue
+        (rating, rotten_tomatoes), (
+            runtime_minutes,
+            total_seasons,
+            total_episodes,
+            avg_episode_length,
+            original_language,
+        ) = loaded
+        result.rating = rating or result.rating
+        result.rotten_tomatoes = rotten_tomatoes or result.rotten_tomatoes
+        result.runtime_minutes = runtime_minutes
+        result.total_seasons = total_seasons
+        result.total_episodes = total_episodes
+        result.avg_episode_length = avg_episode_length
+        result.original_language = original_language or result.original_language
+        result.details_complete = True
+    return results
+
+
+def _lookup_title_summary(
+    title_id: str, user_agent: str, deadline: Deadline | None = None
+) -> SearchResult | None:
+    """Look up a single title summary on the IMDB suggestion endpoint, without cache enrichment."""
     if not title_id:
         return None
     first = title_id[0].lower()
     url = IMDB_SUGGESTION_URL.format(first=first, query=requests.utils.quote(title_id))
     headers = {"User-Agent": user_agent}
-    response = requests.get(url, headers=headers, timeout=10)
+    response = http_get(UPSTREAM_IMDB_SUGGEST, url, headers=headers, deadline=deadline)
     response.raise_for_status()
     payload = response.json()
     items: Iterable[dict[str, Any]] = payload.get("d", [])
@@ -305,6 +899,69 @@ def fetch_title_by_id(title_id: str, user_agent: str) -> SearchResult | None:
     return None
 
 
+def _summary_result(title_id: str, summary: tuple[str, str | None, str | None, str | None]) -> SearchResult:
+    """Build an unenriched SearchResult from a cached (title, year, type_label, image) summary."""
+    title, year, type_label, image = summary
+    return SearchResult(
+        title_id=title_id,
+        title=title,
+        year=year,
+        original_language=None,
+        type_label=type_label,
+        image=image,
+        rating=None,
+        rotten_tomatoes=None,
+        runtime_minutes=None,
+        total_seasons=None,
+        total_episodes=None,
+        avg_episode_length=None,
+    )
+
+
+def _title_summaries(
+    title_ids: list[str], user_agent: str, deadline: Deadline | None = None
+) -> dict[str, SearchResult | None]:
+    """Resolve IMDB IDs to unenriched title summaries, checking title_summary_cache first.
+
+    Misses are looked up concurrently and stored, including IDs that do not resolve
+    (mapped to None). IDs whose lookup failed or ran out of time are left out.
+    """
+    with get_db_context() as conn:
+        cached = title_summary_get_many(conn, title_ids)
+    summaries: dict[str, SearchResult | None] = {
+        title_id: _summary_result(title_id, summary) if summary else None for title_id, summary in cached.items()
+    }
+    missing = [title_id for title_id in title_ids if title_id not in summaries]
+    if not missing:
+        return summaries
+    looked_up = bounded_map(
+        lambda title_id: _lookup_title_summary(title_id, user_agent, deadline),
+        missing,
+        TITLE_SUMMARY_WORKERS,
+        timeout=capped_timeout(deadline, TITLE_SUMMARY_DEADLINE_SECONDS),
+    )
+    if looked_up:
+        with get_db_context() as conn:
+            title_summary_set_many(
+                conn,
+                {
+                    title_id: (result.title, result.year, result.type_label, result.image) if result else None
+                    for title_id, result in looked_up.items()
+                },
+            )
+            conn.commit()
+    summaries.update(looked_up)
+    return summaries
+
+
+def fetch_title_by_id(title_id: str, user_agent: str) -> SearchResult | None:
+    """Fetch a single title by its IMDB ID, served from title_summary_cache when known."""
+    result = _title_summaries([title_id], user_agent).get(title_id)
+    if result is None:
+        return None
+    return enrich_from_cache([result])[0]
+
+
 def _tmdb_headers(user_agent: str) -> dict[str, str]:
     """Build headers for TMDB API requests."""
     headers = {"User-Agent": user_agent, "Accept": "application/json"}
@@ -323,15 +980,18 @@ def _tmdb_is_configured() -> bool:
     return bool(TMDB_ACCESS_TOKEN or TMDB_API_KEY)
 
 
-def _fetch_tmdb_imdb_id(tmdb_id: int, media_type: str, user_agent: str) -> str | None:
+def _fetch_tmdb_imdb_id(
+    tmdb_id: int, media_type: str, user_agent: str, deadline: Deadline | None = None
+) -> str | None:
     """Fetch the IMDB ID for a TMDB movie or TV result."""
     if media_type not in {"movie", "tv"}:
         return None
-    response = requests.get(
+    response = http_get(
+        UPSTREAM_TMDB,
         TMDB_EXTERNAL_IDS_URL.format(media_type=media_type, tmdb_id=tmdb_id),
         headers=_tmdb_headers(user_agent),
         params=_tmdb_params(),
-        timeout=10,
+        deadline=deadline,
     )
     response.raise_for_status()
     imdb_id = response.json().get("imdb_id")
@@ -360,16 +1020,49 @@ def _parse_tmdb_rating(item: dict[str, Any]) -> str | None:
     return f"{rating:.1f}"
 
 
-def _parse_tmdb_item(item: dict[str, Any], user_agent: str) -> SearchResult | None:
-    """Parse a TMDB trending item into a SearchResult."""
+def _resolve_tmdb_imdb_ids(
+    keys: list[tuple[str, int]], user_agent: str, deadline: Deadline | None = None
+) -> dict[tuple[str, int], str | None]:
+    """Map (media_type, tmdb_id) keys to IMDB IDs, checking tmdb_external_ids first.
+
+    Cache misses are resolved concurrently and stored; failed lookups are left out.
+    """
+    with get_db_context() as conn:
+        imdb_ids = tmdb_external_ids_get_many(conn, keys)
+    missing = [key for key in keys if key not in imdb_ids]
+    if not missing:
+        return imdb_ids
+
+    def _resolve(key: tuple[str, int]) -> str | None:
+        media_type, tmdb_id = key
+        return _fetch_tmdb_imdb_id(tmdb_id, media_type, user_agent, deadline=deadline)
+
+    resolved = bounded_map(
+        _resolve, missing, TMDB_LOOKUP_WORKERS, timeout=capped_timeout(deadline, TMDB_LOOKUP_DEADLINE_SECONDS)
+    )
+    if resolved:
+        with get_db_context() as conn:
+            tmdb_external_ids_set_many(conn, resolved)
+            conn.commit()
+    imdb_ids.update(resolved)
+    return imdb_ids
+
+
+def _tmdb_item_key(item: dict[str, Any]) -> tuple[str, int] | None:
+    """Return the (media_type, tmdb_id) key of a TMDB movie or TV result."""
     media_type = item.get("media_type")
     if media_type not in {"movie", "tv"}:
         return None
     tmdb_id = item.get("id")
     if not isinstance(tmdb_id, int):
         return None
-    imdb_id = _fetch_tmdb_imdb_id(tmdb_id, media_type, user_agent)
-    if not imdb_id:
+    return media_type, tmdb_id
+
+
+def _parse_tmdb_item(item: dict[str, Any], imdb_id: str | None) -> SearchResult | None:
+    """Parse a TMDB trending item with its resolved IMDB ID into a SearchResult."""
+    media_type = item.get("media_type")
+    if media_type not in {"movie", "tv"} or not imdb_id:
         return None
     title = item.get("title") or item.get("name") or "Untitled"
     type_label = "movie" if media_type == "movie" else "tvseries"
@@ -389,85 +1082,115 @@ def _parse_tmdb_item(item: dict[str, Any], user_agent: str) -> SearchResult | No
     )
 
 
-def fetch_tmdb_trending(user_agent: str) -> list[SearchResult]:
+def fetch_tmdb_trending(user_agent: str, deadline: Deadline | None = None) -> list[SearchResult]:
     """Fetch real trending titles from TMDB."""
     if not _tmdb_is_configured():
         return []
-    response = requests.get(
+    response = http_get(
+        UPSTREAM_TMDB,
         TMDB_TRENDING_URL,
         headers=_tmdb_headers(user_agent),
         params={**_tmdb_params(), "language": "en-US"},
-        timeout=10,
+        deadline=deadline,
     )
     response.raise_for_status()
+    candidates = [
+        item
+        for item in response.json().get("results", [])
+        if not item.get("adult") and _tmdb_item_key(item) is not None
+    ]
     results: list[SearchResult] = []
-    for item in response.json().get("results", []):
-        if item.get("adult"):
-            continue
-        parsed = _parse_tmdb_item(item, user_agent)
-        if parsed:
-            results.append(parsed)
-        if len(results) >= MAX_RESULTS:
-            break
+    offset = 0
+    # Resolve only as many IDs as still needed, topping up when some have no IMDB ID.
+    while len(results) < MAX_RESULTS and offset < len(candidates) and not deadline_expired(deadline):
+        batch = candidates[offset : offset + MAX_RESULTS - len(results)]
+        offset += len(batch)
+        imdb_ids = _resolve_tmdb_imdb_ids([_tmdb_item_key(item) for item in batch], user_agent, deadline)
+        for item in batch:
+            parsed = _parse_tmdb_item(item, imdb_ids.get(_tmdb_item_key(item)))
+            if parsed:
+                results.append(parsed)
     return results
 
 
-def _titles_from_ids(title_ids: Iterable[str], user_agent: str) -> list[SearchResult]:
-    """Fetch title summaries for a list of IMDB IDs."""
-    seen: set[str] = set()
+def _titles_from_ids(
+    title_ids: Iterable[str], user_agent: str, deadline: Deadline | None = None
+) -> list[SearchResult]:
+    """Fetch the first MAX_RESULTS resolvable title summaries for a list of IMDB IDs.
+
+    IDs are resolved in order-preserving batches sized to the results still needed,
+    so a cold start costs about MAX_RESULTS concurrent lookups rather than one per ID.
+    """
+    unique = list(dict.fromkeys(title_ids))
     results: list[SearchResult] = []
-    for title_id in title_ids:
-        if title_id in seen:
-            continue
-        seen.add(title_id)
-        result = fetch_title_by_id(title_id, user_agent)
-        if result:
-            results.append(result)
-        if len(results) >= MAX_RESULTS:
-            break
-    return results
+    offset = 0
+    while len(results) < MAX_RESULTS and offset < len(unique) and not deadline_expired(deadline):
+        batch = unique[offset : offset + MAX_RESULTS - len(results)]
+        offset += len(batch)
+        summaries = _title_summaries(batch, user_agent, deadline)
+        for title_id in batch:
+            summary = summaries.get(title_id)
+            if summary is not None:
+                results.append(summary)
+    return enrich_from_cache(results)
 
 
-def fetch_trending(user_agent: str) -> list[SearchResult]:
+def fetch_trending(user_agent: str, deadline: Deadline | None = None) -> list[SearchResult]:
     """Fetch real trending titles, preferring TMDB and falling back to IMDB/static IDs."""
-    tmdb_results = fetch_tmdb_trending(user_agent)
+    tmdb_results = fetch_tmdb_trending(user_agent, deadline)
     if tmdb_results:
         return tmdb_results
 
     headers = {"User-Agent": user_agent}
-    response = requests.get(IMDB_TRENDING_URL, headers=headers, timeout=10)
+    response = http_get(UPSTREAM_IMDB, IMDB_TRENDING_URL, headers=headers, deadline=deadline)
     response.raise_for_status()
     ids = re.findall(r"/title/(tt\d+)/", response.text)
-    results = _titles_from_ids(ids, user_agent)
+    results = _titles_from_ids(ids, user_agent, deadline)
     if results:
         return results
-    return _titles_from_ids(DEFAULT_TRENDING_TITLE_IDS, user_agent)
+    return _titles_from_ids(DEFAULT_TRENDING_TITLE_IDS, user_agent, deadline)
 
 
-def refresh_title_details(
+def fetch_title_details(
     title_id: str, user_agent: str, normalized_type: str
+) -> tuple[
+    tuple[str | None, str | None] | None,
+    tuple[int | None, int | None, int | None, int | None, str | None] | None,
+]:
+    """Fetch ratings and metadata from upstream without touching the caches; failed parts are None."""
+    return _fetch_title_details(title_id, user_agent, normalized_type)
+
+
+def store_title_details(
+    conn: sqlite3.Connection,
+    title_id: str,
+    ratings: tuple[str | None, str | None] | None,
+    metadata: tuple[int | None, int | None, int | None, int | None, str | None] | None,
 ) -> tuple[str | None, str | None, int | None, int | None, int | None, int | None, str | None]:
-    """Refresh details for a title (ratings and metadata)."""
-    try:
-        imdb_rating, rotten_rating = _fetch_ratings(title_id, user_agent)
-    except requests.RequestException:
-        imdb_rating, rotten_rating = None, None
-    try:
-        (
-            runtime_minutes,
-            total_seasons,
-            total_episodes,
-            avg_episode_length,
-            original_language,
-        ) = _fetch_metadata(title_id, user_agent, normalized_type)
-    except requests.RequestException:
-        runtime_minutes = total_seasons = total_episodes = avg_episode_length = original_language = None
-    with get_db_context() as conn:
-        rating_cache_set(conn, title_id, imdb_rating, rotten_rating)
-        metadata_cache_set(
-            conn, title_id, runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language
-        )
-        conn.commit()
+    """Write fetched details to both caches and the shared titles row (without committing).
+
+    Every room listing the title sees the new values once the caller commits. Parts
+    that failed to fetch are recorded as errors and keep their last known values.
+    """
+    imdb_rating, rotten_rating = _store_ratings(conn, title_id, ratings)
+    (
+        runtime_minutes,
+        total_seasons,
+        total_episodes,
+        avg_episode_length,
+        original_language,
+    ) = _store_metadata(conn, title_id, metadata)
+    title_set_details(
+        conn,
+        title_id,
+        imdb_rating,
+        rotten_rating,
+        runtime_minutes,
+        total_seasons,
+        total_episodes,
+        avg_episode_length,
+        original_language,
+    )
     return (
         imdb_rating,
         rotten_rating,
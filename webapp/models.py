@@ -17,3 +17,4 @@ class SearchResult:
     total_seasons: int | None
     total_episodes: int | None
     avg_episode_length: int | None
+    details_complete: bool = False
@@ -0,0 +1,105 @@
+"""Token-bucket budgets for upstream API calls, shared by all threads and uWSGI processes."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Any
+
+# Support both package and standalone imports
+try:
+    from .database import get_db_context, quota_get_all, quota_take
+    from .utils import env_float
+except ImportError:
+    from database import get_db_context, quota_get_all, quota_take
+    from utils import env_float
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+# (tokens per second, burst) for upstreams with API keys; others are unlimited unless configured.
+DEFAULT_LIMITS: dict[str, tuple[float, float]] = {"omdb": (2.0, 20.0), "tmdb": (20.0, 40.0)}
+BACKGROUND_RESERVE = env_float("SHOVO_QUOTA_BACKGROUND_RESERVE", 0.25, minimum=0.0)
+INTERACTIVE_MAX_WAIT_SECONDS = env_float("SHOVO_QUOTA_INTERACTIVE_MAX_WAIT", 1.0, minimum=0.0)
+BACKGROUND_MAX_WAIT_SECONDS = env_float("SHOVO_QUOTA_BACKGROUND_MAX_WAIT", 30.0, minimum=0.0)
+
+_lock = threading.Lock()
+_stats = {"waits": 0, "rejected": 0}
+
+
+def quota_limits(upstream: str) -> tuple[float, float] | None:
+    """Return (rate, burst) for an upstream, e.g. SHOVO_QUOTA_OMDB_RATE / SHOVO_QUOTA_OMDB_BURST.
+
+    A rate of 0 disables budgeting for that upstream.
+    """
+    default_rate, default_burst = DEFAULT_LIMITS.get(upstream, (0.0, 1.0))
+    name = upstream.upper()
+    rate = env_float(f"SHOVO_QUOTA_{name}_RATE", default_rate, minimum=0.0)
+    if rate <= 0:
+        return None
+    burst = env_float(f"SHOVO_QUOTA_{name}_BURST", default_burst, minimum=1.0)
+    return rate, burst
+
+
+def acquire(upstream: str, priority: str, max_wait: float) -> bool:
+    """Take a token for one upstream call, waiting up to max_wait seconds for a refill.
+
+    Background calls may not dip into the last SHOVO_QUOTA_BACKGROUND_RESERVE share of
+    the bucket, so interactive requests still find tokens while a large refresh runs.
+    """
+    limits = quota_limits(upstream)
+    if limits is None:
+        return True
+    rate, burst = limits
+    floor = burst * BACKGROUND_RESERVE if priority == PRIORITY_BACKGROUND else 0.0
+    give_up_at = time.monotonic() + max_wait
+    first_attempt = True
+    while True:
+        try:
+            with get_db_context() as conn:
+                wait = quota_take(conn, upstream, rate, burst, floor, count_throttle=first_attempt)
+                conn.commit()
+        except sqlite3.Error:
+            # A locked or missing quota table must never block upstream calls.
+            return True
+        if wait == 0:
+            return True
+        if first_attempt:
+            first_attempt = False
+            with _lock:
+                _stats["waits"] += 1
+        if time.monotonic() + wait > give_up_at:
+            with _lock:
+                _stats["rejected"] += 1
+            return False
+        time.sleep(wait)
+
+
+def quota_stats() -> dict[str, Any]:
+    """Return shared bucket state per budgeted upstream plus this process's wait counters."""
+    with get_db_context() as conn:
+        rows = quota_get_all(conn)
+    now = time.time()
+    upstreams: dict[str, Any] = {}
+    for upstream, row in rows.items():
+        limits = quota_limits(upstream)
+        if limits is None:
+            continue
+        rate, burst = limits
+        upstreams[upstream] = {
+            "remaining": round(min(burst, row["tokens"] + max(now - row["updated_at"], 0) * rate), 2),
+            "rate": rate,
+            "burst": burst,
+            "granted": row["granted"],
+            "throttled": row["throttled"],
+        }
+    with _lock:
+        stats: dict[str, Any] = dict(_stats)
+    stats["upstreams"] = upstreams
+    return stats
+
+
+def reset_quota_stats() -> None:
+    """Clear process-local quota counters (used by tests)."""
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,416 @@
+"""Room refresh jobs, stored in SQLite and run on a bounded pool that fetches each title once.
+
+A refresh request queues a job row; whichever process claims its lease (a web
+process, or the standalone worker in worker.py) fetches the titles. Progress is
+written together with the fetched details, so any process can report it and a
+job whose owner died resumes from the first unfinished title.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import secrets
+import socket
+import threading
+import time
+from typing import Any
+
+# Support both package and standalone imports
+try:
+    from .database import (
+        REFRESH_JOB_DONE,
+        REFRESH_JOB_QUEUED,
+        get_db_context,
+        refresh_job_claim,
+        refresh_job_collect,
+        refresh_job_counts,
+        refresh_job_create,
+        refresh_job_get,
+        refresh_job_mark_done,
+        refresh_job_pending_titles,
+        refresh_job_renew,
+        title_refreshed_since,
+        title_sync_from_caches,
+    )
+    from .external_api import ALLOWED_TYPE_LABELS, fetch_title_details, normalize_type_label, store_title_details
+    from .utils import env_flag, env_float, env_int
+    from .workers import BackgroundPool
+except ImportError:
+    from database import (
+        REFRESH_JOB_DONE,
+        REFRESH_JOB_QUEUED,
+        get_db_context,
+        refresh_job_claim,
+        refresh_job_collect,
+        refresh_job_counts,
+        refresh_job_create,
+        refresh_job_get,
+        refresh_job_mark_done,
+        refresh_job_pending_titles,
+        refresh_job_renew,
+        title_refreshed_since,
+        title_sync_from_caches,
+    )
+    from external_api import ALLOWED_TYPE_LABELS, fetch_title_details, normalize_type_label, store_title_details
+    from utils import env_flag, env_float, env_int
+    from workers import BackgroundPool
+
+REFRESH_WORKERS = env_int("SHOVO_REFRESH_WORKERS", 4, minimum=1)
+REFRESH_QUEUE = env_int("SHOVO_REFRESH_QUEUE", 5000, minimum=1)
+REFRESH_BATCH_SIZE = env_int("SHOVO_REFRESH_BATCH_SIZE", 25, minimum=1)
+# Fetched titles are written (with job progress) once this old, even if their batch is not full.
+REFRESH_PROGRESS_SECONDS = env_float("SHOVO_REFRESH_PROGRESS_INTERVAL", 1.0, minimum=0.01)
+# Titles whose ratings and metadata were both fetched this recently are not fetched again.
+REFRESH_MIN_AGE_SECONDS = env_int("SHOVO_REFRESH_MIN_AGE", 15 * 60, minimum=0)
+# Web processes run queued jobs themselves unless the standalone worker does.
+REFRESH_IN_PROCESS = env_flag("SHOVO_REFRESH_IN_PROCESS", True)
+REFRESH_LEASE_TTL_SECONDS = env_float("SHOVO_REFRESH_LEASE_TTL", 60.0, minimum=5.0)
+REFRESH_POLL_SECONDS = env_float("SHOVO_REFRESH_POLL", 1.0, minimum=0.01)
+REFRESH_JOB_RETENTION_SECONDS = env_int("SHOVO_REFRESH_JOB_RETENTION", 60 * 60 * 24, minimum=60)
+COLLECT_INTERVAL_SECONDS = 300
+
+_lock = threading.Lock()
+_wake = threading.Event()
+# Notified whenever this process stores job progress, so progress streams push it at once.
+_progress = threading.Condition()
+_pid = 0
+# Rooms waiting for each queued title; a title queued by several jobs is fetched once.
+_waiting: dict[str, set[str]] = {}
+# Fetched details waiting to be written together: (title_id, (ratings, metadata) or None).
+_fetched: list[tuple[str, Any]] = []
+# When the oldest entry of _fetched arrived, and the timer that writes it if nothing else does.
+_flush = {"since": 0.0, "timer": None}
+_queued = 0
+# Titles are de-duplicated in _waiting, so every pool submission gets its own key: a
+# title queued again while its previous fetch is still settling must not be dropped.
+_submissions = itertools.count()
+# Jobs whose lease this process holds: room -> owner, user agent and last renewal.
+_owned: dict[str, dict[str, Any]] = {}
+_supervisor = {"running": False, "wakeups": 0, "collected_at": 0.0, "thread": None}
+_stats = {
+    "claimed": 0,
+    "fetched": 0,
+    "skipped_fresh": 0,
+    "shared": 0,
+    "deferred": 0,
+    "batches": 0,
+    "collected": 0,
+}
+_pool = BackgroundPool("shovo-room-refresh", max_workers=REFRESH_WORKERS, max_pending=REFRESH_QUEUE)
+
+
+def _forget_parent_work() -> None:
+    """Drop work from a parent process; its threads do not exist after a fork."""
+    global _pid, _queued
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        _waiting.clear()
+        _fetched.clear()
+        _owned.clear()
+        _queued = 0
+        _supervisor["running"] = False
+        _flush["timer"] = None
+
+
+def _take_batch() -> list[tuple[str, Any]]:
+    """Return the fetched details to write once a batch is full, nothing else is being
+    fetched or the oldest title has waited REFRESH_PROGRESS_SECONDS.
+
+    Otherwise a timer is started to write them, so job progress never lags far behind.
+    """
+    with _lock:
+        if not _fetched:
+            return []
+        due = time.monotonic() - _flush["since"] >= REFRESH_PROGRESS_SECONDS
+        if len(_fetched) < REFRESH_BATCH_SIZE and _queued > 0 and not due:
+            if _flush["timer"] is None:
+                timer = _flush["timer"] = threading.Timer(REFRESH_PROGRESS_SECONDS, _flush_due)
+                timer.daemon = True
+                timer.start()
+            return []
+        batch = list(_fetched)
+        _fetched.clear()
+        _stats["batches"] += 1
+    return batch
+
+
+def _flush_due() -> None:
+    with _lock:
+        _flush["timer"] = None
+    _write_batch(_take_batch())
+
+
+def _write_batch(batch: list[tuple[str, Any]]) -> None:
+    """Store a batch of titles and the progress of every job waiting on them in one transaction."""
+    if not batch:
+        return
+    rooms: dict[str, list[str]] = {}
+    with _lock:
+        for title_id, _ in batch:
+            for room in _waiting.pop(title_id, ()):
+                rooms.setdefault(room, []).append(title_id)
+    with get_db_context() as conn:
+        for title_id, details in batch:
+            if details is not None:
+                store_title_details(conn, title_id, *details)
+        for room, title_ids in rooms.items():
+            refresh_job_mark_done(conn, room, title_ids)
+        conn.commit()
+    _notify_progress()
+
+
+def _notify_progress() -> None:
+    with _progress:
+        _progress.notify_all()
+
+
+def wait_for_refresh_progress(timeout: float) -> None:
+    """Block until this process stores refresh progress, or for at most timeout seconds.
+
+    Progress written by other processes is only seen by re-reading after the timeout.
+    """
+    with _progress:
+        _progress.wait(timeout)
+
+
+def _settle(title_id: str, details: Any) -> None:
+    global _queued
+    with _lock:
+        _queued -= 1
+        if not _fetched:
+            _flush["since"] = time.monotonic()
+        _fetched.append((title_id, details))
+    _write_batch(_take_batch())
+
+
+def _fetch(title_id: str, normalized_type: str, user_agent: str) -> None:
+    try:
+        details = fetch_title_details(title_id, user_agent, normalized_type)
+    except Exception:
+        # Count the title as processed instead of leaving its jobs unfinished.
+        _settle(title_id, None)
+        raise
+    with _lock:
+        _stats["fetched"] += 1
+    _settle(title_id, details)
+
+
+def _queue_titles(room: str, titles: list[tuple[str, str | None]], user_agent: str) -> None:
+    """Queue a job's unfinished titles, sharing those another job already queued."""
+    global _queued
+    submit = []
+    with _lock:
+        for title_id, type_label in titles:
+            if title_id in _waiting:
+                _waiting[title_id].add(room)
+                _stats["shared"] += 1
+                continue
+            normalized_type = normalize_type_label(type_label)
+            if normalized_type not in ALLOWED_TYPE_LABELS:
+                normalized_type = "movie"
+            _waiting[title_id] = {room}
+            submit.append((title_id, normalized_type))
+        _queued += len(submit)
+    rejected = [
+        title_id
+        for title_id, normalized_type in submit
+        if not _pool.submit((title_id, next(_submissions)), _fetch, title_id, normalized_type, user_agent)
+    ]
+    if rejected:
+        # Queue full: the titles stay unfinished in their jobs, which queue them again
+        # from _tend_owned_jobs once nothing else of theirs is in flight.
+        with _lock:
+            _queued -= len(rejected)
+            for title_id in rejected:
+                _waiting.pop(title_id, None)
+            _stats["deferred"] += len(rejected)
+        _write_batch(_take_batch())
+
+
+def _tend_owned_jobs() -> None:
+    """Renew leases on jobs run here, and requeue titles of jobs with nothing left in flight.
+
+    Jobs that finished, or whose lease another process took over, are dropped.
+    """
+    now = time.monotonic()
+    with _lock:
+        busy = set().union(*_waiting.values())
+        owned = {room: dict(job) for room, job in _owned.items()}
+    for room, job in owned.items():
+        idle = room not in busy
+        if not idle and now - job["renewed_at"] < REFRESH_LEASE_TTL_SECONDS / 3:
+            continue
+        pending: list[tuple[str, str | None]] = []
+        with get_db_context() as conn:
+            renewed = refresh_job_renew(conn, room, job["owner"], REFRESH_LEASE_TTL_SECONDS)
+            if renewed and idle:
+                pending = refresh_job_pending_titles(conn, room)
+                if not pending:
+                    refresh_job_mark_done(conn, room, [])
+            conn.commit()
+        with _lock:
+            if not renewed or (idle and not pending):
+                _owned.pop(room, None)
+                continue
+            if room in _owned:
+                _owned[room]["renewed_at"] = now
+        if pending:
+            _queue_titles(room, pending, job["user_agent"])
+
+
+def _claim_jobs() -> None:
+    """Claim every queued job, and running jobs whose owner stopped renewing the lease."""
+    while True:
+        owner = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        with get_db_context() as conn:
+            room = refresh_job_claim(conn, owner, REFRESH_LEASE_TTL_SECONDS)
+            conn.commit()
+            if room is None:
+                return
+            job = refresh_job_get(conn, room)
+            pending = refresh_job_pending_titles(conn, room)
+        user_agent = (job["user_agent"] if job is not None else None) or ""
+        with _lock:
+            _owned[room] = {"owner": owner, "user_agent": user_agent, "renewed_at": time.monotonic()}
+            _stats["claimed"] += 1
+        # Claimed jobs without pending titles are finished by the next _tend_owned_jobs.
+        _queue_titles(room, pending, user_agent)
+
+
+def _collect_stale_jobs() -> None:
+    with _lock:
+        if time.monotonic() - _supervisor["collected_at"] < COLLECT_INTERVAL_SECONDS:
+            return
+        _supervisor["collected_at"] = time.monotonic()
+    with get_db_context() as conn:
+        collected = refresh_job_collect(conn, int(time.time()) - REFRESH_JOB_RETENTION_SECONDS)
+        conn.commit()
+    with _lock:
+        _stats["collected"] += collected
+
+
+def run_jobs_once() -> None:
+    """Tend jobs owned here, claim available ones and garbage-collect stale ones."""
+    with _lock:
+        _forget_parent_work()
+    _tend_owned_jobs()
+    _claim_jobs()
+    _collect_stale_jobs()
+
+
+def run_refresh_worker(stop: threading.Event | None = None) -> None:
+    """Run refresh jobs until stop is set; the main loop of the standalone worker."""
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        run_jobs_once()
+        stop.wait(REFRESH_POLL_SECONDS)
+
+
+def _supervise() -> None:
+    """Run jobs on a web process thread until it owns none and nobody asked for more."""
+    try:
+        while True:
+            with _lock:
+                wakeups = _supervisor["wakeups"]
+            run_jobs_once()
+            with _lock:
+                if not _owned and _supervisor["wakeups"] == wakeups:
+                    _supervisor["running"] = False
+                    return
+            _wake.wait(REFRESH_POLL_SECONDS)
+            _wake.clear()
+    except BaseException:
+        with _lock:
+            _supervisor["running"] = False
+        raise
+
+
+def wake_supervisor() -> None:
+    """Have this process look for claimable jobs, starting its supervisor thread if needed."""
+    with _lock:
+        _forget_parent_work()
+        _supervisor["wakeups"] += 1
+        _wake.set()
+        if _supervisor["running"]:
+            return
+        _supervisor["running"] = True
+        thread = _supervisor["thread"] = threading.Thread(target=_supervise, name="shovo-refresh-jobs", daemon=True)
+    thread.start()
+
+
+def enqueue_room_refresh(room: str, user_agent: str) -> int | None:
+    """Queue a refresh job for every title in a room and return how many it lists.
+
+    Titles refreshed within REFRESH_MIN_AGE_SECONDS are copied from the caches and
+    count as processed straight away. Returns None while the room's previous job is
+    still queued or running.
+    """
+    with get_db_context() as conn:
+        title_ids = [
+            row["title_id"]
+            for row in conn.execute(
+                "SELECT lists.title_id FROM lists JOIN titles ON titles.title_id = lists.title_id WHERE lists.room = ?",
+                (room,),
+            )
+        ]
+        fresh: set[str] = set()
+        if REFRESH_MIN_AGE_SECONDS:
+            fresh = title_refreshed_since(conn, title_ids, int(time.time()) - REFRESH_MIN_AGE_SECONDS)
+        if not refresh_job_create(conn, room, user_agent, title_ids, fresh):
+            conn.rollback()
+            return None
+        if fresh:
+            title_sync_from_caches(conn, sorted(fresh))
+        conn.commit()
+    _notify_progress()
+    with _lock:
+        _stats["skipped_fresh"] += len(fresh)
+    if REFRESH_IN_PROCESS:
+        wake_supervisor()
+    return len(title_ids)
+
+
+def room_refresh_status(room: str) -> dict[str, int | bool]:
+    """Return a room's refresh progress as stored by whichever process runs the job."""
+    with get_db_context() as conn:
+        job = refresh_job_get(conn, room)
+    if job is None:
+        return {"refreshing": False, "processed": 0, "total": 0}
+    refreshing = job["status"] != REFRESH_JOB_DONE
+    if REFRESH_IN_PROCESS and refreshing and (
+        job["status"] == REFRESH_JOB_QUEUED or job["lease_expires_at"] < time.time()
+    ):
+        # Nobody runs the job (its owner restarted); resume it here.
+        wake_supervisor()
+    return {"refreshing": refreshing, "processed": int(job["processed"]), "total": int(job["total"])}
+
+
+def refresh_stats() -> dict[str, Any]:
+    """Return refresh counters, jobs per status and the pool's queue state."""
+    with get_db_context() as conn:
+        jobs = refresh_job_counts(conn)
+    with _lock:
+        stats: dict[str, Any] = dict(_stats)
+        stats["queued_titles"] = len(_waiting)
+        stats["owned_jobs"] = len(_owned)
+    stats["jobs"] = jobs
+    stats["pool"] = _pool.stats()
+    return stats
+
+
+def reset_refresh_state() -> None:
+    """Forget jobs owned here, wait for the supervisor to stop and clear counters (used by tests)."""
+    with _lock:
+        _owned.clear()
+        thread = _supervisor["thread"]
+        if _flush["timer"] is not None:
+            _flush["timer"].cancel()
+            _flush["timer"] = None
+    if thread is not None and thread is not threading.current_thread():
+        _wake.set()
+        thread.join(5)
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
+        _supervisor["collected_at"] = 0.0
+    _pool.reset_stats()
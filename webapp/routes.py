@@ -1,29 +1,61 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import json
+import os
 import secrets
 import threading
 import time
 from typing import Any
 
 import requests
-from flask import Blueprint, jsonify, redirect, render_template, request, session
+from flask import Blueprint, Response, jsonify, redirect, render_template, request, session
 from werkzeug.security import check_password_hash, generate_password_hash
 
 # Support both package and standalone imports
 try:
-    from .database import get_db, get_db_context
+    from .database import (
+        POSITION_GAP,
+        TITLE_COLUMNS,
+        cache_state_counts,
+        close_db,
+        compact_positions,
+        db_pool_stats,
+        get_db,
+        get_db_context,
+        position_slot,
+        refresh_job_delete,
+        refresh_job_rename,
+        title_insert,
+        title_prune,
+    )
     from .external_api import (
         ALLOWED_TYPE_LABELS,
+        DETAIL_BATCH_MAX_TITLES,
         MAX_RESULTS,
         fetch_suggestions,
-        fetch_trending,
-        get_metadata,
-        get_ratings,
+        get_many_title_details,
+        get_title_details,
         normalize_type_label,
-        refresh_title_details,
+        rating_cache_stats,
+        suggestion_cache_stats,
+    )
+    from .quota import quota_stats
+    from .refresh import (
+        enqueue_room_refresh,
+        refresh_stats,
+        room_refresh_status,
+        wait_for_refresh_progress,
     )
+    from .singleflight import single_flight_stats
+    from .trending import ensure_trending_preload, get_trending, trending_stats
+    from .upstream import Deadline, breaker_stats, upstream_stats
+    from .workers import BackgroundPool
     from .utils import (
         default_room,
+        env_float,
+        env_int,
         parse_watched,
         request_user_agent,
         room_from_request,
@@ -31,19 +63,47 @@ try:
         serialize_result,
     )
 except ImportError:
-    from database import get_db, get_db_context
+    from database import (
+        POSITION_GAP,
+        TITLE_COLUMNS,
+        cache_state_counts,
+        close_db,
+        compact_positions,
+        db_pool_stats,
+        get_db,
+        get_db_context,
+        position_slot,
+        refresh_job_delete,
+        refresh_job_rename,
+        title_insert,
+        title_prune,
+    )
     from external_api import (
         ALLOWED_TYPE_LABELS,
+        DETAIL_BATCH_MAX_TITLES,
         MAX_RESULTS,
         fetch_suggestions,
-        fetch_trending,
-        get_metadata,
-        get_ratings,
+        get_many_title_details,
+        get_title_details,
         normalize_type_label,
-        refresh_title_details,
+        rating_cache_stats,
+        suggestion_cache_stats,
+    )
+    from quota import quota_stats
+    from refresh import (
+        enqueue_room_refresh,
+        refresh_stats,
+        room_refresh_status,
+        wait_for_refresh_progress,
     )
+    from singleflight import single_flight_stats
+    from trending import ensure_trending_preload, get_trending, trending_stats
+    from upstream import Deadline, breaker_stats, upstream_stats
+    from workers import BackgroundPool
     from utils import (
         default_room,
+        env_float,
+        env_int,
         parse_watched,
         request_user_agent,
         room_from_request,
@@ -51,19 +111,40 @@ except ImportError:
         serialize_result,
     )
 
-APP_VERSION = "1.6.74"
+APP_VERSION = "1.6.99"
 DEFAULT_ROOM_COOKIE = "shovo_default_room"
-TRENDING_TTL_SECONDS = 60 * 60
 CSRF_HEADER = "X-CSRF-Token"
+STATS_TOKEN_HEADER = "X-Stats-Token"
+# Latency budgets per endpoint; all stay well below uWSGI's harakiri timeout.
+ENDPOINT_SLO_SECONDS = {
+    "search": env_float("SHOVO_SLO_SEARCH", 5.0, minimum=0.5),
+    "details": env_float("SHOVO_SLO_DETAILS", 8.0, minimum=0.5),
+    "trending": env_float("SHOVO_SLO_TRENDING", 15.0, minimum=0.5),
+}
+LIST_MAX_PER_PAGE = env_int("SHOVO_LIST_MAX_PER_PAGE", 100, minimum=1)
+# Refresh progress streams hold a uWSGI thread each, so only a few may be open per process
+# and each ends before harakiri; browsers reconnect with Last-Event-ID after REFRESH_STREAM_RETRY_MS.
+REFRESH_STREAM_MAX = env_int("SHOVO_REFRESH_STREAM_MAX", 2, minimum=0)
+REFRESH_STREAM_SECONDS = env_float("SHOVO_REFRESH_STREAM_SECONDS", 20.0, minimum=1.0)
+REFRESH_STREAM_HEARTBEAT_SECONDS = env_float("SHOVO_REFRESH_STREAM_HEARTBEAT", 10.0, minimum=0.5)
+REFRESH_STREAM_POLL_SECONDS = 0.5
+REFRESH_STREAM_RETRY_MS = 1000
+# Moves that leave fewer free positions than this between neighbours trigger a compaction.
+POSITION_COMPACT_GAP = 8
+# List items are room membership joined with the shared title row.
+LIST_ITEMS_SQL = f"""
+    SELECT lists.room, lists.added_at, lists.watched, lists.position,
+        {", ".join(f"titles.{column}" for column in TITLE_COLUMNS)}
+    FROM lists JOIN titles ON titles.title_id = lists.title_id
+"""
 
 bp = Blueprint("main", __name__)
 
-_refresh_lock = threading.Lock()
-_refresh_state: dict[str, dict[str, int | bool]] = {}
-_trending_lock = threading.Lock()
-_trending_cache: dict[str, Any] = {"data": [], "fetched_at": 0, "refreshing": False}
 _rate_limit_lock = threading.Lock()
 _rate_limit_buckets: dict[tuple[str, str], list[float]] = {}
+_compaction_pool = BackgroundPool("shovo-compact", max_workers=1, max_pending=32)
+_stream_lock = threading.Lock()
+_streams = {"open": 0, "opened": 0, "refused": 0}
 
 
 def _csrf_token() -> str:
@@ -91,36 +172,52 @@ def _rate_limit_key() -> str:
         return "search"
     if request.path == "/api/trending":
         return "trending"
+    if request.path == "/api/details":
+        return "details"
+    if request.path == "/api/details/batch":
+        # A read, even though it is a POST; charged per uncached title by the endpoint itself.
+        return ""
     if request.path.startswith("/api/") and request.method in {"POST", "PATCH", "DELETE"}:
         return "mutating"
     return ""
 
 
-def _rate_limit_allowed(bucket: str) -> tuple[bool, int]:
-    """Apply a small in-memory sliding-window rate limit."""
+def _rate_limit_allowed(bucket: str, cost: int = 1) -> tuple[bool, int]:
+    """Apply a small in-memory sliding-window rate limit, counting cost requests at once."""
     limits = {
         "verify-password": (10, 60),
         "search": (40, 60),
         "trending": (30, 60),
         "mutating": (80, 60),
+        # Upstream title lookups: one per /api/details call or uncached batch title.
+        "details": (240, 60),
     }
     limit = limits.get(bucket)
-    if not limit:
+    if not limit or cost <= 0:
         return True, 0
     max_requests, window = limit
+    cost = min(cost, max_requests)
     now = time.time()
     key = (_request_ip(), bucket)
     with _rate_limit_lock:
         entries = [stamp for stamp in _rate_limit_buckets.get(key, []) if now - stamp < window]
-        if len(entries) >= max_requests:
-            retry_after = max(1, int(window - (now - entries[0])))
+        if len(entries) + cost > max_requests:
+            retry_after = max(1, int(window - (now - entries[len(entries) + cost - max_requests - 1])))
             _rate_limit_buckets[key] = entries
             return False, retry_after
-        entries.append(now)
+        entries.extend([now] * cost)
         _rate_limit_buckets[key] = entries
     return True, 0
 
 
+def _rate_limited(retry_after: int) -> Any:
+    """Build the 429 response for a request over its rate limit."""
+    response = jsonify({"error": "rate_limited"})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
 @bp.before_request
 def _protect_api_requests() -> Any:
     """Apply rate limiting and CSRF protection to API requests."""
@@ -128,10 +225,7 @@ def _protect_api_requests() -> Any:
     if bucket:
         allowed, retry_after = _rate_limit_allowed(bucket)
         if not allowed:
-            response = jsonify({"error": "rate_limited"})
-            response.status_code = 429
-            response.headers["Retry-After"] = str(retry_after)
-            return response
+            return _rate_limited(retry_after)
 
     if request.path.startswith("/api/") and request.method in {"POST", "PATCH", "DELETE"}:
         token = request.headers.get(CSRF_HEADER, "")
@@ -173,6 +267,11 @@ def _room_is_authorized(room: str) -> bool:
     return not _is_room_private(sanitized) or sanitized in _authorized_rooms()
 
 
+def _request_deadline(endpoint: str) -> Deadline:
+    """Start the upstream latency budget for the current request."""
+    return Deadline(ENDPOINT_SLO_SECONDS[endpoint])
+
+
 def _require_room_authorized(room: str) -> tuple[Any, int] | None:
     """Return a 403 response if a private room has not been unlocked."""
     if _room_is_authorized(room):
@@ -197,7 +296,7 @@ def room(room: str) -> Any:
         if default_room_value:
             return redirect(f"/r/{default_room_value}")
         return redirect(f"/r/{default_room()}")
-    _ensure_trending_preload(request_user_agent())
+    ensure_trending_preload(request_user_agent())
     return render_template("index.html", room=room, app_version=APP_VERSION, csrf_token=_csrf_token())
 
 
@@ -221,49 +320,134 @@ def api_version() -> Any:
     return jsonify({"version": APP_VERSION})
 
 
+@bp.route("/api/stats")
+def api_stats() -> Any:
+    """Expose instrumentation counters to operators holding SHOVO_STATS_TOKEN."""
+    expected = os.environ.get("SHOVO_STATS_TOKEN", "")
+    supplied = request.headers.get(STATS_TOKEN_HEADER, "")
+    if not expected or not supplied or not secrets.compare_digest(supplied, expected):
+        return jsonify({"error": "not_found"}), 404
+    return jsonify(
+        {
+            "upstream": upstream_stats(),
+            "breakers": breaker_stats(),
+            "quotas": quota_stats(),
+            "suggestions": suggestion_cache_stats(),
+            "ratings": rating_cache_stats(),
+            "cache_states": cache_state_counts(get_db()),
+            "single_flight": single_flight_stats(),
+            "trending": trending_stats(),
+            "db_pool": db_pool_stats(),
+            "refresh": refresh_stats(),
+            "refresh_streams": _refresh_stream_stats(),
+        }
+    )
+
+
 @bp.route("/api/search")
 def api_search() -> Any:
     """Search for titles."""
     query = request.args.get("q", "")
     user_agent = request_user_agent()
+    deadline = _request_deadline("search")
     try:
-        results = fetch_suggestions(query, user_agent)
-        return jsonify({"results": [serialize_result(result) for result in results[:MAX_RESULTS]]})
+        results = fetch_suggestions(query, user_agent, deadline)
+        return jsonify(
+            {
+                "results": [serialize_result(result) for result in results[:MAX_RESULTS]],
+                "degraded": deadline.degraded,
+            }
+        )
     except requests.RequestException as exc:
         return jsonify({"error": "imdb_fetch_failed", "detail": str(exc), "results": []})
 
 
+def _details_type(type_label: Any) -> str:
+    """Normalize a client-supplied type label, defaulting to movie."""
+    normalized_type = normalize_type_label(type_label if isinstance(type_label, str) else None)
+    return normalized_type if normalized_type in ALLOWED_TYPE_LABELS else "movie"
+
+
+def _details_payload(details: tuple[tuple[Any, Any], tuple[Any, Any, Any, Any, Any]]) -> dict[str, Any]:
+    """Shape ratings and metadata for the details endpoints."""
+    (rating, rotten_tomatoes), (
+        runtime_minutes,
+        total_seasons,
+        total_episodes,
+        avg_episode_length,
+        original_language,
+    ) = details
+    return {
+        "rating": rating,
+        "rotten_tomatoes": rotten_tomatoes,
+        "runtime_minutes": runtime_minutes,
+        "total_seasons": total_seasons,
+        "total_episodes": total_episodes,
+        "avg_episode_length": avg_episode_length,
+        "original_language": original_language,
+    }
+
+
 @bp.route("/api/details")
 def api_details() -> Any:
     """Get details for a single title."""
     title_id = request.args.get("title_id")
     if not title_id:
         return jsonify({"error": "missing_title_id"}), 400
-    type_label = request.args.get("type_label")
-    normalized_type = normalize_type_label(type_label)
-    if normalized_type not in ALLOWED_TYPE_LABELS:
-        normalized_type = "movie"
+    normalized_type = _details_type(request.args.get("type_label"))
     user_agent = request_user_agent()
-    runtime_minutes, total_seasons, total_episodes, avg_episode_length, original_language = get_metadata(
-        title_id, user_agent, normalized_type
-    )
-    rating, rotten_tomatoes = get_ratings(title_id, user_agent)
-    return jsonify(
+    deadline = _request_deadline("details")
+    details = get_title_details(title_id, user_agent, normalized_type, deadline)
+    return jsonify({**_details_payload(details), "degraded": deadline.degraded})
+
+
+@bp.route("/api/details/batch", methods=["POST"])
+def api_details_batch() -> Any:
+    """Get details for several titles in one request.
+
+    Expects {"titles": [{"title_id": ..., "type_label": ...}, ...]}. Titles that could
+    not be loaded within the budget are listed under "pending" for the client to retry.
+    Each uncached title counts against the client's "details" rate limit; over the
+    limit, cached titles are still answered and the uncached ones are pending, with
+    "rate_limited" set and a Retry-After header.
+    """
+    payload = request.get_json(silent=True)
+    titles = payload.get("titles") if isinstance(payload, dict) else None
+    if not isinstance(titles, list):
+        return jsonify({"error": "invalid_payload"}), 400
+    if len(titles) > DETAIL_BATCH_MAX_TITLES:
+        return jsonify({"error": "too_many_titles", "max_titles": DETAIL_BATCH_MAX_TITLES}), 400
+    types: dict[str, str] = {}
+    for entry in titles:
+        title_id = entry.get("title_id") if isinstance(entry, dict) else None
+        if not title_id or not isinstance(title_id, str):
+            return jsonify({"error": "missing_title_id"}), 400
+        types.setdefault(title_id, _details_type(entry.get("type_label")))
+    retry_after = 0
+
+    def admit(misses: int) -> bool:
+        nonlocal retry_after
+        allowed, retry_after = _rate_limit_allowed("details", misses)
+        return allowed
+
+    deadline = _request_deadline("details")
+    details, pending = get_many_title_details(types, request_user_agent(), deadline, admit)
+    response = jsonify(
         {
-            "rating": rating,
-            "rotten_tomatoes": rotten_tomatoes,
-            "runtime_minutes": runtime_minutes,
-            "total_seasons": total_seasons,
-            "total_episodes": total_episodes,
-            "avg_episode_length": avg_episode_length,
-            "original_language": original_language,
+            "results": {title_id: _details_payload(values) for title_id, values in details.items()},
+            "pending": pending,
+            "degraded": deadline.degraded,
+            "rate_limited": bool(retry_after),
         }
     )
+    if retry_after:
+        response.headers["Retry-After"] = str(retry_after)
+    return response
 
 
 @bp.route("/api/refresh", methods=["POST"])
 def api_refresh() -> Any:
-    """Start a background refresh of ratings and metadata."""
+    """Queue a refresh of the room's ratings and metadata."""
     if not request.is_json:
         return jsonify({"error": "invalid_payload"}), 400
     room = room_from_request()
@@ -272,43 +456,175 @@ def api_refresh() -> Any:
     unauthorized = _require_room_authorized(room)
     if unauthorized:
         return unauthorized
-    user_agent = request_user_agent()
-    with _refresh_lock:
-        state = _refresh_state.get(room)
-        if state and state.get("refreshing"):
-            return jsonify({"error": "refresh_in_progress"}), 409
-    total = _start_refresh(room, user_agent)
+    total = enqueue_room_refresh(room, request_user_agent())
+    if total is None:
+        return jsonify({"error": "refresh_in_progress"}), 409
     return jsonify({"status": "started", "total": total})
 
 
 @bp.route("/api/refresh/status")
 def api_refresh_status() -> Any:
-    """Get the status of a background refresh."""
+    """Get a room's refresh progress, shared by every process."""
+    room = request.args.get("room", "")
+    if not room:
+        return jsonify({"error": "missing_room"}), 400
+    unauthorized = _require_room_authorized(room)
+    if unauthorized:
+        return unauthorized
+    return jsonify(room_refresh_status(room))
+
+
+def _refresh_event_id(state: dict[str, Any]) -> str:
+    """Identify a progress state so a reconnecting client is not sent it twice."""
+    return f"{state['processed']}-{state['total']}-{int(state['refreshing'])}"
+
+
+def _refresh_stream_stats() -> dict[str, int]:
+    with _stream_lock:
+        return dict(_streams)
+
+
+def _release_refresh_stream() -> None:
+    with _stream_lock:
+        _streams["open"] -= 1
+
+
+@bp.route("/api/refresh/stream")
+def api_refresh_stream() -> Any:
+    """Push a room's refresh progress as Server-Sent Events.
+
+    A stream only stays open while the room is refreshing and for at most
+    REFRESH_STREAM_SECONDS; the browser then reconnects with Last-Event-ID.
+    Clients beyond REFRESH_STREAM_MAX get a 503 and fall back to polling.
+    """
     room = request.args.get("room", "")
     if not room:
         return jsonify({"error": "missing_room"}), 400
     unauthorized = _require_room_authorized(room)
     if unauthorized:
         return unauthorized
-    with _refresh_lock:
-        state = _refresh_state.get(room, {"refreshing": False, "processed": 0, "total": 0})
-        return jsonify(state)
+    state = room_refresh_status(room)
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    if not state["refreshing"] and last_event_id == _refresh_event_id(state):
+        # The client already saw the end of the refresh; 204 stops EventSource reconnecting.
+        return "", 204
+    with _stream_lock:
+        if _streams["open"] >= REFRESH_STREAM_MAX:
+            _streams["refused"] += 1
+            return jsonify({"error": "too_many_streams"}), 503
+        _streams["open"] += 1
+        _streams["opened"] += 1
+    # Do not pin a pooled connection for the lifetime of the stream.
+    close_db()
+
+    def generate():
+        yield f"retry: {REFRESH_STREAM_RETRY_MS}\n\n"
+        current, sent = state, last_event_id
+        started = last_write = time.monotonic()
+        while True:
+            event_id = _refresh_event_id(current)
+            if event_id != sent:
+                yield f"id: {event_id}\nevent: progress\ndata: {json.dumps(current)}\n\n"
+                sent, last_write = event_id, time.monotonic()
+            if not current["refreshing"]:
+                return
+            now = time.monotonic()
+            if now - started >= REFRESH_STREAM_SECONDS:
+                return
+            if now - last_write >= REFRESH_STREAM_HEARTBEAT_SECONDS:
+                yield ": heartbeat\n\n"
+                last_write = now
+            wait_for_refresh_progress(REFRESH_STREAM_POLL_SECONDS)
+            current = room_refresh_status(room)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["X-Accel-Buffering"] = "no"
+    response.call_on_close(_release_refresh_stream)
+    return response
 
 
 @bp.route("/api/trending")
 def api_trending() -> Any:
     """Get trending titles."""
     user_agent = request_user_agent()
+    deadline = _request_deadline("trending")
     try:
-        results = _get_trending_cached(user_agent)
+        results = get_trending(user_agent, deadline)
     except requests.RequestException as exc:
-        return jsonify({"error": "imdb_fetch_failed", "detail": str(exc)}), 502
-    return jsonify({"results": [serialize_result(result) for result in results]})
+        return jsonify({"error": "imdb_fetch_failed", "detail": str(exc), "degraded": deadline.degraded}), 502
+    return jsonify({"results": [serialize_result(result) for result in results], "degraded": deadline.degraded})
+
+
+def _encode_list_cursor(row: Any) -> str:
+    """Encode a list row's sort key as an opaque cursor."""
+    key = json.dumps([row["position"], row["added_at"], row["title_id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def _decode_list_cursor(cursor: str) -> tuple[int | None, int, str] | None:
+    """Decode a cursor from _encode_list_cursor, or return None if it is malformed."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(key, list) or len(key) != 3:
+        return None
+    position, added_at, title_id = key
+    if position is not None and not isinstance(position, int):
+        return None
+    if not isinstance(added_at, int) or not isinstance(title_id, str):
+        return None
+    return position, added_at, title_id
+
+
+def _list_rows_after(
+    conn: Any, room: str, watched_flag: int, limit: int, after: tuple[int | None, int, str] | None
+) -> list[Any]:
+    """Return up to limit list rows following a cursor key in page order.
+
+    Positioned rows come first (position DESC), then unpositioned ones. Each part
+    seeks straight to the cursor through idx_lists_room_page, so deep pages cost
+    the same as the first.
+    """
+    rows: list[Any] = []
+    if after is None or after[0] is not None:
+        if after is None:
+            seek, params = "lists.position IS NOT NULL", ()
+        else:
+            seek, params = "(lists.position, lists.added_at, lists.title_id) < (?, ?, ?)", after
+        rows = conn.execute(
+            f"""
+            {LIST_ITEMS_SQL}
+            WHERE lists.room = ? AND lists.watched = ? AND {seek}
+            ORDER BY lists.position DESC, lists.added_at DESC, lists.title_id DESC
+            LIMIT ?
+            """,
+            (room, watched_flag, *params, limit),
+        ).fetchall()
+    if len(rows) < limit:
+        if after is None or after[0] is not None:
+            seek, params = "", ()
+        else:
+            seek, params = "AND (lists.added_at, lists.title_id) < (?, ?)", after[1:]
+        rows += conn.execute(
+            f"""
+            {LIST_ITEMS_SQL}
+            WHERE lists.room = ? AND lists.watched = ? AND lists.position IS NULL {seek}
+            ORDER BY lists.added_at DESC, lists.title_id DESC
+            LIMIT ?
+            """,
+            (room, watched_flag, *params, limit - len(rows)),
+        ).fetchall()
+    return rows
 
 
 @bp.route("/api/list", methods=["GET"])
 def api_list() -> Any:
-    """Get the list of titles for a room."""
+    """Get the list of titles for a room.
+
+    Pass cursor (empty for the first page) to page with the returned next_cursor;
+    page/per_page offsets are still accepted. per_page is capped at LIST_MAX_PER_PAGE.
+    """
     room = room_from_request() or request.args.get("room", "")
     if not room:
         return jsonify({"error": "missing_room"}), 400
@@ -319,32 +635,41 @@ def api_list() -> Any:
     watched_flag = 1 if status == "watched" else 0
     try:
         page = max(int(request.args.get("page", 1)), 1)
-        per_page = max(int(request.args.get("per_page", MAX_RESULTS)), 1)
+        per_page = min(max(int(request.args.get("per_page", MAX_RESULTS)), 1), LIST_MAX_PER_PAGE)
     except (ValueError, TypeError):
         return jsonify({"error": "invalid_pagination_params"}), 400
-    offset = (page - 1) * per_page
+    cursor = request.args.get("cursor")
+    after = None
+    if cursor:
+        after = _decode_list_cursor(cursor)
+        if after is None:
+            return jsonify({"error": "invalid_cursor"}), 400
     conn = get_db()
-    total_count = conn.execute(
-        "SELECT COUNT(*) FROM lists WHERE room = ? AND watched = ?",
-        (room, watched_flag),
-    ).fetchone()[0]
-    watched_count = conn.execute(
-        "SELECT COUNT(*) FROM lists WHERE room = ? AND watched = 1",
+    counts = {"watched": 0, "unwatched": 0}
+    for row in conn.execute(
+        "SELECT watched, COUNT(*) AS total FROM lists WHERE room = ? GROUP BY watched",
         (room,),
-    ).fetchone()[0]
-    unwatched_count = conn.execute(
-        "SELECT COUNT(*) FROM lists WHERE room = ? AND watched = 0",
-        (room,),
-    ).fetchone()[0]
-    rows = conn.execute(
-        """
-        SELECT * FROM lists
-        WHERE room = ? AND watched = ?
-        ORDER BY (position IS NULL) ASC, position DESC, added_at DESC
-        LIMIT ? OFFSET ?
-        """,
-        (room, watched_flag, per_page, offset),
-    ).fetchall()
+    ):
+        if row["watched"] in (0, 1):
+            counts["watched" if row["watched"] else "unwatched"] = int(row["total"])
+    total_count = counts["watched" if watched_flag else "unwatched"]
+    if cursor is not None:
+        # One extra row tells whether another page follows.
+        rows = _list_rows_after(conn, room, watched_flag, per_page + 1, after)
+    else:
+        # SQLite sorts NULL positions last in descending order, so this walks
+        # idx_lists_room_page backwards without a separate sort.
+        rows = conn.execute(
+            f"""
+            {LIST_ITEMS_SQL}
+            WHERE lists.room = ? AND lists.watched = ?
+            ORDER BY lists.position DESC, lists.added_at DESC, lists.title_id DESC
+            LIMIT ? OFFSET ?
+            """,
+            (room, watched_flag, per_page + 1, (page - 1) * per_page),
+        ).fetchall()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
     total_pages = max((total_count + per_page - 1) // per_page, 1)
     return jsonify(
         {
@@ -353,82 +678,12 @@ def api_list() -> Any:
             "per_page": per_page,
             "total_pages": total_pages,
             "total_count": total_count,
-            "counts": {"watched": watched_count, "unwatched": unwatched_count},
+            "counts": counts,
+            "next_cursor": _encode_list_cursor(rows[-1]) if has_more else None,
         }
     )
 
 
-def _set_trending_cache(results: list[Any]) -> None:
-    now = int(time.time())
-    _trending_cache["data"] = results
-    _trending_cache["fetched_at"] = now
-
-
-def _refresh_trending_async(user_agent: str) -> None:
-    def _run() -> None:
-        try:
-            results = fetch_trending(user_agent)
-        except requests.RequestException:
-            with _trending_lock:
-                _trending_cache["refreshing"] = False
-            return
-        with _trending_lock:
-            _set_trending_cache(results)
-            _trending_cache["refreshing"] = False
-
-    thread = threading.Thread(target=_run, daemon=True)
-    thread.start()
-
-
-def _ensure_trending_preload(user_agent: str) -> None:
-    now = int(time.time())
-    with _trending_lock:
-        data = _trending_cache.get("data", [])
-        fetched_at = int(_trending_cache.get("fetched_at", 0))
-        refreshing = bool(_trending_cache.get("refreshing"))
-        is_fresh = data and fetched_at + TRENDING_TTL_SECONDS > now
-        if refreshing or is_fresh:
-            return
-        _trending_cache["refreshing"] = True
-    _refresh_trending_async(user_agent)
-
-
-def _get_trending_cached(user_agent: str) -> list[Any]:
-    now = int(time.time())
-    with _trending_lock:
-        data = _trending_cache.get("data", [])
-        fetched_at = int(_trending_cache.get("fetched_at", 0))
-        refreshing = bool(_trending_cache.get("refreshing"))
-        is_fresh = data and fetched_at + TRENDING_TTL_SECONDS > now
-        if is_fresh:
-            return data
-        if data and not refreshing:
-            _trending_cache["refreshing"] = True
-            _refresh_trending_async(user_agent)
-            return data
-        if refreshing and not data:
-            pass
-        else:
-            _trending_cache["refreshing"] = True
-    if refreshing and not data:
-        deadline = time.time() + 2
-        while time.time() < deadline:
-            with _trending_lock:
-                data = _trending_cache.get("data", [])
-                fetched_at = int(_trending_cache.get("fetched_at", 0))
-                if data and fetched_at + TRENDING_TTL_SECONDS > int(time.time()):
-                    return data
-            time.sleep(0.1)
-    try:
-        results = fetch_trending(user_agent)
-        with _trending_lock:
-            _set_trending_cache(results)
-        return results
-    finally:
-        with _trending_lock:
-            _trending_cache["refreshing"] = False
-
-
 @bp.route("/api/list", methods=["POST"])
 def api_add() -> Any:
     """Add a title to a list."""
@@ -448,37 +703,13 @@ def api_add() -> Any:
     watched = parse_watched(data.get("watched", 0))
     conn = get_db()
     next_position = conn.execute(
-        "SELECT COALESCE(MAX(position), 0) + 1 FROM lists WHERE room = ? AND watched = ?",
-        (room, watched),
+        "SELECT COALESCE(MAX(position), 0) + ? FROM lists WHERE room = ? AND watched = ?",
+        (POSITION_GAP, room, watched),
     ).fetchone()[0]
+    title_insert(conn, {column: data.get(column) for column in TITLE_COLUMNS})
     conn.execute(
-        """
-        REPLACE INTO lists (
-            room, title_id, title, year, original_language, type_label, image, rating, rotten_tomatoes,
-            runtime_minutes, total_seasons, total_episodes, avg_episode_length, added_at, watched
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            room,
-            title_id,
-            title,
-            data.get("year"),
-            data.get("original_language"),
-            data.get("type_label"),
-            data.get("image"),
-            data.get("rating"),
-            data.get("rotten_tomatoes"),
-            data.get("runtime_minutes"),
-            data.get("total_seasons"),
-            data.get("total_episodes"),
-            data.get("avg_episode_length"),
-            int(time.time()),
-            watched,
-        ),
-    )
-    conn.execute(
-        "UPDATE lists SET position = ? WHERE room = ? AND title_id = ?",
-        (next_position, room, title_id),
+        "REPLACE INTO lists (room, title_id, added_at, watched, position) VALUES (?, ?, ?, ?, ?)",
+        (room, title_id, int(time.time()), watched, next_position),
     )
     conn.commit()
     return jsonify({"status": "ok"})
@@ -510,7 +741,12 @@ def api_patch_list() -> Any:
 
 @bp.route("/api/list/order", methods=["PATCH"])
 def api_order() -> Any:
-    """Update the order of titles in a list."""
+    """Reorder titles among the positions they already occupy.
+
+    The submitted titles keep the same slots relative to the rest of the room, so a
+    page can be reordered without touching other pages. They must all share one
+    watched status. All updates run through one executemany in a single transaction.
+    """
     if not request.is_json:
         return jsonify({"error": "invalid_payload"}), 400
     room = room_from_request()
@@ -522,18 +758,124 @@ def api_order() -> Any:
     order = request.json.get("order")
     if not isinstance(order, list) or not order:
         return jsonify({"error": "invalid_order"}), 400
+    order = list(dict.fromkeys(title_id for title_id in order if isinstance(title_id, str)))
     conn = get_db()
-    total = len(order)
-    for index, title_id in enumerate(order):
-        position = total - index
-        conn.execute(
-            "UPDATE lists SET position = ? WHERE room = ? AND title_id = ?",
-            (position, room, title_id),
-        )
+    for _ in range(2):
+        placeholders = ", ".join("?" for _ in order)
+        rows = conn.execute(
+            f"SELECT title_id, watched, position FROM lists WHERE room = ? AND title_id IN ({placeholders})",
+            (room, *order),
+        ).fetchall()
+        if len({row["watched"] for row in rows}) > 1:
+            # Watched and unwatched titles are ordered separately; swapping slots across
+            # the two groups could give two titles the same position.
+            return jsonify({"error": "mixed_order"}), 400
+        positions = [row["position"] for row in rows]
+        if None not in positions and len(set(positions)) == len(positions):
+            break
+        # Unpositioned or tied titles have no slot of their own until the room is respaced.
+        for watched in {row["watched"] for row in rows}:
+            compact_positions(conn, room, watched)
+    found = {row["title_id"] for row in rows}
+    ordered = [title_id for title_id in order if title_id in found]
+    slots = sorted(positions, reverse=True)
+    conn.executemany(
+        "UPDATE lists SET position = ? WHERE room = ? AND title_id = ?",
+        [(slot, room, title_id) for slot, title_id in zip(slots, ordered)],
+    )
     conn.commit()
     return jsonify({"status": "ok"})
 
 
+@bp.route("/api/list/move", methods=["PATCH"])
+def api_move() -> Any:
+    """Move one title directly above "before", directly below "after", or to the "top".
+
+    Only the moved row is written. If its new neighbours have no free position left
+    between them, the room is respaced first; nearly full gaps are respaced in the
+    background.
+    """
+    if not request.is_json:
+        return jsonify({"error": "invalid_payload"}), 400
+    room = room_from_request()
+    if not room:
+        return jsonify({"error": "missing_room"}), 400
+    unauthorized = _require_room_authorized(room)
+    if unauthorized:
+        return unauthorized
+    title_id = request.json.get("title_id")
+    before = request.json.get("before")
+    after = request.json.get("after")
+    if not title_id:
+        return jsonify({"error": "missing_title_id"}), 400
+    neighbour = before or after
+    if not neighbour and not request.json.get("top"):
+        return jsonify({"error": "missing_neighbor"}), 400
+    conn = get_db()
+    row = conn.execute(
+        "SELECT watched FROM lists WHERE room = ? AND title_id = ?",
+        (room, title_id),
+    ).fetchone()
+    if row is None:
+        return jsonify({"error": "not_found"}), 404
+    watched = row["watched"]
+    slot = None
+    for _ in range(2):
+        below = above = None
+        tied = False
+        if neighbour:
+            neighbour_row = conn.execute(
+                "SELECT watched, position FROM lists WHERE room = ? AND title_id = ?",
+                (room, neighbour),
+            ).fetchone()
+            if neighbour_row is None or neighbour_row["watched"] != watched or neighbour == title_id:
+                return jsonify({"error": "invalid_neighbor"}), 400
+            if neighbour_row["position"] is None:
+                tied = True
+            else:
+                tied = bool(
+                    conn.execute(
+                        """
+                        SELECT 1 FROM lists
+                        WHERE room = ? AND watched = ? AND position = ? AND title_id NOT IN (?, ?) LIMIT 1
+                        """,
+                        (room, watched, neighbour_row["position"], title_id, neighbour),
+                    ).fetchone()
+                )
+            if before:
+                below = neighbour_row["position"]
+            else:
+                above = neighbour_row["position"]
+        else:
+            below = conn.execute(
+                "SELECT MAX(position) FROM lists WHERE room = ? AND watched = ? AND title_id != ?",
+                (room, watched, title_id),
+            ).fetchone()[0]
+        if not tied:
+            slot = position_slot(conn, room, watched, title_id, below, above)
+            if slot is not None:
+                break
+        compact_positions(conn, room, watched)
+    if slot is None:
+        return jsonify({"error": "move_failed"}), 409
+    position, gap = slot
+    conn.execute(
+        "UPDATE lists SET position = ? WHERE room = ? AND title_id = ?",
+        (position, room, title_id),
+    )
+    conn.commit()
+    if gap is not None and gap < POSITION_COMPACT_GAP:
+        _compaction_pool.submit((room, watched), _compact_room, room, watched)
+    return jsonify({"status": "ok", "position": position})
+
+
+def _compact_room(room: str, watched: int) -> None:
+    """Respace a room's positions on a background thread."""
+    with get_db_context() as conn:
+        compact_positions(conn, room, watched)
+        conn.commit()
+
+
 @bp.route("/api/list", methods=["DELETE"])
 def api_delete() -> Any:
     """Delete a title from a list."""
@@ -553,6 +895,7 @@ def api_delete() -> Any:
         "DELETE FROM lists WHERE room = ? AND title_id = ?",
         (room, title_id),
     )
+    title_prune(conn, [title_id])
     conn.commit()
     return jsonify({"status": "ok"})
 
@@ -589,6 +932,7 @@ def api_rename_list() -> Any:
             409,
         )
     conn.execute("UPDATE lists SET room = ? WHERE room = ?", (next_room, room))
+    refresh_job_rename(conn, room, next_room)
     conn.commit()
     return jsonify({"status": "ok", "room": next_room})
 
@@ -606,7 +950,10 @@ def api_delete_room() -> Any:
     if unauthorized:
         return unauthorized
     conn = get_db()
+    title_ids = [row["title_id"] for row in conn.execute("SELECT title_id FROM lists WHERE room = ?", (target_room,))]
     conn.execute("DELETE FROM lists WHERE room = ?", (target_room,))
+    title_prune(conn, title_ids)
+    refresh_job_delete(conn, target_room)
     conn.execute("DELETE FROM room_settings WHERE room = ?", (target_room,))
     conn.commit()
     return jsonify({"status": "ok"})
@@ -680,64 +1027,3 @@ def api_verify_room_password() -> Any:
     if authorized:
         _mark_room_authorized(target_room)
     return jsonify({"authorized": authorized})
-
-
-def _start_refresh(room: str, user_agent: str) -> int:
-    """Start a background refresh of all titles in a room."""
-    with get_db_context() as conn:
-        rows = conn.execute(
-            "SELECT title_id, type_label FROM lists WHERE room = ?",
-            (room,),
-        ).fetchall()
-    items = [(row["title_id"], row["type_label"]) for row in rows]
-    total = len(items)
-    with _refresh_lock:
-        _refresh_state[room] = {"refreshing": True, "processed": 0, "total": total}
-
-    def _run_refresh() -> None:
-        with get_db_context() as conn:
-            for title_id, type_label in items:
-                normalized_type = normalize_type_label(type_label)
-                if normalized_type not in ALLOWED_TYPE_LABELS:
-                    normalized_type = "movie"
-                (
-                    imdb_rating,
-                    rotten_rating,
-                    runtime_minutes,
-                    total_seasons,
-                    total_episodes,
-                    avg_episode_length,
-                    original_language,
-                ) = refresh_title_details(title_id, user_agent, normalized_type)
-                conn.execute(
-                    """
-                    UPDATE lists
-                    SET rating = ?, rotten_tomatoes = ?, runtime_minutes = ?, total_seasons = ?,
-                        total_episodes = ?, avg_episode_length = ?, original_language = ?
-                    WHERE room = ? AND title_id = ?
-                    """,
-                    (
-                        imdb_rating,
-                        rotten_rating,
-                        runtime_minutes,
-                        total_seasons,
-                        total_episodes,
-                        avg_episode_length,
-                        original_language,
-                        room,
-                        title_id,
-                    ),
-                )
-                conn.commit()
-                with _refresh_lock:
-                    state = _refresh_state.get(room)
-                    if state:
-                        state["processed"] = int(state.get("processed", 0)) + 1
-            with _refresh_lock:
-                state = _refresh_state.get(room)
-                if state:
-                    state["refreshing"] = False
-
-    thread = threading.Thread(target=_run_refresh, daemon=True)
-    thread.start()
-    return total
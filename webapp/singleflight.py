@@ -0,0 +1,128 @@
+"""Single-flight coalescing of duplicate upstream fetches."""
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+# Support both package and standalone imports
+try:
+    from .database import get_db_context, lease_acquire, lease_release
+    from .utils import env_flag, env_float
+except ImportError:
+    from database import get_db_context, lease_acquire, lease_release
+    from utils import env_flag, env_float
+
+R = TypeVar("R")
+
+CROSS_PROCESS = env_flag("SHOVO_SINGLE_FLIGHT_CROSS_PROCESS", False)
+LEASE_TTL_SECONDS = env_float("SHOVO_SINGLE_FLIGHT_LEASE_TTL", 30.0, minimum=1.0)
+LEASE_POLL_SECONDS = 0.05
+LEASE_POLL_MAX_SECONDS = 0.5
+
+
+class _Flight:
+    """An in-progress call that duplicate callers wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+_lock = threading.Lock()
+_flights: dict[tuple[str, ...], _Flight] = {}
+_stats = {"leaders": 0, "suppressed": 0, "suppressed_cross_process": 0}
+
+
+def _count(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+
+def single_flight_stats() -> dict[str, int]:
+    """Return how many fetches ran and how many duplicates were suppressed."""
+    with _lock:
+        stats = dict(_stats)
+        stats["in_flight"] = len(_flights)
+    return stats
+
+
+def reset_single_flight_stats() -> None:
+    """Clear single-flight counters (used by tests)."""
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def _run_with_lease(key: tuple[str, ...], func: Callable[[], R], wait_timeout: float | None = None) -> R:
+    """Run func while holding a SQLite lease so other processes wait instead of fetching too.
+
+    Waiting callers run func once the lease is released; func is expected to find the
+    freshly cached result at that point. An expired lease is taken over. Waiting gives
+    up with TimeoutError after wait_timeout seconds.
+    """
+    name = "flight:" + ":".join(key)
+    owner = secrets.token_hex(8)
+    delay = LEASE_POLL_SECONDS
+    give_up_at = time.monotonic() + wait_timeout if wait_timeout is not None else None
+    waited = False
+    while True:
+        with get_db_context() as conn:
+            acquired = lease_acquire(conn, name, owner, LEASE_TTL_SECONDS)
+            conn.commit()
+        if acquired:
+            break
+        if not waited:
+            waited = True
+            _count("suppressed_cross_process")
+        sleep = delay
+        if give_up_at is not None:
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for {key[0]} fetch in another process")
+            sleep = min(sleep, remaining)
+        time.sleep(sleep)
+        delay = min(delay * 2, LEASE_POLL_MAX_SECONDS)
+    try:
+        return func()
+    finally:
+        with get_db_context() as conn:
+            lease_release(conn, name, owner)
+            conn.commit()
+
+
+def single_flight(key: tuple[str, ...], func: Callable[[], R], wait_timeout: float | None = None) -> R:
+    """Run func once per key at a time; concurrent callers with the same key share its result.
+
+    With SHOVO_SINGLE_FLIGHT_CROSS_PROCESS enabled, the running call also holds a SQLite
+    lease so duplicates in other uWSGI processes wait for it. Duplicate callers, in this
+    process or waiting on another one's lease, give up with TimeoutError after
+    wait_timeout seconds.
+    """
+    with _lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight()
+            _flights[key] = flight
+            _stats["leaders"] += 1
+        else:
+            _stats["suppressed"] += 1
+    if not leader:
+        if not flight.done.wait(wait_timeout):
+            raise TimeoutError(f"Timed out waiting for in-flight {key[0]} fetch")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    try:
+        flight.result = _run_with_lease(key, func, wait_timeout) if CROSS_PROCESS else func()
+        return flight.result
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _lock:
+            _flights.pop(key, None)
+        flight.done.set()
@@ -15,6 +15,12 @@ import {
 const MAX_RESULTS = 10;
 const TRENDING_CACHE_KEY = 'trending_v3';
 const CSRF_TOKEN = window.CSRF_TOKEN || '';
+// Must not exceed the server's SHOVO_DETAIL_BATCH_MAX_TITLES (default 50).
+const DETAILS_BATCH_SIZE = 50;
+const DETAILS_RETRY_DELAY_MS = 2000;
+
+let detailsQueue = new Map();
+let detailsFlushScheduled = false;
 
 function jsonHeaders() {
   return {
@@ -86,20 +92,20 @@ export async function getTrending() {
  * Get list items for a room
  * @param {string} room - Room ID
  * @param {string} status - Status (unwatched/watched)
- * @param {number} page - Page number
+ * @param {string} cursor - next_cursor from the previous page ('' for the first page)
  * @param {number} perPage - Items per page
  * @returns {Promise<object>} - List data
  */
-export async function getList(room, status, page = 1, perPage = MAX_RESULTS) {
+export async function getList(room, status, cursor = '', perPage = MAX_RESULTS) {
   // Check cache first - include perPage in cache key to avoid conflicts
-  const cacheKey = getListCacheKey(room, status, page, perPage);
+  const cacheKey = getListCacheKey(room, status, cursor, perPage);
   const cached = getCached(cacheKey);
   if (cached) {
     return cached;
   }
 
   const response = await fetch(
-    `/api/list?room=${encodeURIComponent(room)}&status=${status}&page=${page}&per_page=${perPage}`
+    `/api/list?room=${encodeURIComponent(room)}&status=${status}&cursor=${encodeURIComponent(cursor)}&per_page=${perPage}`
   );
   if (!response.ok) {
     throw new Error('Failed to fetch list');
@@ -114,30 +120,84 @@ export async function getList(room, status, page = 1, perPage = MAX_RESULTS) {
 
 /**
  * Get details for a title
+ *
+ * Calls made while a page renders are queued and sent together to
+ * /api/details/batch. Titles the server reports as pending are retried once,
+ * after the server's Retry-After when the batch was rate limited.
  * @param {string} titleId - Title ID
  * @param {string} typeLabel - Type label
  * @returns {Promise<object>} - Title details
  */
-export async function getDetails(titleId, typeLabel) {
+export function getDetails(titleId, typeLabel) {
   // Check cache first
-  const cacheKey = getDetailCacheKey(titleId);
-  const cached = getCached(cacheKey);
+  const cached = getCached(getDetailCacheKey(titleId));
   if (cached) {
-    return cached;
+    return Promise.resolve(cached);
   }
 
-  const response = await fetch(
-    `/api/details?title_id=${encodeURIComponent(titleId)}&type_label=${encodeURIComponent(typeLabel || '')}`
-  );
-  if (!response.ok) {
-    throw new Error('Failed to fetch details');
+  return new Promise((resolve, reject) => {
+    queueDetails(titleId, { typeLabel: typeLabel || '', retried: false, waiters: [{ resolve, reject }] });
+  });
+}
+
+function queueDetails(titleId, entry) {
+  const queued = detailsQueue.get(titleId);
+  if (queued) {
+    queued.waiters.push(...entry.waiters);
+  } else {
+    detailsQueue.set(titleId, entry);
   }
-  const data = await response.json();
+  if (!detailsFlushScheduled) {
+    detailsFlushScheduled = true;
+    setTimeout(flushDetailsQueue, 0);
+  }
+}
 
-  // Cache the results
-  setCached(cacheKey, data);
+function flushDetailsQueue() {
+  detailsFlushScheduled = false;
+  const entries = [...detailsQueue.entries()];
+  detailsQueue = new Map();
+  for (let start = 0; start < entries.length; start += DETAILS_BATCH_SIZE) {
+    sendDetailsBatch(new Map(entries.slice(start, start + DETAILS_BATCH_SIZE)));
+  }
+}
 
-  return data;
+async function sendDetailsBatch(batch) {
+  let data;
+  let retryDelay = DETAILS_RETRY_DELAY_MS;
+  try {
+    const response = await fetch('/api/details/batch', {
+      method: 'POST',
+      headers: jsonHeaders(),
+      body: JSON.stringify({
+        titles: [...batch].map(([titleId, entry]) => ({ title_id: titleId, type_label: entry.typeLabel }))
+      })
+    });
+    if (!response.ok) {
+      throw new Error('Failed to fetch details');
+    }
+    data = await response.json();
+    if (data.rate_limited) {
+      retryDelay = Math.max(retryDelay, Number(response.headers.get('Retry-After')) * 1000 || 0);
+    }
+  } catch (error) {
+    batch.forEach((entry) => entry.waiters.forEach((waiter) => waiter.reject(error)));
+    return;
+  }
+
+  const results = data.results || {};
+  batch.forEach((entry, titleId) => {
+    const details = results[titleId];
+    if (details) {
+      // Cache the results
+      setCached(getDetailCacheKey(titleId), details);
+      entry.waiters.forEach((waiter) => waiter.resolve(details));
+    } else if (!entry.retried) {
+      setTimeout(() => queueDetails(titleId, { ...entry, retried: true }), retryDelay);
+    } else {
+      entry.waiters.forEach((waiter) => waiter.reject(new Error('Details still pending')));
+    }
+  });
 }
 
 /**
@@ -230,6 +290,29 @@ export async function updateOrder(room, order) {
   return response.json();
 }
 
+/**
+ * Move one title next to a neighbour
+ * @param {string} room - Room ID
+ * @param {string} titleId - Title to move
+ * @param {object} target - { before } (title shown below it), { after } (title shown above it) or { top: true }
+ * @returns {Promise<object>} - Response
+ */
+export async function moveItem(room, titleId, target) {
+  const response = await fetch('/api/list/move', {
+    method: 'PATCH',
+    headers: jsonHeaders(),
+    body: JSON.stringify({ room, title_id: titleId, ...target })
+  });
+  if (!response.ok) {
+    throw new Error('Failed to move item');
+  }
+
+  // Invalidate list cache
+  invalidateListCache(room);
+
+  return response.json();
+}
+
 /**
  * Start database refresh
  * @param {string} room - Room ID
@@ -267,6 +350,15 @@ export async function getRefreshStatus(room) {
   return response.json();
 }
 
+/**
+ * Open a Server-Sent Events stream of refresh progress
+ * @param {string} room - Room ID
+ * @returns {EventSource} - Stream emitting `progress` events with the refresh status
+ */
+export function openRefreshStream(room) {
+  return new EventSource(`/api/refresh/stream?room=${encodeURIComponent(room)}`);
+}
+
 /**
  * Get room privacy settings
  * @param {string} room - Room ID
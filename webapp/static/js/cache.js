@@ -113,12 +113,13 @@ export function cleanupCache() {
  * Get list cache key for a room
  * @param {string} room - Room ID
  * @param {string} status - Status (unwatched/watched)
- * @param {number} page - Page number
+ * @param {string} cursor - Page cursor ('' for the first page)
  * @param {number} perPage - Items per page
  * @returns {string} - Cache key
  */
-export function getListCacheKey(room, status, page, perPage = 10) {
-  return `list_v2_${room}_${status}_${page}_${perPage}`;
+export function getListCacheKey(room, status, cursor = '', perPage = 10) {
+  // Starts with the room so invalidateListCache() drops every page of it.
+  return `list_${room}_v3_${status}_${cursor || 'first'}_${perPage}`;
 }
 
 /**
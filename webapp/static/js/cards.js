@@ -197,6 +197,7 @@ export function applyCardDetails(article, item) {
  * @returns {boolean}
  */
 export function needsDetails(item) {
+  if (item.details_complete) return false;
   const hasRating = item.rating !== null && item.rating !== undefined;
   const hasRotten = item.rotten_tomatoes !== null && item.rotten_tomatoes !== undefined;
   const hasRuntime = item.runtime_minutes !== null && item.runtime_minutes !== undefined;
@@ -97,6 +97,7 @@ async function onPointerDragEnd() {
   draggingCard.style.top = '';
   draggingCard.style.width = '';
   draggingCard.classList.remove('dragging');
+  const movedCard = draggingCard;
   if (dragPlaceholder) {
     listContainer.insertBefore(draggingCard, dragPlaceholder);
     dragPlaceholder.remove();
@@ -109,7 +110,7 @@ async function onPointerDragEnd() {
   dragOriginRect = null;
   listContainer.classList.remove('is-dragging');
   if (onOrderChange) {
-    await onOrderChange();
+    await onOrderChange(movedCard);
   }
 }
 
@@ -237,7 +238,7 @@ function clearPendingDragListeners() {
 /**
  * Attach drag handlers to cards in a container
  * @param {HTMLElement} container - Container element
- * @param {Function} orderChangeCallback - Callback when order changes
+ * @param {Function} orderChangeCallback - Called with the moved card when order changes
  */
 export function attachDragHandlers(container, orderChangeCallback, options = {}) {
   listContainer = container;
@@ -254,6 +255,20 @@ export function attachDragHandlers(container, orderChangeCallback, options = {})
   });
 }
 
+/**
+ * Get the neighbours a card was dropped between
+ * @param {HTMLElement} card - Moved card
+ * @returns {{before: string|null, after: string|null}} - Title IDs of the cards below and above it
+ */
+export function getCardNeighbours(card) {
+  const above = card.previousElementSibling?.closest('.card');
+  const below = card.nextElementSibling?.closest('.card');
+  return {
+    before: below?.dataset.titleId || null,
+    after: above?.dataset.titleId || null
+  };
+}
+
 /**
  * Get current order of title IDs
  * @param {HTMLElement} container - Container element
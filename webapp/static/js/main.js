@@ -22,16 +22,17 @@ import {
   addToList as apiAddToList,
   updateWatched,
   removeFromList as apiRemoveFromList,
-  updateOrder,
+  moveItem,
   startRefresh,
   getRefreshStatus,
+  openRefreshStream,
   getRoomPrivacy,
   setRoomPrivacy,
   verifyRoomPassword,
   MAX_RESULTS
 } from './api.js';
 import { buildCard, buildMobileSearchResult, buildDesktopSearchCard, applyCardDetails, needsDetails } from './cards.js';
-import { attachDragHandlers, getCurrentOrder } from './drag.js';
+import { attachDragHandlers, getCardNeighbours } from './drag.js';
 import { attachCardLongPressHandlers, isMobile, setupMobileEnhancements, setupCardSwipeGestures } from './mobile.js';
 import { getCached, setCached, getDetailCacheKey } from './cache.js';
 
@@ -137,9 +138,15 @@ let lastSearchQuery = '';
 let lastSearchResults = [];
 const pageState = { unwatched: 1, watched: 1 };
 const totalPages = { unwatched: 1, watched: 1 };
+// pageCursors[tab][n] is the cursor for page n + 1; '' fetches the first page.
+const pageCursors = { unwatched: [''], watched: [''] };
+const nextCursors = { unwatched: null, watched: null };
 const pendingDetailRequests = new Set();
 const detailCache = new Map();
 let refreshPollingTimer;
+let refreshStream = null;
+// Set once the server refuses or cannot hold a progress stream; polling is used from then on.
+let refreshStreamUnavailable = typeof EventSource === 'undefined';
 let refreshOwner = false;
 const preloadedTabs = new Set();
 let currentListItems = [];
@@ -341,7 +348,7 @@ const cardHandlers = {
       if (cardNode) {
         cardNode.querySelector('.card-action.primary').textContent = 'Added';
       }
-      pageState[watched ? 'watched' : 'unwatched'] = 1;
+      resetPaging(watched ? 'watched' : 'unwatched');
       await loadList();
     } catch (error) {
       showError('Failed to add item. Please try again.');
@@ -354,7 +361,7 @@ const cardHandlers = {
       if (cardNode) {
         cardNode.querySelector('.card-action.secondary').textContent = 'Added';
       }
-      pageState.watched = 1;
+      resetPaging('watched');
       await loadList();
     } catch (error) {
       showError('Failed to add item. Please try again.');
@@ -378,7 +385,7 @@ const cardHandlers = {
   onMoveTop: async (card) => {
     if (!card || !listResults) return;
     listResults.prepend(card);
-    await syncOrder();
+    await syncMove(card, { top: true });
   }
 };
 
@@ -517,7 +524,7 @@ const renderList = (items) => {
     listResults.appendChild(card);
     requestDetails(item, card);
   });
-  attachDragHandlers(listResults, syncOrder, { enableCardDrag: false });
+  attachDragHandlers(listResults, (card) => syncMove(card), { enableCardDrag: false });
   attachCardLongPressHandlers(listResults, (card) => {
     const titleId = card?.dataset?.titleId;
     if (!titleId) return;
@@ -550,11 +557,15 @@ const renderList = (items) => {
 };
 
 // API calls
-const syncOrder = async () => {
-  const order = getCurrentOrder(listResults);
-  if (!order.length) return;
+const syncMove = async (card, target) => {
+  const titleId = card?.dataset?.titleId;
+  if (!titleId) return;
+  // Only the moved card is sent; the server places it next to one of its new neighbours.
+  const { before, after } = getCardNeighbours(card);
+  const move = target || (before ? { before } : after ? { after } : null);
+  if (!move) return;
   try {
-    await updateOrder(room, order);
+    await moveItem(room, titleId, move);
   } catch (error) {
     showError('Failed to save order. Please try again.');
   }
@@ -626,6 +637,12 @@ const debounceSearch = () => {
   searchTimer = setTimeout(fetchSearch, 250);
 };
 
+const resetPaging = (tab) => {
+  pageState[tab] = 1;
+  pageCursors[tab] = [''];
+  nextCursors[tab] = null;
+};
+
 const loadList = async () => {
   if (isRoomPrivate(settings, room) && !isRoomAuthorized(settings, room)) {
     showStatus(listResults, 'This list is private. Enter the password to continue.', 'warning');
@@ -634,14 +651,20 @@ const loadList = async () => {
   }
   showStatus(listResults, 'Loading list…', 'loading');
   const page = pageState[activeTab];
+  const tab = activeTab;
   try {
-    const data = await getList(room, activeTab, page, PAGE_SIZE);
+    const data = await getList(room, tab, pageCursors[tab][page - 1] ?? '', PAGE_SIZE);
     if (!data.items?.length && page > 1) {
-      pageState[activeTab] = page - 1;
+      pageState[tab] = page - 1;
       await loadList();
       return;
     }
-    totalPages[activeTab] = data.total_pages || 1;
+    totalPages[tab] = data.total_pages || 1;
+    nextCursors[tab] = data.next_cursor || null;
+    if (nextCursors[tab]) {
+      // Prefetch the next page so "Next" renders from the cache.
+      getList(room, tab, nextCursors[tab], PAGE_SIZE).catch(() => {});
+    }
     currentListItems = data.items || [];
     renderList(applyFilter(currentListItems));
     // Update both counts from the API response
@@ -657,7 +680,7 @@ const loadList = async () => {
       listPageStatus.textContent = `Page ${pageState[activeTab]} of ${totalPages[activeTab]}`;
     }
     if (listPrev) listPrev.disabled = pageState[activeTab] <= 1;
-    if (listNext) listNext.disabled = pageState[activeTab] >= totalPages[activeTab];
+    if (listNext) listNext.disabled = !nextCursors[activeTab];
     if (listPagination) {
       listPagination.style.display = totalPages[activeTab] > 1 ? 'flex' : 'none';
     }
@@ -672,7 +695,7 @@ const preloadTabImages = async (tab) => {
   if (!tab || preloadedTabs.has(tab)) return;
   preloadedTabs.add(tab);
   try {
-    const data = await getList(room, tab, 1, PAGE_SIZE);
+    const data = await getList(room, tab, '', PAGE_SIZE);
     (data.items || []).forEach((item) => {
       if (item.image) {
         const img = new Image();
@@ -724,23 +747,32 @@ const stopRefreshPolling = () => {
   }
 };
 
+const stopRefreshUpdates = () => {
+  if (refreshStream) {
+    refreshStream.close();
+    refreshStream = null;
+  }
+  stopRefreshPolling();
+};
+
+const applyRefreshState = (state) => {
+  if (state.refreshing) {
+    openRefreshProgressModal();
+    updateRefreshProgress(state);
+    watchRefreshProgress();
+  } else if (isModalOpen(refreshProgressModal)) {
+    updateRefreshProgress(state);
+    setTimeout(closeRefreshProgressModal, 800);
+    refreshOwner = false;
+    stopRefreshUpdates();
+  } else {
+    stopRefreshUpdates();
+  }
+};
+
 const pollRefreshStatus = async () => {
   try {
-    const state = await getRefreshStatus(room);
-    if (state.refreshing) {
-      openRefreshProgressModal();
-      updateRefreshProgress(state);
-      if (!refreshPollingTimer) {
-        startRefreshPolling();
-      }
-    } else if (isModalOpen(refreshProgressModal)) {
-      updateRefreshProgress(state);
-      setTimeout(closeRefreshProgressModal, 800);
-      refreshOwner = false;
-      stopRefreshPolling();
-    } else {
-      stopRefreshPolling();
-    }
+    applyRefreshState(await getRefreshStatus(room));
   } catch (error) {
     // no-op
   }
@@ -752,6 +784,31 @@ const startRefreshPolling = () => {
   }
 };
 
+// Follow a running refresh over Server-Sent Events, polling only when streams are unavailable.
+const watchRefreshProgress = () => {
+  if (refreshStream || refreshPollingTimer) return;
+  if (refreshStreamUnavailable) {
+    startRefreshPolling();
+    return;
+  }
+  const stream = openRefreshStream(room);
+  refreshStream = stream;
+  stream.addEventListener('progress', (event) => {
+    try {
+      applyRefreshState(JSON.parse(event.data));
+    } catch (error) {
+      // no-op
+    }
+  });
+  stream.addEventListener('error', () => {
+    // The browser reconnects with Last-Event-ID on its own unless the server refused the stream.
+    if (stream.readyState !== EventSource.CLOSED || refreshStream !== stream) return;
+    refreshStream = null;
+    refreshStreamUnavailable = true;
+    pollRefreshStatus();
+  });
+};
+
 // Options modal helpers
 const renderDefaultRoomOptions = () => {
   if (!defaultRoomSelect) return;
@@ -915,8 +972,8 @@ const updateVisitedRoomCounts = async () => {
     rooms.map(async (roomId) => {
       try {
         const [unwatched, watched] = await Promise.all([
-          getList(roomId, 'unwatched', 1, 1),
-          getList(roomId, 'watched', 1, 1)
+          getList(roomId, 'unwatched', '', 1),
+          getList(roomId, 'watched', '', 1)
         ]);
         const total = (unwatched.total_count || 0) + (watched.total_count || 0);
         settings.rooms[roomId].count = total;
@@ -1308,8 +1365,7 @@ refreshConfirmStart?.addEventListener('click', async () => {
   try {
     await startRefresh(room);
     detailCache.clear();
-    startRefreshPolling();
-    pollRefreshStatus();
+    watchRefreshProgress();
   } catch (error) {
     refreshOwner = false;
     closeRefreshProgressModal();
@@ -1335,7 +1391,9 @@ listPrev?.addEventListener('click', () => {
 });
 
 listNext?.addEventListener('click', () => {
-  if (pageState[activeTab] < totalPages[activeTab]) {
+  const next = nextCursors[activeTab];
+  if (next) {
+    pageCursors[activeTab][pageState[activeTab]] = next;
     pageState[activeTab] += 1;
     loadList();
   }
@@ -7,6 +7,9 @@ import tempfile
 import pytest
 from flask.testing import FlaskClient
 
+# Tests must never open real upstream connections at app creation time.
+os.environ.setdefault("SHOVO_UPSTREAM_PREWARM", "0")
+
 
 class ShovoTestClient(FlaskClient):
     """Test client that supplies CSRF headers for mutating API requests."""
@@ -49,15 +52,21 @@ def app():
     )
 
     # Initialize test database and reset process-local security buckets
-    from webapp import routes
+    from webapp import external_api, refresh, routes, trending, upstream
     routes._rate_limit_buckets.clear()
+    external_api.reset_suggestion_cache()
+    external_api.reset_rating_cache_stats()
+    upstream.reset_breakers()
+    trending.reset_trending_memo()
+    refresh.reset_refresh_state()
 
     with app.app_context():
         database.init_db()
 
     yield app
 
-    # Cleanup
+    # Cleanup; stop background refresh work before the database goes away
+    refresh.reset_refresh_state()
     database.DB_PATH = original_db_path
     os.environ.pop("SHOVO_TEST_DB", None)
     try:
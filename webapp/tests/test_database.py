@@ -0,0 +1,135 @@
+"""Tests for database connection management."""
+from __future__ import annotations
+
+from webapp import database
+
+
+class TestConnectionPool:
+    """Tests for pooled, tuned SQLite connections."""
+
+    def test_connections_are_tuned_and_database_uses_wal(self, app):
+        """Pooled connections carry the PRAGMA settings and the file is in WAL mode."""
+        with database.get_db_context() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == database.DB_BUSY_TIMEOUT_MS
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -database.DB_CACHE_SIZE_KIB
+
+    def test_connections_are_reused(self, app):
+        """A released connection is handed out again instead of opening a new one."""
+        with database.get_db_context() as first:
+            pass
+        with database.get_db_context() as second:
+            assert second is first
+
+    def test_nested_contexts_get_separate_connections(self, app):
+        """An inner block never shares (or commits) the outer block's transaction."""
+        with database.get_db_context() as outer:
+            with database.get_db_context() as inner:
+                assert inner is not outer
+
+    def test_uncommitted_changes_are_rolled_back_on_release(self, app):
+        """Work left uncommitted is discarded, as when each context had its own connection."""
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000060", "7.0", None)
+        with database.get_db_context() as conn:
+            assert database.rating_cache_get(conn, "tt0000060") is None
+
+    def test_pool_is_abandoned_after_fork(self, app, monkeypatch):
+        """A forked worker opens its own connections and never touches inherited ones."""
+        with database.get_db_context() as inherited:
+            pass
+        monkeypatch.setattr("webapp.database.os.getpid", lambda: -1)
+
+        with database.get_db_context() as conn:
+            assert conn is not inherited
+        assert inherited in database._inherited
+        inherited.execute("SELECT 1")  # still open for the parent's sake
+
+
+class TestMigrations:
+    """Tests for numbered schema migrations."""
+
+    def test_fresh_database_is_current_and_rerun_is_a_no_op(self, app):
+        """init_db brings a new database to SCHEMA_VERSION; later runs apply nothing."""
+        with database.get_db_context() as conn:
+            assert database.schema_version(conn) == database.SCHEMA_VERSION
+            assert database.migrate_db(conn) == 0
+
+    def test_legacy_database_is_upgraded(self, app, tmp_path, monkeypatch):
+        """A pre-versioning database gets gapped positions, hashed-only passwords and shared titles."""
+        monkeypatch.setattr("webapp.database.DB_PATH", str(tmp_path / "legacy.sqlite3"))
+        with database.get_db_context() as conn:
+            conn.execute(
+                """
+                CREATE TABLE lists (
+                    room TEXT NOT NULL, title_id TEXT NOT NULL, title TEXT NOT NULL, year TEXT,
+                    type_label TEXT, image TEXT, rating TEXT, added_at INTEGER NOT NULL,
+                    PRIMARY KEY (room, title_id)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE room_settings (
+                    room TEXT PRIMARY KEY, is_private INTEGER NOT NULL DEFAULT 0,
+                    password_hash TEXT, created_at INTEGER NOT NULL
+                )
+                """
+            )
+            conn.executemany(
+                "INSERT INTO lists (room, title_id, title, rating, added_at) VALUES (?, ?, 'Movie', ?, ?)",
+                [("old", "tt0000001", "6.0", 1), ("old", "tt0000002", None, 2), ("older", "tt0000001", "5.0", 0)],
+            )
+            conn.execute(
+                "CREATE TABLE rating_cache (title_id TEXT PRIMARY KEY, rating TEXT, cached_at INTEGER NOT NULL)"
+            )
+            conn.execute("INSERT INTO rating_cache VALUES ('tt0000002', '7.5', 0)")
+            conn.execute("INSERT INTO room_settings VALUES ('old', 1, 'hunter2', 0)")
+            conn.commit()
+
+            assert database.migrate_db(conn) == database.SCHEMA_VERSION
+
+            assert database.schema_version(conn) == database.SCHEMA_VERSION
+            rows = conn.execute(
+                "SELECT title_id, watched, position FROM lists WHERE room = 'old' ORDER BY position DESC"
+            ).fetchall()
+            assert [tuple(row) for row in rows] == [
+                ("tt0000002", 0, 2 * database.POSITION_GAP),
+                ("tt0000001", 0, database.POSITION_GAP),
+            ]
+            settings = conn.execute("SELECT is_private, password_hash FROM room_settings").fetchone()
+            assert tuple(settings) == (0, None)
+            indexes = {row["name"] for row in conn.execute("PRAGMA index_list(lists)")}
+            assert {"idx_lists_room_page", "idx_lists_title"} <= indexes
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(lists)")}
+            assert columns == {"room", "title_id", "added_at", "watched", "position"}
+            titles = conn.execute("SELECT title_id, rating FROM titles ORDER BY title_id").fetchall()
+            assert [tuple(row) for row in titles] == [("tt0000001", "6.0"), ("tt0000002", "7.5")]
+
+    def test_migrate_command_reports_migration_done_while_loading_the_app(self, app, tmp_path, monkeypatch):
+        """The app's startup migration is reported by `flask shovo migrate`, and the CLI skips the prewarm."""
+        import sys
+
+        import click
+
+        from webapp import create_app
+
+        prewarms = []
+        monkeypatch.setattr(sys.modules["webapp.app"], "schedule_prewarm", lambda: prewarms.append(1))
+        monkeypatch.setattr("webapp.database.DB_PATH", str(tmp_path / "fresh.sqlite3"))
+        with click.Context(click.Command("flask")):
+            cli_app = create_app()
+
+        result = cli_app.test_cli_runner().invoke(args=["shovo", "migrate"])
+
+        assert f"Migrated database from schema version 0 to {database.SCHEMA_VERSION}" in result.output
+        assert prewarms == []
+
+    def test_migrate_command(self, runner, monkeypatch):
+        """`flask shovo migrate` reports an up-to-date database."""
+        monkeypatch.setattr("webapp.database._schema_versions_at_init", {})  # as in a process started on it
+        result = runner.invoke(args=["shovo", "migrate"])
+
+        assert result.exit_code == 0
+        assert f"up to date at schema version {database.SCHEMA_VERSION}" in result.output
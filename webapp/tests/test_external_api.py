@@ -1,7 +1,25 @@
 """Tests for external API functions."""
 from __future__ import annotations
 
-from webapp.external_api import fetch_tmdb_trending, fetch_trending, normalize_type_label, shrink_image_url, _fetch_ratings
+import time
+
+import pytest
+
+from webapp.external_api import (
+    _count_episodes,
+    _fetch_metadata,
+    _fetch_ratings,
+    fetch_suggestions,
+    fetch_tmdb_trending,
+    fetch_trending,
+    get_title_details,
+    rating_cache_stats,
+    normalize_type_label,
+    parse_suggestion_item,
+    reset_suggestion_cache,
+    shrink_image_url,
+    suggestion_cache_stats,
+)
 from webapp.models import SearchResult
 
 
@@ -49,7 +67,7 @@ class TestFetchRatings:
 
         monkeypatch.setattr(
             "webapp.external_api._fetch_omdb_title",
-            lambda title_id, user_agent: {
+            lambda title_id, user_agent, deadline=None: {
                 "Response": "True",
                 "imdbRating": "8.2",
                 "Ratings": [
@@ -58,15 +76,438 @@ class TestFetchRatings:
                 ],
             },
         )
-        monkeypatch.setattr("webapp.external_api.requests.get", fail_imdb_fetch)
+        monkeypatch.setattr("webapp.external_api.http_get", fail_imdb_fetch)
 
         assert _fetch_ratings("tt0070735", "test-agent") == ("8.2", "93%")
 
 
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+
+    def __init__(self, payload=None, text=""):
+        self._payload = payload or {}
+        self.text = text
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+class TestTitleDetails:
+    """Tests for the unified title details pipeline."""
+
+    def test_one_omdb_request_fills_both_caches(self, app, monkeypatch):
+        """Ratings and metadata come from a single OMDB payload and are cached together."""
+        calls = []
+
+        def fake_get(upstream, url, **kwargs):
+            calls.append((upstream, kwargs.get("params")))
+            return FakeResponse(
+                {
+                    "Response": "True",
+                    "imdbRating": "7.9",
+                    "Ratings": [{"Source": "Rotten Tomatoes", "Value": "88%"}],
+                    "Runtime": "112 min",
+                    "Language": "English, French",
+                }
+            )
+
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+
+        ratings, metadata = get_title_details("tt0000001", "test-agent", "movie")
+
+        assert ratings == ("7.9", "88%")
+        assert metadata == (112, None, None, None, "English")
+        assert len(calls) == 1
+
+        calls.clear()
+        assert get_title_details("tt0000001", "test-agent", "movie") == (ratings, metadata)
+        assert calls == []
+
+    def test_imdb_fallback_only_when_ratings_missing(self, app, monkeypatch):
+        """The IMDB title page is scraped only when OMDB has no ratings."""
+        calls = []
+
+        def fake_get(upstream, url, **kwargs):
+            calls.append(upstream)
+            if upstream == "omdb":
+                return FakeResponse({"Response": "True", "imdbRating": "N/A", "Runtime": "50 min"})
+            return FakeResponse(
+                text='<script type="application/ld+json">{"aggregateRating": {"ratingValue": 6.4}}</script>'
+            )
+
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+
+        ratings, metadata = get_title_details("tt0000002", "test-agent", "tvseries")
+
+        assert ratings == ("6.4", None)
+        assert metadata == (50, None, None, 50, None)
+        assert calls == ["omdb", "imdb"]
+
+
+def _suggestion(title_id, label, cast=""):
+    return {"id": title_id, "l": label, "s": cast, "qid": "movie", "y": 2000}
+
+
+class TestSuggestionCache:
+    """Tests for the server-side search suggestion cache."""
+
+    def test_repeated_query_is_served_from_memory_then_sqlite(self, app, monkeypatch):
+        """Repeated queries skip IMDB; other processes reuse the SQLite copy."""
+        calls = []
+
+        def fake_get(upstream, url, **kwargs):
+            calls.append(url)
+            return FakeResponse({"d": [_suggestion("tt0000001", "Alien")]})
+
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+
+        assert [r.title_id for r in fetch_suggestions("Alien", "test-agent")] == ["tt0000001"]
+        assert [r.title_id for r in fetch_suggestions("  alien ", "test-agent")] == ["tt0000001"]
+        reset_suggestion_cache()
+        assert [r.title_id for r in fetch_suggestions("alien", "test-agent")] == ["tt0000001"]
+
+        assert len(calls) == 1
+        stats = suggestion_cache_stats()
+        assert stats["db_hits"] == 1
+        assert stats["memory_hits"] == 0
+
+    def test_longer_query_reuses_complete_prefix_results(self, app, monkeypatch):
+        """Type-ahead queries are filtered from a short prefix result without a network call."""
+        calls = []
+
+        def fake_get(upstream, url, **kwargs):
+            calls.append(url)
+            return FakeResponse(
+                {
+                    "d": [
+                        _suggestion("tt0000001", "Star Wars", "Mark Hamill"),
+                        _suggestion("tt0000002", "Star Trek", "William Shatner"),
+                        _suggestion("tt0000003", "A Star Is Born", "Lady Gaga"),
+                    ]
+                }
+            )
+
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+
+        fetch_suggestions("star", "test-agent")
+        results = fetch_suggestions("star wa", "test-agent")
+
+        assert [r.title_id for r in results] == ["tt0000001"]
+        assert len(calls) == 1
+        assert suggestion_cache_stats()["prefix_hits"] == 1
+
+    def test_truncated_prefix_results_are_not_reused(self, app, monkeypatch):
+        """A full page of prefix results may be missing matches, so IMDB is asked again."""
+        calls = []
+
+        def fake_get(upstream, url, **kwargs):
+            calls.append(url)
+            return FakeResponse({"d": [_suggestion(f"tt000000{i}", f"Star {i}") for i in range(8)]})
+
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+
+        fetch_suggestions("star", "test-agent")
+        fetch_suggestions("star 1", "test-agent")
+
+        assert len(calls) == 2
+
+
+class TestCacheEnrichment:
+    """Tests for bulk cache enrichment of search results."""
+
+    def test_search_results_are_enriched_with_one_query_per_cache(self, app, monkeypatch):
+        """All suggestion items are enriched through one connection and two queries."""
+        from webapp import database
+
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000001", "8.1", "90%")
+            database.metadata_cache_set(conn, "tt0000002", 95, None, None, None, "English")
+            conn.commit()
+
+        monkeypatch.setattr(
+            "webapp.external_api.http_get",
+            lambda upstream, url, **kwargs: FakeResponse(
+                {"d": [_suggestion("tt0000001", "One"), _suggestion("tt0000002", "Two"), _suggestion("tt0000003", "Three")]}
+            ),
+        )
+        statements = []
+        original_context = database.get_db_context
+
+        def traced_context():
+            context = original_context()
+            conn = context.__enter__()
+            conn.set_trace_callback(statements.append)
+
+            class Traced:
+                def __enter__(self):
+                    return conn
+
+                def __exit__(self, *exc):
+                    return context.__exit__(*exc)
+
+            return Traced()
+
+        monkeypatch.setattr("webapp.external_api.get_db_context", traced_context)
+
+        results = fetch_suggestions("enrich", "test-agent")
+
+        assert [(r.rating, r.rotten_tomatoes) for r in results] == [("8.1", "90%"), (None, None), (None, None)]
+        assert [r.runtime_minutes for r in results] == [None, 95, None]
+        cache_reads = [sql for sql in statements if "FROM rating_cache" in sql or "FROM metadata_cache" in sql]
+        assert len(cache_reads) == 2
+
+
+class TestStaleWhileRevalidate:
+    """Tests for serving stale ratings while refreshing them in the background."""
+
+    @staticmethod
+    def _age_rating(title_id, seconds):
+        from webapp import database
+
+        with database.get_db_context() as conn:
+            conn.execute("UPDATE rating_cache SET cached_at = cached_at - ? WHERE title_id = ?", (seconds, title_id))
+            conn.commit()
+
+    def test_stale_rating_is_served_and_refreshed_in_background(self, app, monkeypatch):
+        """A rating past its TTL is returned immediately and refetched off the request thread."""
+        import time
+
+        from webapp import database
+
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000010", "6.0", None)
+            database.metadata_cache_set(conn, "tt0000010", 100, None, None, None, "English")
+            conn.commit()
+        self._age_rating("tt0000010", database.CACHE_TTL_SECONDS + 60)
+        monkeypatch.setattr("webapp.external_api._fetch_ratings", lambda title_id, user_agent, deadline=None: ("6.5", "70%"))
+
+        assert get_title_details("tt0000010", "test-agent", "movie")[0] == ("6.0", None)
+
+        deadline = time.time() + 5
+        while time.time() < deadline and rating_cache_stats()["revalidation"]["pending"]:
+            time.sleep(0.02)
+        with database.get_db_context() as conn:
+            assert database.rating_cache_get(conn, "tt0000010") == ("6.5", "70%")
+        stats = rating_cache_stats()
+        assert stats["stale_hits"] == 1
+        assert stats["revalidation"]["submitted"] == 1
+
+    def test_rating_beyond_max_stale_is_fetched_inline(self, app, monkeypatch):
+        """Ratings older than the max-stale limit block on a fresh fetch."""
+        from webapp import database
+
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000011", "5.0", None)
+            database.metadata_cache_set(conn, "tt0000011", 100, None, None, None, "English")
+            conn.commit()
+        self._age_rating("tt0000011", database.CACHE_TTL_SECONDS + 10)
+        monkeypatch.setattr("webapp.external_api.RATING_MAX_STALE_SECONDS", 5)
+        monkeypatch.setattr("webapp.external_api._fetch_omdb_title", lambda *args, **kwargs: {})
+        monkeypatch.setattr(
+            "webapp.external_api._fetch_ratings", lambda title_id, user_agent, payload=None, deadline=None: ("5.5", None)
+        )
+
+        assert get_title_details("tt0000011", "test-agent", "movie")[0] == ("5.5", None)
+        assert rating_cache_stats()["misses"] == 1
+
+
+class TestNegativeCaching:
+    """Tests for failure-aware caching of upstream lookups."""
+
+    def test_upstream_error_is_retried_with_backoff(self, app, monkeypatch):
+        """OMDB quota errors are not cached as missing data and are retried after a backoff."""
+        from webapp import database
+
+        calls = []
+
+        def fake_get(upstream, url, **kwargs):
+            calls.append(upstream)
+            return FakeResponse({"Response": "False", "Error": "Request limit reached!"})
+
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000020", "6.0", None)
+            conn.commit()
+
+        assert get_title_details("tt0000020", "test-agent", "movie")[1] == (None, None, None, None, None)
+        assert get_title_details("tt0000020", "test-agent", "movie")[1] == (None, None, None, None, None)
+        assert calls == ["omdb"]
+
+        with database.get_db_context() as conn:
+            row = conn.execute("SELECT status, failures, retry_at FROM metadata_cache").fetchone()
+            assert row["status"] == "error"
+            assert row["failures"] == 1
+            conn.execute("UPDATE metadata_cache SET retry_at = 0")
+            conn.commit()
+
+        get_title_details("tt0000020", "test-agent", "movie")
+        assert calls == ["omdb", "omdb"]
+        with database.get_db_context() as conn:
+            assert conn.execute("SELECT failures FROM metadata_cache").fetchone()["failures"] == 2
+            assert database.cache_state_counts(conn)["metadata_cache"]["error"] == 1
+
+    def test_missing_title_is_cached_as_absent(self, app, monkeypatch):
+        """Titles OMDB does not know are cached with the long negative TTL."""
+        from webapp import database
+
+        monkeypatch.setattr(
+            "webapp.external_api.http_get",
+            lambda upstream, url, **kwargs: FakeResponse({"Response": "False", "Error": "Incorrect IMDb ID."}),
+        )
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000021", "6.0", None)
+            conn.commit()
+
+        get_title_details("tt0000021", "test-agent", "movie")
+
+        with database.get_db_context() as conn:
+            assert conn.execute("SELECT status FROM metadata_cache").fetchone()["status"] == "absent"
+            assert database.metadata_cache_get_no_ttl(conn, "tt0000021") == (None, None, None, None, None)
+            conn.execute("UPDATE metadata_cache SET cached_at = cached_at - ?", (database.NEGATIVE_CACHE_TTL_SECONDS + 1,))
+            assert database.metadata_cache_get_no_ttl(conn, "tt0000021") is None
+
+    def test_failed_refresh_keeps_last_known_ratings(self, app, monkeypatch):
+        """A transient outage during refresh does not wipe previously cached ratings."""
+        import requests
+
+        from webapp import database
+        from webapp.external_api import fetch_title_details, store_title_details
+
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000022", "7.7", "81%")
+            conn.commit()
+
+        def failing_get(upstream, url, **kwargs):
+            raise requests.ConnectionError("outage")
+
+        monkeypatch.setattr("webapp.external_api.http_get", failing_get)
+
+        ratings, metadata = fetch_title_details("tt0000022", "test-agent", "movie")
+        with database.get_db_context() as conn:
+            details = store_title_details(conn, "tt0000022", ratings, metadata)
+            conn.commit()
+
+        assert details[:2] == ("7.7", "81%")
+        with database.get_db_context() as conn:
+            row = conn.execute("SELECT rating, status FROM rating_cache").fetchone()
+            assert (row["rating"], row["status"]) == ("7.7", "error")
+
+
+class TestDeadlineBudget:
+    """Tests for per-request latency budgets."""
+
+    def test_spent_budget_returns_cached_data_without_recording_failure(self, app, monkeypatch):
+        """A request out of budget serves last known values and leaves failure state untouched."""
+        from webapp import database
+        from webapp.upstream import Deadline
+
+        with database.get_db_context() as conn:
+            database.metadata_cache_set(conn, "tt0000030", 100, None, None, None, "English")
+            conn.commit()
+        monkeypatch.setattr("webapp.upstream.get_session", lambda upstream: pytest.fail("upstream contacted"))
+
+        ratings, metadata = get_title_details("tt0000030", "test-agent", "movie", Deadline(0))
+
+        assert ratings == (None, None)
+        assert metadata == (100, None, None, None, "English")
+        with database.get_db_context() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM rating_cache").fetchone()[0] == 0
+
+    def test_budget_cuts_season_fan_out_short(self, app, monkeypatch):
+        """Slow season lookups are abandoned when the request budget runs out."""
+        from webapp.upstream import Deadline
+
+        def fake_get(upstream, url, params=None, deadline=None, **kwargs):
+            if "Season" in (params or {}):
+                time.sleep(0.5)
+                return FakeResponse({"Response": "True", "Episodes": [{"Released": "2001-01-01"}]})
+            return FakeResponse({"Response": "True", "Runtime": "50 min", "totalSeasons": "3"})
+
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+
+        started = time.monotonic()
+        _, metadata = get_title_details("tt0000031", "test-agent", "tvminiseries", Deadline(0.2))
+
+        assert time.monotonic() - started < 0.45
+        assert metadata == (None, None, None, None, None)
+
+
+class TestCountEpisodes:
+    """Tests for concurrent miniseries season counting."""
+
+    def test_finished_seasons_are_cached_and_airing_seasons_refetched(self, app, monkeypatch):
+        """Only seasons that are still airing hit OMDB on a later refresh."""
+        fetched = []
+
+        def fake_omdb(title_id, user_agent, season=None, deadline=None):
+            fetched.append(season)
+            released = "2099-01-01" if season == 3 else "2001-01-01"
+            return {"Episodes": [{"Released": released}] * season}
+
+        monkeypatch.setattr("webapp.external_api._fetch_omdb_title", fake_omdb)
+
+        assert _count_episodes("tt0000003", "test-agent", 3) == 6
+        assert sorted(fetched) == [1, 2, 3]
+
+        fetched.clear()
+        assert _count_episodes("tt0000003", "test-agent", 3) == 6
+        assert fetched == []
+
+        # Once the airing season expires from the cache, only it is refetched.
+        from webapp import database
+
+        with database.get_db_context() as conn:
+            conn.execute("UPDATE season_cache SET cached_at = 0")
+            conn.commit()
+        assert _count_episodes("tt0000003", "test-agent", 3) == 6
+        assert fetched == [3]
+
+    def test_last_season_of_an_ended_show_is_cached_for_good(self, app, monkeypatch):
+        """The final season is only treated as finished once the show's year span is closed."""
+        from webapp import database
+
+        def fake_omdb(title_id, user_agent, season=None, deadline=None):
+            return {"Episodes": [{"Released": "2001-01-01"}] * 2}
+
+        monkeypatch.setattr("webapp.external_api._fetch_omdb_title", fake_omdb)
+
+        for title_id, year in (("tt0000005", "2000–2001"), ("tt0000006", "2000–")):
+            payload = {"Runtime": "50 min", "totalSeasons": "2", "Year": year}
+            assert _fetch_metadata(title_id, "test-agent", "tvminiseries", payload)[2] == 4
+        with database.get_db_context() as conn:
+            complete = {
+                (row["title_id"], row["season"]): row["is_complete"]
+                for row in conn.execute("SELECT title_id, season, is_complete FROM season_cache")
+            }
+
+        assert complete == {
+            ("tt0000005", 1): 1,
+            ("tt0000005", 2): 1,
+            ("tt0000006", 1): 1,
+            ("tt0000006", 2): 0,
+        }
+
+    def test_failed_season_yields_unknown_total(self, app, monkeypatch):
+        """A missing season makes the total unknown instead of undercounting."""
+        import requests
+
+        def fake_omdb(title_id, user_agent, season=None, deadline=None):
+            if season == 2:
+                raise requests.ConnectionError("boom")
+            return {"Episodes": [{"Released": "2001-01-01"}]}
+
+        monkeypatch.setattr("webapp.external_api._fetch_omdb_title", fake_omdb)
+
+        assert _count_episodes("tt0000004", "test-agent", 3) is None
+
+
 class TestFetchTmdbTrending:
     """Tests for TMDB trending title fetching."""
 
-    def test_fetch_tmdb_trending_maps_results_to_imdb_ids(self, monkeypatch):
+    def test_fetch_tmdb_trending_maps_results_to_imdb_ids(self, app, monkeypatch):
         """TMDB trending results are converted to SearchResult items with IMDB IDs."""
 
         class Response:
@@ -79,7 +520,7 @@ class TestFetchTmdbTrending:
             def json(self):
                 return self._payload
 
-        def fake_get(url, **kwargs):
+        def fake_get(upstream, url, **kwargs):
             if "trending" in url:
                 return Response(
                     {
@@ -115,7 +556,7 @@ class TestFetchTmdbTrending:
 
         monkeypatch.setattr("webapp.external_api.TMDB_ACCESS_TOKEN", "token")
         monkeypatch.setattr("webapp.external_api.TMDB_API_KEY", None)
-        monkeypatch.setattr("webapp.external_api.requests.get", fake_get)
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
 
         results = fetch_tmdb_trending("test-agent")
 
@@ -126,6 +567,36 @@ class TestFetchTmdbTrending:
         assert results[0].image == "https://image.tmdb.org/t/p/w185/poster.jpg"
         assert results[0].rating == "7.8"
 
+    def test_fetch_tmdb_trending_reuses_stored_imdb_ids(self, app, monkeypatch):
+        """Warm trending loads make no external_ids requests."""
+        external_id_calls = []
+
+        def fake_get(upstream, url, **kwargs):
+            if "trending" in url:
+                return FakeResponse(
+                    {
+                        "results": [
+                            {"id": tmdb_id, "media_type": "movie", "title": f"Movie {tmdb_id}"}
+                            for tmdb_id in range(1, 6)
+                        ]
+                    }
+                )
+            external_id_calls.append(url)
+            tmdb_id = int(url.split("/movie/")[1].split("/")[0])
+            return FakeResponse({"imdb_id": f"tt{tmdb_id:07d}" if tmdb_id != 3 else None})
+
+        monkeypatch.setattr("webapp.external_api.TMDB_ACCESS_TOKEN", "token")
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+
+        cold = fetch_tmdb_trending("test-agent")
+        assert [result.title_id for result in cold] == ["tt0000001", "tt0000002", "tt0000004", "tt0000005"]
+        assert len(external_id_calls) == 5
+
+        external_id_calls.clear()
+        warm = fetch_trending("test-agent")
+        assert [result.title_id for result in warm] == [result.title_id for result in cold]
+        assert external_id_calls == []
+
     def test_fetch_tmdb_trending_returns_empty_without_credentials(self, monkeypatch):
         """TMDB is skipped when no credentials are configured."""
         monkeypatch.setattr("webapp.external_api.TMDB_ACCESS_TOKEN", None)
@@ -137,7 +608,7 @@ class TestFetchTmdbTrending:
 class TestFetchTrending:
     """Tests for trending title fetching."""
 
-    def test_fetch_trending_uses_fallback_when_chart_has_no_ids(self, monkeypatch):
+    def test_fetch_trending_uses_fallback_when_chart_has_no_ids(self, app, monkeypatch):
         """IMDB WAF/empty chart responses should still produce fallback results."""
 
         class Response:
@@ -149,7 +620,7 @@ class TestFetchTrending:
         def fake_get(*args, **kwargs):
             return Response()
 
-        def fake_fetch_title_by_id(title_id, user_agent):
+        def fake_lookup_title_summary(title_id, user_agent, deadline=None):
             return SearchResult(
                 title_id=title_id,
                 title=f"Title {title_id}",
@@ -165,16 +636,16 @@ class TestFetchTrending:
                 avg_episode_length=None,
             )
 
-        monkeypatch.setattr("webapp.external_api.fetch_tmdb_trending", lambda user_agent: [])
-        monkeypatch.setattr("webapp.external_api.requests.get", fake_get)
-        monkeypatch.setattr("webapp.external_api.fetch_title_by_id", fake_fetch_title_by_id)
+        monkeypatch.setattr("webapp.external_api.fetch_tmdb_trending", lambda user_agent, deadline=None: [])
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+        monkeypatch.setattr("webapp.external_api._lookup_title_summary", fake_lookup_title_summary)
         monkeypatch.setattr("webapp.external_api.DEFAULT_TRENDING_TITLE_IDS", ("tt0000001", "tt0000002"))
 
         results = fetch_trending("test-agent")
 
         assert [result.title_id for result in results] == ["tt0000001", "tt0000002"]
 
-    def test_fetch_trending_prefers_chart_ids(self, monkeypatch):
+    def test_fetch_trending_prefers_chart_ids(self, app, monkeypatch):
         """Chart IDs are used when IMDB returns parseable chart HTML."""
 
         class Response:
@@ -186,7 +657,7 @@ class TestFetchTrending:
         def fake_get(*args, **kwargs):
             return Response()
 
-        def fake_fetch_title_by_id(title_id, user_agent):
+        def fake_lookup_title_summary(title_id, user_agent, deadline=None):
             return SearchResult(
                 title_id=title_id,
                 title=f"Title {title_id}",
@@ -202,9 +673,9 @@ class TestFetchTrending:
                 avg_episode_length=None,
             )
 
-        monkeypatch.setattr("webapp.external_api.fetch_tmdb_trending", lambda user_agent: [])
-        monkeypatch.setattr("webapp.external_api.requests.get", fake_get)
-        monkeypatch.setattr("webapp.external_api.fetch_title_by_id", fake_fetch_title_by_id)
+        monkeypatch.setattr("webapp.external_api.fetch_tmdb_trending", lambda user_agent, deadline=None: [])
+        monkeypatch.setattr("webapp.external_api.http_get", fake_get)
+        monkeypatch.setattr("webapp.external_api._lookup_title_summary", fake_lookup_title_summary)
         monkeypatch.setattr("webapp.external_api.DEFAULT_TRENDING_TITLE_IDS", ("tt0000001",))
 
         results = fetch_trending("test-agent")
@@ -212,6 +683,50 @@ class TestFetchTrending:
         assert [result.title_id for result in results] == ["tt1234567", "tt7654321"]
 
 
+class TestTitleSummaryCache:
+    """Tests for concurrent, cached resolution of IMDB IDs to title summaries."""
+
+    @staticmethod
+    def _fake_lookup(calls, unresolvable=()):
+        def fake_lookup_title_summary(title_id, user_agent, deadline=None):
+            calls.append(title_id)
+            if title_id in unresolvable:
+                return None
+            return parse_suggestion_item(_suggestion(title_id, f"Title {title_id}"), user_agent, include_details=False)
+
+        return fake_lookup_title_summary
+
+    def test_stops_once_enough_titles_resolve(self, app, monkeypatch):
+        """Only as many IDs as needed for MAX_RESULTS are looked up, in chart order."""
+        from webapp.external_api import MAX_RESULTS, _titles_from_ids
+
+        calls = []
+        ids = [f"tt{index:07d}" for index in range(1, 40)]
+        monkeypatch.setattr("webapp.external_api._lookup_title_summary", self._fake_lookup(calls, {ids[0], ids[3]}))
+
+        results = _titles_from_ids(ids, "test-agent")
+
+        expected = [title_id for title_id in ids if title_id not in {ids[0], ids[3]}][:MAX_RESULTS]
+        assert [result.title_id for result in results] == expected
+        assert sorted(calls) == ids[: MAX_RESULTS + 2]
+
+    def test_summaries_are_reused_without_network(self, app, monkeypatch):
+        """Known summaries and known-unresolvable IDs skip the suggestion endpoint."""
+        from webapp.external_api import _titles_from_ids, fetch_title_by_id
+
+        calls = []
+        monkeypatch.setattr("webapp.external_api._lookup_title_summary", self._fake_lookup(calls, {"tt0000002"}))
+        _titles_from_ids(["tt0000001", "tt0000002"], "test-agent")
+        calls.clear()
+
+        assert [result.title_id for result in _titles_from_ids(["tt0000001", "tt0000002"], "test-agent")] == [
+            "tt0000001"
+        ]
+        assert fetch_title_by_id("tt0000001", "test-agent").title == "Title tt0000001"
+        assert fetch_title_by_id("tt0000002", "test-agent") is None
+        assert calls == []
+
+
 class TestShrinkImageUrl:
     """Tests for shrink_image_url function."""
 
@@ -0,0 +1,307 @@
+"""Tests for room refreshes through the shared refresh pool."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from webapp import database, refresh
+
+
+def _fake_fetch(calls, release=None):
+    def fake_fetch_title_details(title_id, user_agent, normalized_type):
+        calls.append(title_id)
+        if release is not None:
+            release.wait(5)
+        return ("8.1", "90%"), (120, None, None, None, "English")
+
+    return fake_fetch_title_details
+
+
+def _add(client, room, title_ids):
+    for title_id in title_ids:
+        client.post("/api/list", json={"room": room, "title_id": title_id, "title": "Movie", "rating": "6.0"})
+
+
+def _wait_until_done(room):
+    for _ in range(200):
+        if not refresh.room_refresh_status(room)["refreshing"]:
+            return
+        time.sleep(0.01)
+
+
+def _wait_for_claims(count):
+    for _ in range(200):
+        if refresh.refresh_stats()["claimed"] >= count:
+            return
+        time.sleep(0.01)
+
+
+def _wait_for_queued(count):
+    for _ in range(200):
+        if refresh.refresh_stats()["queued_titles"] >= count:
+            return
+        time.sleep(0.01)
+
+
+def _ratings(client, room):
+    items = json.loads(client.get(f"/api/list?room={room}").data)["items"]
+    return {item["title_id"]: item["rating"] for item in items}
+
+
+class TestRoomRefresh:
+    """Tests for deduplicated, batched room refreshes."""
+
+    def test_titles_queued_by_several_rooms_are_fetched_once(self, client, monkeypatch):
+        """Rooms sharing titles wait on one fetch per title and all see the result."""
+        calls = []
+        release = threading.Event()
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", _fake_fetch(calls, release))
+        _add(client, "refreshroom1", ["tt0000150", "tt0000151"])
+        _add(client, "refreshroom2", ["tt0000151", "tt0000152"])
+
+        assert json.loads(client.post("/api/refresh", json={"room": "refreshroom1"}).data)["total"] == 2
+        assert client.post("/api/refresh", json={"room": "refreshroom1"}).status_code == 409
+        client.post("/api/refresh", json={"room": "refreshroom2"})
+        _wait_for_claims(2)
+        release.set()
+        _wait_until_done("refreshroom1")
+        _wait_until_done("refreshroom2")
+
+        assert sorted(calls) == ["tt0000150", "tt0000151", "tt0000152"]
+        assert refresh.refresh_stats()["shared"] == 1
+        assert refresh.room_refresh_status("refreshroom2") == {"refreshing": False, "processed": 2, "total": 2}
+        assert set(_ratings(client, "refreshroom1").values()) == {"8.1"}
+        assert set(_ratings(client, "refreshroom2").values()) == {"8.1"}
+
+    def test_recently_refreshed_titles_are_copied_from_caches(self, client, monkeypatch):
+        """Titles fetched within the refresh window are not fetched again."""
+        calls = []
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", _fake_fetch(calls))
+        _add(client, "freshroom", ["tt0000160", "tt0000161"])
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000160", "7.2", "75%")
+            database.metadata_cache_set(conn, "tt0000160", 95, None, None, None, "English")
+            conn.commit()
+
+        client.post("/api/refresh", json={"room": "freshroom"})
+        _wait_until_done("freshroom")
+
+        assert calls == ["tt0000161"]
+        assert _ratings(client, "freshroom") == {"tt0000160": "7.2", "tt0000161": "8.1"}
+        assert refresh.refresh_stats()["skipped_fresh"] == 1
+
+    def test_fetched_titles_are_written_in_batches(self, client, monkeypatch):
+        """Fetched titles are stored a batch per transaction rather than a commit per title."""
+        monkeypatch.setattr("webapp.refresh.REFRESH_BATCH_SIZE", 2)
+        release = threading.Event()
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", _fake_fetch([], release))
+        _add(client, "batchroom", [f"tt000017{index}" for index in range(5)])
+
+        client.post("/api/refresh", json={"room": "batchroom"})
+        _wait_for_queued(5)
+        release.set()
+        _wait_until_done("batchroom")
+
+        assert set(_ratings(client, "batchroom").values()) == {"8.1"}
+        # Every write but the last one holds at least REFRESH_BATCH_SIZE titles.
+        assert 1 <= refresh.refresh_stats()["batches"] <= 3
+
+    def test_progress_is_written_before_the_batch_fills(self, client, monkeypatch):
+        """Titles fetched while others are still in flight show up in the job's progress within the interval."""
+        monkeypatch.setattr("webapp.refresh.REFRESH_BATCH_SIZE", 100)
+        monkeypatch.setattr("webapp.refresh.REFRESH_PROGRESS_SECONDS", 0.05)
+        release = threading.Event()
+
+        def fake_fetch_title_details(title_id, user_agent, normalized_type):
+            if title_id == "tt0000178":
+                release.wait(5)
+            return ("8.1", "90%"), (120, None, None, None, "English")
+
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", fake_fetch_title_details)
+        _add(client, "progressroom", ["tt0000178", "tt0000179", "tt0000180"])
+
+        client.post("/api/refresh", json={"room": "progressroom"})
+        for _ in range(200):
+            if refresh.room_refresh_status("progressroom")["processed"] == 2:
+                break
+            time.sleep(0.01)
+        midway = refresh.room_refresh_status("progressroom")
+        release.set()
+        _wait_until_done("progressroom")
+
+        assert midway == {"refreshing": True, "processed": 2, "total": 3}
+        assert refresh.room_refresh_status("progressroom")["processed"] == 3
+
+    def test_titles_beyond_a_full_queue_are_fetched_later(self, client, monkeypatch):
+        """Titles the pool cannot take stay unfinished and are queued again instead of counted as done."""
+        calls = []
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", _fake_fetch(calls))
+        monkeypatch.setattr("webapp.refresh.REFRESH_POLL_SECONDS", 0.01)
+        monkeypatch.setattr(refresh._pool, "max_pending", 1)
+        _add(client, "fullqueueroom", ["tt0000175", "tt0000176", "tt0000177"])
+
+        client.post("/api/refresh", json={"room": "fullqueueroom"})
+        _wait_until_done("fullqueueroom")
+
+        assert sorted(calls) == ["tt0000175", "tt0000176", "tt0000177"]
+        assert refresh.room_refresh_status("fullqueueroom") == {"refreshing": False, "processed": 3, "total": 3}
+        assert refresh.refresh_stats()["deferred"] >= 2
+
+
+class TestRefreshJobs:
+    """Tests for refresh jobs stored in SQLite and run by whichever process claims them."""
+
+    @pytest.fixture(autouse=True)
+    def worker_mode(self, monkeypatch):
+        """Leave jobs to an explicit worker loop, as with SHOVO_REFRESH_IN_PROCESS=0."""
+        monkeypatch.setattr("webapp.refresh.REFRESH_IN_PROCESS", False)
+
+    def test_queued_job_is_run_by_a_worker_and_progress_is_shared(self, client, monkeypatch):
+        """The web process only queues the job; a worker runs it and status reads the stored progress."""
+        calls = []
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", _fake_fetch(calls))
+        _add(client, "jobroom", ["tt0000180", "tt0000181"])
+
+        client.post("/api/refresh", json={"room": "jobroom"})
+        queued = json.loads(client.get("/api/refresh/status?room=jobroom").data)
+        refresh.run_jobs_once()
+        _wait_until_done("jobroom")
+
+        assert queued == {"refreshing": True, "processed": 0, "total": 2}
+        assert sorted(calls) == ["tt0000180", "tt0000181"]
+        assert json.loads(client.get("/api/refresh/status?room=jobroom").data) == {
+            "refreshing": False,
+            "processed": 2,
+            "total": 2,
+        }
+        with database.get_db_context() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM refresh_job_titles").fetchone()[0] == 0
+
+    def test_job_of_a_dead_owner_resumes_with_unfinished_titles(self, client, monkeypatch):
+        """A running job whose lease expired is claimed again and only its unfinished titles are fetched."""
+        calls = []
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", _fake_fetch(calls))
+        _add(client, "resumeroom", ["tt0000190", "tt0000191", "tt0000192"])
+        client.post("/api/refresh", json={"room": "resumeroom"})
+        with database.get_db_context() as conn:
+            assert database.refresh_job_claim(conn, "crashed-worker", -1) == "resumeroom"
+            database.refresh_job_mark_done(conn, "resumeroom", ["tt0000190"])
+            conn.commit()
+
+        refresh.run_jobs_once()
+        _wait_until_done("resumeroom")
+
+        assert sorted(calls) == ["tt0000191", "tt0000192"]
+        assert refresh.room_refresh_status("resumeroom") == {"refreshing": False, "processed": 3, "total": 3}
+
+    def test_stale_jobs_are_collected(self, client):
+        """Jobs untouched for longer than the retention window are deleted; recent ones stay."""
+        _add(client, "oldroom", ["tt0000200"])
+        _add(client, "newroom", ["tt0000201"])
+        client.post("/api/refresh", json={"room": "oldroom"})
+        client.post("/api/refresh", json={"room": "newroom"})
+        with database.get_db_context() as conn:
+            conn.execute("UPDATE refresh_jobs SET updated_at = 0 WHERE room = 'oldroom'")
+            conn.commit()
+
+        with database.get_db_context() as conn:
+            collected = database.refresh_job_collect(conn, int(time.time()) - 60)
+            conn.commit()
+            rooms = [row["room"] for row in conn.execute("SELECT room FROM refresh_jobs")]
+            job_titles = [row["room"] for row in conn.execute("SELECT DISTINCT room FROM refresh_job_titles")]
+
+        assert collected == 1
+        assert rooms == ["newroom"] == job_titles
+        assert refresh.room_refresh_status("oldroom") == {"refreshing": False, "processed": 0, "total": 0}
+
+    def test_deleting_a_room_drops_its_job(self, client):
+        """A deleted room leaves no refresh job behind."""
+        _add(client, "gonerroom", ["tt0000210"])
+        client.post("/api/refresh", json={"room": "gonerroom"})
+
+        client.delete("/api/list/delete-room", json={"room": "gonerroom"})
+
+        with database.get_db_context() as conn:
+            assert database.refresh_job_get(conn, "gonerroom") is None
+
+    def test_renaming_a_room_moves_its_job(self, client, monkeypatch):
+        """A running refresh follows the room to its new name and resumes there from its unfinished titles."""
+        calls = []
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", _fake_fetch(calls))
+        _add(client, "beforeroom", ["tt0000215", "tt0000216"])
+        client.post("/api/refresh", json={"room": "beforeroom"})
+        with database.get_db_context() as conn:
+            assert database.refresh_job_claim(conn, "other-worker", 60) == "beforeroom"
+            database.refresh_job_mark_done(conn, "beforeroom", ["tt0000215"])
+            conn.commit()
+
+        client.patch("/api/list/rename", json={"room": "beforeroom", "next_room": "afterroom"})
+        refresh.run_jobs_once()
+        _wait_until_done("afterroom")
+
+        assert calls == ["tt0000216"]
+        assert refresh.room_refresh_status("afterroom") == {"refreshing": False, "processed": 2, "total": 2}
+        assert refresh.room_refresh_status("beforeroom") == {"refreshing": False, "processed": 0, "total": 0}
+
+
+def _events(body):
+    return [
+        dict(line.split(": ", 1) for line in block.splitlines())
+        for block in body.split("\n\n")
+        if block.startswith("id: ")
+    ]
+
+
+class TestRefreshStream:
+    """Tests for refresh progress pushed over Server-Sent Events."""
+
+    def test_stream_pushes_progress_until_the_refresh_ends(self, client, monkeypatch):
+        """Each progress change is sent once and the stream closes after the final state."""
+        release = threading.Event()
+        monkeypatch.setattr("webapp.refresh.fetch_title_details", _fake_fetch([], release))
+        _add(client, "streamroom", ["tt0000220", "tt0000221"])
+        client.post("/api/refresh", json={"room": "streamroom"})
+        threading.Timer(0.2, release.set).start()
+
+        response = client.get("/api/refresh/stream?room=streamroom")
+        events = _events(response.get_data(as_text=True))
+
+        assert response.mimetype == "text/event-stream"
+        assert events[0]["id"] == "0-2-1"
+        assert events[-1]["id"] == "2-2-0"
+        assert json.loads(events[-1]["data"]) == {"refreshing": False, "processed": 2, "total": 2}
+        assert len({event["id"] for event in events}) == len(events)
+
+    def test_idle_stream_sends_heartbeats_and_ends_for_reconnect(self, client, monkeypatch):
+        """A stream without progress sends heartbeats and ends before harakiri; the client resumes by ID."""
+        monkeypatch.setattr("webapp.routes.REFRESH_STREAM_SECONDS", 0.3)
+        monkeypatch.setattr("webapp.routes.REFRESH_STREAM_HEARTBEAT_SECONDS", 0.05)
+        monkeypatch.setattr("webapp.routes.REFRESH_STREAM_POLL_SECONDS", 0.05)
+        monkeypatch.setattr("webapp.refresh.REFRESH_IN_PROCESS", False)
+        _add(client, "heartroom", ["tt0000230"])
+        client.post("/api/refresh", json={"room": "heartroom"})
+
+        first = client.get("/api/refresh/stream?room=heartroom").get_data(as_text=True)
+        resumed = client.get("/api/refresh/stream?room=heartroom", headers={"Last-Event-ID": "0-1-1"})
+
+        assert ": heartbeat" in first
+        assert [event["id"] for event in _events(first)] == ["0-1-1"]
+        assert _events(resumed.get_data(as_text=True)) == []
+
+    def test_finished_refresh_already_seen_is_not_streamed(self, client):
+        """A client holding the final state gets 204 so EventSource stops reconnecting."""
+        response = client.get("/api/refresh/stream?room=quietroom", headers={"Last-Event-ID": "0-0-0"})
+
+        assert response.status_code == 204
+
+    def test_streams_beyond_the_limit_are_refused(self, client, monkeypatch):
+        """Viewers beyond REFRESH_STREAM_MAX get a 503 and fall back to polling."""
+        monkeypatch.setattr("webapp.routes.REFRESH_STREAM_MAX", 0)
+
+        response = client.get("/api/refresh/stream?room=fullroom")
+
+        assert response.status_code == 503
+        assert json.loads(response.data) == {"error": "too_many_streams"}
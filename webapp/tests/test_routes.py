@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 
 
 class TestRootRoute:
@@ -219,6 +221,51 @@ class TestListAPI:
         data = json.loads(response.data)
         assert data["error"] == "missing_title_id"
 
+    def test_title_rows_are_shared_and_pruned(self, client):
+        """Rooms listing the same title share one titles row, deleted with the last listing."""
+        from webapp import database
+
+        for room in ("titleroom1", "titleroom2"):
+            client.post("/api/list", json={"room": room, "title_id": "tt0000140", "title": "Movie", "year": "1999"})
+        # A re-add keeps what is already known.
+        client.post("/api/list", json={"room": "titleroom2", "title_id": "tt0000140", "title": "Movie"})
+        with database.get_db_context() as conn:
+            rows = conn.execute("SELECT year FROM titles WHERE title_id = 'tt0000140'").fetchall()
+            assert [row["year"] for row in rows] == ["1999"]
+
+        client.delete("/api/list", json={"room": "titleroom1", "title_id": "tt0000140"})
+        with database.get_db_context() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM titles WHERE title_id = 'tt0000140'").fetchone()[0] == 1
+        client.delete("/api/list/delete-room", json={"room": "titleroom2"})
+        with database.get_db_context() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM titles WHERE title_id = 'tt0000140'").fetchone()[0] == 0
+
+    def test_adding_a_title_never_changes_another_rooms_listing(self, client):
+        """Values posted by one room do not overwrite the shared title another room lists."""
+        client.post(
+            "/api/list",
+            json={"room": "aliceroom", "title_id": "tt0000141", "title": "Movie", "rating": "7.0", "image": "a.jpg"},
+        )
+
+        client.post(
+            "/api/list",
+            json={
+                "room": "malloryroom",
+                "title_id": "tt0000141",
+                "title": "HACKED",
+                "rating": "1.0",
+                "image": "https://evil.example/x.jpg",
+            },
+        )
+
+        item = json.loads(client.get("/api/list?room=aliceroom").data)["items"][0]
+        assert (item["title"], item["rating"], item["image"]) == ("Movie", "7.0", "a.jpg")
+
+
+def _list_order(client, room):
+    data = json.loads(client.get(f"/api/list?room={room}&per_page=100").data)
+    return [item["title_id"] for item in data["items"]]
+
 
 class TestOrderAPI:
     """Tests for order API."""
@@ -246,6 +293,96 @@ class TestOrderAPI:
         )
         assert order_response.status_code == 200
 
+    def test_reorder_keeps_titles_in_their_slots(self, client):
+        """Reordering one page only permutes that page's positions."""
+        for index in range(5):
+            client.post("/api/list", json={"room": "slotroom", "title_id": f"tt000010{index}", "title": "Movie"})
+        assert _list_order(client, "slotroom") == ["tt0000104", "tt0000103", "tt0000102", "tt0000101", "tt0000100"]
+
+        client.patch("/api/list/order", json={"room": "slotroom", "order": ["tt0000102", "tt0000103"]})
+
+        assert _list_order(client, "slotroom") == ["tt0000104", "tt0000102", "tt0000103", "tt0000101", "tt0000100"]
+
+    def test_reorder_rejects_titles_from_both_lists(self, client):
+        """Watched and unwatched titles cannot be reordered together."""
+        from webapp import database
+
+        client.post("/api/list", json={"room": "mixroom", "title_id": "tt0000105", "title": "Movie"})
+        client.post("/api/list", json={"room": "mixroom", "title_id": "tt0000106", "title": "Movie", "watched": 1})
+        with database.get_db_context() as conn:
+            before = conn.execute("SELECT title_id, position FROM lists WHERE room = 'mixroom'").fetchall()
+
+        response = client.patch("/api/list/order", json={"room": "mixroom", "order": ["tt0000106", "tt0000105"]})
+
+        assert response.status_code == 400
+        assert json.loads(response.data)["error"] == "mixed_order"
+        with database.get_db_context() as conn:
+            after = conn.execute("SELECT title_id, position FROM lists WHERE room = 'mixroom'").fetchall()
+        assert [tuple(row) for row in after] == [tuple(row) for row in before]
+
+    def test_move_writes_only_the_moved_row(self, client):
+        """Moving a title takes a free position between its new neighbours."""
+        from webapp import database
+
+        for index in range(4):
+            client.post("/api/list", json={"room": "moveroom", "title_id": f"tt000011{index}", "title": "Movie"})
+        with database.get_db_context() as conn:
+            before = dict(conn.execute("SELECT title_id, position FROM lists WHERE room = 'moveroom'").fetchall())
+
+        response = client.patch(
+            "/api/list/move", json={"room": "moveroom", "title_id": "tt0000110", "before": "tt0000112"}
+        )
+
+        assert response.status_code == 200
+        assert _list_order(client, "moveroom") == ["tt0000113", "tt0000110", "tt0000112", "tt0000111"]
+        with database.get_db_context() as conn:
+            after = dict(conn.execute("SELECT title_id, position FROM lists WHERE room = 'moveroom'").fetchall())
+        assert {title_id for title_id in after if after[title_id] != before[title_id]} == {"tt0000110"}
+
+        client.patch("/api/list/move", json={"room": "moveroom", "title_id": "tt0000113", "after": "tt0000111"})
+        client.patch("/api/list/move", json={"room": "moveroom", "title_id": "tt0000111", "top": True})
+        assert _list_order(client, "moveroom") == ["tt0000111", "tt0000110", "tt0000112", "tt0000113"]
+
+    def test_move_respaces_room_when_gaps_run_out(self, client):
+        """Dense positions are respaced before the move, and narrow gaps in the background."""
+        from webapp import database, routes
+
+        for index in range(3):
+            client.post("/api/list", json={"room": "denseroom", "title_id": f"tt000012{index}", "title": "Movie"})
+        with database.get_db_context() as conn:
+            conn.execute("UPDATE lists SET position = CAST(SUBSTR(title_id, -1) AS INTEGER) + 1")
+            conn.commit()
+
+        client.patch("/api/list/move", json={"room": "denseroom", "title_id": "tt0000120", "before": "tt0000121"})
+        assert _list_order(client, "denseroom") == ["tt0000122", "tt0000120", "tt0000121"]
+
+        with database.get_db_context() as conn:
+            conn.execute("UPDATE lists SET position = 10 WHERE title_id = 'tt0000121'")
+            conn.execute("UPDATE lists SET position = 14 WHERE title_id = 'tt0000122'")
+            conn.commit()
+        client.patch("/api/list/move", json={"room": "denseroom", "title_id": "tt0000120", "after": "tt0000122"})
+        for _ in range(50):
+            if not routes._compaction_pool.stats()["pending"]:
+                break
+            time.sleep(0.05)
+
+        assert _list_order(client, "denseroom") == ["tt0000122", "tt0000120", "tt0000121"]
+        with database.get_db_context() as conn:
+            positions = sorted(row[0] for row in conn.execute("SELECT position FROM lists WHERE room = 'denseroom'"))
+        assert positions == [database.POSITION_GAP, 2 * database.POSITION_GAP, 3 * database.POSITION_GAP]
+
+    def test_move_rejects_neighbour_from_other_status(self, client):
+        """A title can only be placed next to a title with the same watched status."""
+        client.post("/api/list", json={"room": "statusroom", "title_id": "tt0000130", "title": "Movie"})
+        client.post("/api/list", json={"room": "statusroom", "title_id": "tt0000131", "title": "Seen", "watched": 1})
+
+        response = client.patch(
+            "/api/list/move", json={"room": "statusroom", "title_id": "tt0000130", "before": "tt0000131"}
+        )
+
+        assert response.status_code == 400
+        assert json.loads(response.data)["error"] == "invalid_neighbor"
+
     def test_update_order_requires_list(self, client):
         """Test order update requires valid list."""
         response = client.patch(
@@ -389,6 +526,156 @@ class TestDetailsAPI:
         data = json.loads(response.data)
         assert data["error"] == "missing_title_id"
 
+    def test_details_degraded_while_breakers_open(self, client):
+        """With OMDB and IMDB breakers open, cached details are served and flagged as degraded."""
+        from webapp import database, upstream
+
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000040", "6.1", None)
+            conn.execute("UPDATE rating_cache SET cached_at = 0")
+            conn.commit()
+        upstream._breakers[upstream.UPSTREAM_OMDB]._trip()
+        upstream._breakers[upstream.UPSTREAM_IMDB]._trip()
+
+        response = client.get("/api/details?title_id=tt0000040&type_label=movie")
+
+        data = json.loads(response.data)
+        assert data["rating"] == "6.1"
+        assert data["degraded"] is True
+        with database.get_db_context() as conn:
+            statuses = [row["status"] for row in conn.execute("SELECT status FROM rating_cache")]
+            assert statuses == ["ok"]
+            assert conn.execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0] == 0
+
+
+class TestDetailsBatchAPI:
+    """Tests for the batch details API."""
+
+    def test_batch_answers_cached_and_fetches_misses(self, client, monkeypatch):
+        """Cached titles come from the bulk lookup; only misses reach the upstream fetch."""
+        from webapp import database
+
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000050", "8.0", "95%")
+            database.metadata_cache_set(conn, "tt0000050", 100, None, None, None, "en")
+            conn.commit()
+        fetched = []
+
+        def fake_fetch(title_id, user_agent, normalized_type, include_ratings=True, include_metadata=True, deadline=None):
+            fetched.append((title_id, normalized_type))
+            return ("6.5", None), (None, 3, 30, 45, "fr")
+
+        monkeypatch.setattr("webapp.external_api._fetch_title_details", fake_fetch)
+
+        response = client.post(
+            "/api/details/batch",
+            json={
+                "titles": [
+                    {"title_id": "tt0000050", "type_label": "movie"},
+                    {"title_id": "tt0000051", "type_label": "tvSeries"},
+                ]
+            },
+        )
+
+        data = json.loads(response.data)
+        assert fetched == [("tt0000051", "tvseries")]
+        assert data["results"]["tt0000050"]["rating"] == "8.0"
+        assert data["results"]["tt0000050"]["runtime_minutes"] == 100
+        assert data["results"]["tt0000051"]["total_seasons"] == 3
+        assert data["pending"] == []
+        assert data["degraded"] is False
+
+    def test_batch_reports_slow_titles_as_pending(self, client, monkeypatch):
+        """Titles still loading when the budget runs out are returned as pending."""
+        from webapp import routes
+
+        release = threading.Event()
+
+        def slow_fetch(title_id, user_agent, normalized_type, include_ratings=True, include_metadata=True, deadline=None):
+            release.wait(5)
+            return None, None
+
+        monkeypatch.setattr("webapp.external_api._fetch_title_details", slow_fetch)
+        monkeypatch.setitem(routes.ENDPOINT_SLO_SECONDS, "details", 0.2)
+
+        try:
+            response = client.post("/api/details/batch", json={"titles": [{"title_id": "tt0000052"}]})
+        finally:
+            release.set()
+            time.sleep(0.1)
+
+        data = json.loads(response.data)
+        assert data["results"] == {}
+        assert data["pending"] == ["tt0000052"]
+
+    def test_skipped_title_does_not_make_loaded_titles_pending(self, client, monkeypatch):
+        """Only the title whose call was skipped is pending; titles that loaded are answered."""
+        skipped = threading.Event()
+
+        def fake_fetch(title_id, user_agent, normalized_type, include_ratings=True, include_metadata=True, deadline=None):
+            if title_id == "tt0000053":
+                deadline.degraded = True  # as when a breaker refuses the call
+                skipped.set()
+                return None, None
+            skipped.wait(5)
+            return ("7.0", None), (90, None, None, None, "en")
+
+        monkeypatch.setattr("webapp.external_api._fetch_title_details", fake_fetch)
+
+        response = client.post(
+            "/api/details/batch", json={"titles": [{"title_id": "tt0000053"}, {"title_id": "tt0000054"}]}
+        )
+
+        data = json.loads(response.data)
+        assert data["pending"] == ["tt0000053"]
+        assert data["results"]["tt0000054"]["rating"] == "7.0"
+        assert data["degraded"] is True
+
+    def test_batch_charges_the_details_rate_limit_per_uncached_title(self, client, monkeypatch):
+        """Uncached titles count against the client's details limit; cached answers are free."""
+        from webapp import database, routes
+
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000055", "8.0", None)
+            database.metadata_cache_set(conn, "tt0000055", 100, None, None, None, "en")
+            conn.commit()
+        fetched = []
+
+        def fake_fetch(title_id, user_agent, normalized_type, include_ratings=True, include_metadata=True, deadline=None):
+            fetched.append(title_id)
+            return ("6.5", None), (90, None, None, None, "en")
+
+        monkeypatch.setattr("webapp.external_api._fetch_title_details", fake_fetch)
+        routes._rate_limit_buckets[("127.0.0.1", "details")] = [time.time()] * 239
+        titles = [{"title_id": "tt0000055"}, {"title_id": "tt0000056"}, {"title_id": "tt0000057"}]
+
+        limited = client.post("/api/details/batch", json={"titles": titles})
+        cached = client.post("/api/details/batch", json={"titles": titles[:1]})
+
+        data = json.loads(limited.data)
+        assert limited.status_code == 200
+        assert int(limited.headers["Retry-After"]) >= 1
+        assert data["rate_limited"] is True
+        assert data["results"]["tt0000055"]["rating"] == "8.0"
+        assert data["pending"] == ["tt0000056", "tt0000057"]
+        assert fetched == []
+        assert json.loads(cached.data)["rate_limited"] is False
+        assert json.loads(cached.data)["results"]["tt0000055"]["rating"] == "8.0"
+        assert client.get("/api/details?title_id=tt0000055").status_code == 200
+        assert client.get("/api/details?title_id=tt0000055").status_code == 429
+
+    def test_batch_rejects_invalid_payloads(self, client):
+        """The batch needs a list of titles with IDs and is capped in size."""
+        from webapp import external_api
+
+        assert client.post("/api/details/batch", json={}).status_code == 400
+        response = client.post("/api/details/batch", json={"titles": [{"type_label": "movie"}]})
+        assert json.loads(response.data)["error"] == "missing_title_id"
+        too_many = [{"title_id": f"tt{index:07d}"} for index in range(external_api.DETAIL_BATCH_MAX_TITLES + 1)]
+        response = client.post("/api/details/batch", json={"titles": too_many})
+        assert response.status_code == 400
+        assert json.loads(response.data)["error"] == "too_many_titles"
+
 
 class TestRefreshAPI:
     """Tests for refresh API."""
@@ -416,6 +703,26 @@ class TestRefreshAPI:
         assert "processed" in data
         assert "total" in data
 
+    def test_refresh_updates_shared_title_for_every_room(self, client, monkeypatch):
+        """Refreshing one room writes the shared title row, so other rooms see the new values."""
+        for room in ("sharedroom1", "sharedroom2"):
+            client.post(
+                "/api/list", json={"room": room, "title_id": "tt0000130", "title": "Movie", "rating": "6.0"}
+            )
+        monkeypatch.setattr(
+            "webapp.external_api._fetch_title_details",
+            lambda *args, **kwargs: (("8.1", "90%"), (120, None, None, None, "English")),
+        )
+
+        client.post("/api/refresh", json={"room": "sharedroom1"})
+        for _ in range(100):
+            if not json.loads(client.get("/api/refresh/status?room=sharedroom1").data)["refreshing"]:
+                break
+            time.sleep(0.01)
+
+        item = json.loads(client.get("/api/list?room=sharedroom2").data)["items"][0]
+        assert (item["rating"], item["rotten_tomatoes"], item["runtime_minutes"]) == ("8.1", "90%", 120)
+
 
 class TestPagination:
     """Tests for pagination."""
@@ -445,6 +752,100 @@ class TestPagination:
         page2_data = json.loads(page2_response.data)
         assert len(page2_data["items"]) == 5
 
+    def test_list_counts_and_null_positions_last(self, client):
+        """Counts cover both statuses and unpositioned titles still sort after positioned ones."""
+        from webapp import database
+
+        for index in range(3):
+            client.post("/api/list", json={"room": "countroom", "title_id": f"tt000007{index}", "title": "Movie"})
+        client.post("/api/list", json={"room": "countroom", "title_id": "tt0000079", "title": "Seen", "watched": 1})
+        with database.get_db_context() as conn:
+            conn.execute("UPDATE lists SET position = NULL WHERE title_id = 'tt0000072'")
+            conn.commit()
+
+        data = json.loads(client.get("/api/list?room=countroom").data)
+
+        assert data["counts"] == {"watched": 1, "unwatched": 3}
+        assert data["total_count"] == 3
+        assert [item["title_id"] for item in data["items"]] == ["tt0000071", "tt0000070", "tt0000072"]
+
+    def test_list_queries_use_index(self, app):
+        """Offset pages, cursor pages and counts walk the room index instead of sorting the room."""
+        from webapp import database
+
+        from webapp.routes import LIST_ITEMS_SQL
+
+        queries = {
+            "offset": (
+                f"""
+                {LIST_ITEMS_SQL} WHERE lists.room = ? AND lists.watched = ?
+                ORDER BY lists.position DESC, lists.added_at DESC, lists.title_id DESC LIMIT 10 OFFSET 20
+                """,
+                ("room", 0),
+            ),
+            "cursor": (
+                f"""
+                {LIST_ITEMS_SQL} WHERE lists.room = ? AND lists.watched = ?
+                    AND (lists.position, lists.added_at, lists.title_id) < (?, ?, ?)
+                ORDER BY lists.position DESC, lists.added_at DESC, lists.title_id DESC LIMIT 10
+                """,
+                ("room", 0, 5, 0, "tt0000001"),
+            ),
+            "counts": ("SELECT watched, COUNT(*) FROM lists WHERE room = ? GROUP BY watched", ("room",)),
+        }
+        with database.get_db_context() as conn:
+            plans = {
+                name: " ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+                for name, (sql, params) in queries.items()
+            }
+
+        for plan in plans.values():
+            assert "idx_lists_room_page" in plan
+            assert "TEMP B-TREE" not in plan
+        assert "(position,added_at,title_id)<" in plans["cursor"]
+        assert "COVERING INDEX" in plans["counts"]
+
+    def test_cursor_pagination_walks_every_item_once(self, client):
+        """Following next_cursor returns each title once in page order, unpositioned titles last."""
+        from webapp import database
+
+        for index in range(7):
+            client.post("/api/list", json={"room": "cursorroom", "title_id": f"tt000009{index}", "title": "Movie"})
+        with database.get_db_context() as conn:
+            conn.execute("UPDATE lists SET position = NULL WHERE title_id IN ('tt0000092', 'tt0000095')")
+            conn.execute(  # tie on position
+                "UPDATE lists SET position = (SELECT position FROM lists WHERE title_id = 'tt0000093') "
+                "WHERE title_id = 'tt0000096'"
+            )
+            conn.commit()
+        expected = [
+            item["title_id"]
+            for item in json.loads(client.get("/api/list?room=cursorroom&per_page=100").data)["items"]
+        ]
+
+        seen = []
+        cursor = ""
+        for _ in range(10):
+            data = json.loads(client.get(f"/api/list?room=cursorroom&per_page=2&cursor={cursor}").data)
+            seen += [item["title_id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == expected
+        assert len(seen) == 7
+        assert set(expected[-2:]) == {"tt0000092", "tt0000095"}
+
+    def test_per_page_is_capped_and_bad_cursor_rejected(self, client):
+        """per_page cannot exceed the server maximum and malformed cursors are refused."""
+        from webapp import routes
+
+        data = json.loads(client.get("/api/list?room=caproom&per_page=100000").data)
+        assert data["per_page"] == routes.LIST_MAX_PER_PAGE
+        response = client.get("/api/list?room=caproom&cursor=not-a-cursor")
+        assert response.status_code == 400
+        assert json.loads(response.data)["error"] == "invalid_cursor"
+
     def test_pagination_invalid_page(self, client):
         """Test pagination with invalid page parameter."""
         response = client.get("/api/list?room=testroom&page=invalid")
@@ -0,0 +1,169 @@
+"""Tests for single-flight request coalescing."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from webapp import database, singleflight
+from webapp.external_api import get_title_details
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    """Start every test with zeroed counters."""
+    singleflight.reset_single_flight_stats()
+    yield
+    singleflight.reset_single_flight_stats()
+
+
+def _run_concurrently(func, count):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(index):
+        try:
+            results[index] = func()
+        except Exception as exc:  # noqa: BLE001 - surfaced through errors
+            errors[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results, errors
+
+
+class TestSingleFlight:
+    """Tests for the in-process single-flight layer."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Only one call runs per key; the others receive its result."""
+        calls = []
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "value"
+
+        timer = threading.Timer(0.2, release.set)
+        timer.start()
+        results, errors = _run_concurrently(lambda: singleflight.single_flight(("ratings", "tt1"), slow), 5)
+
+        assert results == ["value"] * 5
+        assert errors == [None] * 5
+        assert len(calls) == 1
+        stats = singleflight.single_flight_stats()
+        assert stats["leaders"] == 1
+        assert stats["suppressed"] == 4
+        assert stats["in_flight"] == 0
+
+    def test_errors_reach_waiting_callers(self):
+        """A failing fetch fails every caller that waited on it."""
+        release = threading.Event()
+
+        def failing():
+            release.wait(timeout=5)
+            raise ValueError("upstream broke")
+
+        timer = threading.Timer(0.2, release.set)
+        timer.start()
+        _, errors = _run_concurrently(lambda: singleflight.single_flight(("metadata", "tt2"), failing), 3)
+
+        assert all(isinstance(error, ValueError) for error in errors)
+
+    def test_waiters_give_up_after_wait_timeout(self):
+        """A duplicate caller with a spent budget stops waiting instead of blocking."""
+        release = threading.Event()
+        leader = threading.Thread(
+            target=lambda: singleflight.single_flight(("ratings", "tt4"), lambda: release.wait(timeout=5))
+        )
+        leader.start()
+        time.sleep(0.05)
+        try:
+            with pytest.raises(TimeoutError):
+                singleflight.single_flight(("ratings", "tt4"), lambda: "unused", wait_timeout=0.05)
+        finally:
+            release.set()
+            leader.join(timeout=5)
+
+    def test_cross_process_lease_waits_for_other_holder(self, app, monkeypatch):
+        """A lease held by another process delays the fetch until it is released."""
+        monkeypatch.setattr("webapp.singleflight.CROSS_PROCESS", True)
+        with database.get_db_context() as conn:
+            assert database.lease_acquire(conn, "flight:details:tt3", "other-process", 30)
+            conn.commit()
+
+        def release_other():
+            time.sleep(0.2)
+            with database.get_db_context() as conn:
+                database.lease_release(conn, "flight:details:tt3", "other-process")
+                conn.commit()
+
+        threading.Thread(target=release_other).start()
+        started = time.time()
+        assert singleflight.single_flight(("details", "tt3"), lambda: "fresh") == "fresh"
+
+        assert time.time() - started >= 0.2
+        assert singleflight.single_flight_stats()["suppressed_cross_process"] == 1
+        with database.get_db_context() as conn:
+            # Released again: another process can take it straight away.
+            assert database.lease_acquire(conn, "flight:details:tt3", "next-process", 30)
+
+
+    def test_cross_process_wait_gives_up_after_wait_timeout(self, app, monkeypatch):
+        """A caller with a budget stops waiting on another process's lease instead of outlasting it."""
+        monkeypatch.setattr("webapp.singleflight.CROSS_PROCESS", True)
+        with database.get_db_context() as conn:
+            assert database.lease_acquire(conn, "flight:details:tt5", "other-process", 30)
+            conn.commit()
+        calls = []
+
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            singleflight.single_flight(("details", "tt5"), lambda: calls.append(1), wait_timeout=0.2)
+
+        assert time.monotonic() - started < 1.0
+        assert calls == []
+        assert singleflight.single_flight_stats()["in_flight"] == 0
+
+    def test_details_fall_back_to_cache_while_another_process_holds_the_lease(self, app, monkeypatch):
+        """get_title_details answers last known values within its budget while the fetch runs elsewhere."""
+        from webapp.upstream import Deadline
+
+        monkeypatch.setattr("webapp.singleflight.CROSS_PROCESS", True)
+        with database.get_db_context() as conn:
+            database.rating_cache_set(conn, "tt0000010", "6.0", None)
+            conn.execute("UPDATE rating_cache SET cached_at = 0 WHERE title_id = 'tt0000010'")
+            assert database.lease_acquire(conn, "flight:details:tt0000010", "other-process", 30)
+            conn.commit()
+
+        started = time.monotonic()
+        ratings, _ = get_title_details("tt0000010", "test-agent", "movie", Deadline(0.3))
+
+        assert time.monotonic() - started < 1.0
+        assert ratings == ("6.0", None)
+
+
+class TestTitleDetailsCoalescing:
+    """Tests for coalescing of concurrent title detail misses."""
+
+    def test_concurrent_details_misses_fetch_once(self, app, monkeypatch):
+        """Several users opening one title trigger a single OMDB request."""
+        calls = []
+
+        def fake_omdb(title_id, user_agent, season=None, deadline=None):
+            calls.append(title_id)
+            time.sleep(0.2)
+            return {"Response": "True", "imdbRating": "7.0", "Runtime": "90 min"}
+
+        monkeypatch.setattr("webapp.external_api._fetch_omdb_title", fake_omdb)
+
+        results, errors = _run_concurrently(lambda: get_title_details("tt0000009", "test-agent", "movie"), 4)
+
+        assert errors == [None] * 4
+        assert all(result == (("7.0", None), (90, None, None, None, None)) for result in results)
+        assert calls == ["tt0000009"]
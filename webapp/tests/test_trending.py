@@ -0,0 +1,193 @@
+"""Tests for the shared trending snapshot."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from webapp import database, trending
+from webapp.models import SearchResult
+from webapp.upstream import Deadline
+from webapp.utils import serialize_result
+
+
+def _result(title_id):
+    return SearchResult(
+        title_id=title_id,
+        title=f"Title {title_id}",
+        year="2024",
+        original_language=None,
+        type_label="movie",
+        image=None,
+        rating=None,
+        rotten_tomatoes=None,
+        runtime_minutes=None,
+        total_seasons=None,
+        total_episodes=None,
+        avg_episode_length=None,
+    )
+
+
+def _fake_fetch(calls, title_ids=("tt0000001", "tt0000002")):
+    def fake_fetch_trending(user_agent, deadline=None):
+        calls.append(user_agent)
+        return [_result(title_id) for title_id in title_ids]
+
+    return fake_fetch_trending
+
+
+def _fake_details(calls, release=None):
+    def fake_get_title_details(title_id, user_agent, normalized_type, deadline=None):
+        calls.append(title_id)
+        if release is not None:
+            release.wait(5)
+        return ("7.5", "90%"), (120, None, None, None, "en")
+
+    return fake_get_title_details
+
+
+def _wait_for(stat):
+    for _ in range(50):
+        if trending.trending_stats()[stat]:
+            return
+        time.sleep(0.05)
+
+
+@pytest.fixture(autouse=True)
+def offline_details(monkeypatch):
+    """Keep background enrichment away from real upstreams."""
+    monkeypatch.setattr("webapp.external_api.get_title_details", _fake_details([]))
+
+
+class TestTrendingSnapshot:
+    """Tests for the SQLite-backed trending snapshot."""
+
+    def test_cold_start_fetches_once_and_shares_snapshot(self, app, monkeypatch):
+        """The first fetch is stored so other processes (and restarts) serve it without fetching."""
+        calls = []
+        monkeypatch.setattr("webapp.trending.fetch_trending", _fake_fetch(calls))
+
+        first = trending.get_trending("test-agent")
+        trending.reset_trending_memo()  # as seen from a freshly started process
+        second = trending.get_trending("test-agent")
+
+        assert [result.title_id for result in first] == ["tt0000001", "tt0000002"]
+        assert second == first
+        assert calls == ["test-agent"]
+
+    def test_stale_snapshot_is_served_while_refreshing_in_background(self, app, monkeypatch):
+        """A stale snapshot is returned immediately and replaced by a background refresh."""
+        calls = []
+        monkeypatch.setattr("webapp.trending.fetch_trending", _fake_fetch(calls, ("tt0000003",)))
+        with database.get_db_context() as conn:
+            conn.execute(
+                "INSERT INTO trending_snapshot (id, items, fetched_at) VALUES (1, ?, 0)",
+                (json.dumps([serialize_result(_result("tt0000009"))]),),
+            )
+            conn.commit()
+
+        stale = trending.get_trending("test-agent")
+
+        assert [result.title_id for result in stale] == ["tt0000009"]
+        _wait_for("refreshes")
+        assert [result.title_id for result in trending.get_trending("test-agent")] == ["tt0000003"]
+        assert calls == ["test-agent"]
+
+    def test_cold_start_waits_for_other_lease_holder(self, app, monkeypatch):
+        """Without a snapshot, a process waits for the lease holder instead of fetching too."""
+        calls = []
+        monkeypatch.setattr("webapp.trending.fetch_trending", _fake_fetch(calls))
+        with database.get_db_context() as conn:
+            assert database.lease_acquire(conn, trending.REFRESH_LEASE_NAME, "other-process", 30)
+            conn.commit()
+
+        def finish_other_refresh():
+            time.sleep(0.2)
+            with database.get_db_context() as conn:
+                database.trending_snapshot_set(conn, [serialize_result(_result("tt0000007"))])
+                database.lease_release(conn, trending.REFRESH_LEASE_NAME, "other-process")
+                conn.commit()
+
+        threading.Thread(target=finish_other_refresh).start()
+        results = trending.get_trending("test-agent")
+
+        assert [result.title_id for result in results] == ["tt0000007"]
+        assert calls == []
+        assert trending.trending_stats()["lease_waits"] == 1
+
+    def test_background_refresh_stores_enriched_cards(self, app, monkeypatch):
+        """A background refresh loads details before swapping the snapshot in."""
+        detail_calls = []
+        monkeypatch.setattr("webapp.trending.fetch_trending", _fake_fetch([]))
+        monkeypatch.setattr("webapp.external_api.get_title_details", _fake_details(detail_calls))
+
+        trending.schedule_refresh("test-agent")
+        _wait_for("refreshes")
+        results = trending.get_trending("test-agent")
+
+        assert sorted(detail_calls) == ["tt0000001", "tt0000002"]
+        assert all(result.details_complete for result in results)
+        assert results[0].rating == "7.5"
+        assert results[0].runtime_minutes == 120
+
+    def test_cold_start_is_enriched_in_background(self, app, monkeypatch):
+        """A request-time cold start serves cached details, then every process sees the enriched copy."""
+        detail_calls = []
+        release = threading.Event()
+        monkeypatch.setattr("webapp.trending.fetch_trending", _fake_fetch([]))
+        monkeypatch.setattr("webapp.external_api.get_title_details", _fake_details(detail_calls, release))
+
+        first = trending.get_trending("test-agent", Deadline(15))
+        assert not any(result.details_complete for result in first)
+        with database.get_db_context() as conn:
+            fetched_at, revision = database.trending_snapshot_version(conn)
+        release.set()
+        _wait_for("enrichments")
+        trending.reset_trending_memo()  # as seen from another process with the old copy parsed
+        with trending._lock:
+            trending._memo.update(version=(fetched_at, revision), results=first)
+        enriched = trending.get_trending("test-agent")
+
+        assert all(result.details_complete for result in enriched)
+        with database.get_db_context() as conn:
+            assert database.trending_snapshot_version(conn) == (fetched_at, revision + 1)
+
+    def test_empty_fetch_keeps_the_previous_snapshot(self, app, monkeypatch):
+        """An empty upstream answer is not stored; the old snapshot stays and is refreshed again."""
+        calls = []
+        monkeypatch.setattr("webapp.trending.fetch_trending", _fake_fetch(calls, ()))
+        with database.get_db_context() as conn:
+            conn.execute(
+                "INSERT INTO trending_snapshot (id, items, fetched_at) VALUES (1, ?, 0)",
+                (json.dumps([serialize_result(_result("tt0000009"))]),),
+            )
+            conn.commit()
+
+        trending.get_trending("test-agent")
+        _wait_for("empty_fetches")
+
+        assert [result.title_id for result in trending.get_trending("test-agent")] == ["tt0000009"]
+        with database.get_db_context() as conn:
+            assert database.trending_snapshot_version(conn)[0] == 0
+        assert trending.trending_stats()["refreshes"] == 0
+
+    def test_empty_cold_start_is_not_stored(self, app, monkeypatch):
+        """A cold start that finds nothing answers empty and leaves no snapshot behind."""
+        monkeypatch.setattr("webapp.trending.fetch_trending", _fake_fetch([], ()))
+
+        assert trending.get_trending("test-agent", Deadline(15)) == []
+        with database.get_db_context() as conn:
+            assert database.trending_snapshot_version(conn) is None
+
+    def test_trending_endpoint_serves_snapshot(self, client, monkeypatch):
+        """GET /api/trending returns the stored snapshot."""
+        monkeypatch.setattr("webapp.trending.fetch_trending", _fake_fetch([]))
+
+        response = client.get("/api/trending")
+        _wait_for("enrichments")
+
+        data = json.loads(response.data)
+        assert [item["title_id"] for item in data["results"]] == ["tt0000001", "tt0000002"]
+        assert data["degraded"] is False
@@ -0,0 +1,269 @@
+"""Tests for the pooled upstream HTTP client."""
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from webapp import quota, upstream
+
+
+def _ok_response():
+    response = requests.Response()
+    response.status_code = 200
+    return response
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return None
+
+
+@pytest.fixture
+def local_server():
+    """Serve keep-alive HTTP responses on an ephemeral local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_sessions(monkeypatch):
+    """Give each test its own session pool and counters, without call budgets."""
+    monkeypatch.setattr("webapp.quota.DEFAULT_LIMITS", {})
+    with upstream._lock:
+        upstream._sessions.clear()
+    upstream.reset_upstream_stats()
+    upstream.reset_breakers()
+    yield
+    with upstream._lock:
+        upstream._sessions.clear()
+    upstream.reset_upstream_stats()
+    upstream.reset_breakers()
+
+
+class TestHttpGet:
+    """Tests for pooled upstream requests."""
+
+    def test_connections_are_reused_per_upstream(self, local_server):
+        """Repeated calls to one upstream share a single keep-alive connection."""
+        for _ in range(3):
+            response = upstream.http_get(upstream.UPSTREAM_OMDB, local_server)
+            assert response.json() == {"ok": True}
+
+        stats = upstream.upstream_stats()[upstream.UPSTREAM_OMDB]
+        assert stats["requests"] == 3
+        assert stats["errors"] == 0
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 2
+
+    def test_session_is_shared_and_recreated_after_fork(self, monkeypatch):
+        """Workers forked from the uWSGI master get fresh connection pools."""
+        first = upstream.get_session(upstream.UPSTREAM_TMDB)
+        assert upstream.get_session(upstream.UPSTREAM_TMDB) is first
+
+        monkeypatch.setattr("webapp.upstream.os.getpid", lambda: -1)
+        assert upstream.get_session(upstream.UPSTREAM_TMDB) is not first
+
+    def test_per_upstream_timeout_override(self, monkeypatch):
+        """Per-host timeouts override the global default."""
+        captured = {}
+
+        def fake_get(url, **kwargs):
+            captured.update(kwargs)
+            return _ok_response()
+
+        monkeypatch.setenv("SHOVO_UPSTREAM_TIMEOUT_IMDB_SUGGEST", "2.5")
+        session = upstream.get_session(upstream.UPSTREAM_IMDB_SUGGEST)
+        monkeypatch.setattr(session, "get", fake_get)
+
+        upstream.http_get(upstream.UPSTREAM_IMDB_SUGGEST, "https://example.invalid/")
+
+        assert captured["timeout"] == 2.5
+
+    def test_deadline_caps_timeout(self, monkeypatch):
+        """Calls made under a request deadline only get the remaining budget."""
+        captured = {}
+
+        def fake_get(url, **kwargs):
+            captured.update(kwargs)
+            return _ok_response()
+
+        session = upstream.get_session(upstream.UPSTREAM_OMDB)
+        monkeypatch.setattr(session, "get", fake_get)
+
+        upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/", deadline=upstream.Deadline(1.0))
+
+        assert 0 < captured["timeout"] <= 1.0
+
+    def test_spent_deadline_skips_upstream(self, monkeypatch):
+        """Once the budget is spent, no request is sent and DeadlineExceeded is raised."""
+        session = upstream.get_session(upstream.UPSTREAM_OMDB)
+        monkeypatch.setattr(session, "get", lambda url, **kwargs: pytest.fail("upstream contacted"))
+
+        with pytest.raises(upstream.DeadlineExceeded):
+            upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/", deadline=upstream.Deadline(0))
+
+        stats = upstream.upstream_stats()[upstream.UPSTREAM_OMDB]
+        assert stats["deadline_exceeded"] == 1
+        assert stats["requests"] == 0
+
+
+class TestCircuitBreaker:
+    """Tests for per-upstream circuit breakers."""
+
+    def _fail_calls(self, monkeypatch, count):
+        def failing_get(url, **kwargs):
+            raise requests.ConnectionError("down")
+
+        monkeypatch.setattr(upstream.get_session(upstream.UPSTREAM_OMDB), "get", failing_get)
+        for _ in range(count):
+            with pytest.raises(requests.ConnectionError):
+                upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/")
+
+    def test_trips_on_error_rate_and_fails_fast(self, monkeypatch):
+        """After enough failures, calls are refused without contacting the upstream."""
+        self._fail_calls(monkeypatch, upstream.BREAKER_MIN_CALLS)
+        deadline = upstream.Deadline(5)
+
+        with pytest.raises(upstream.CircuitOpen):
+            upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/", deadline=deadline)
+
+        assert deadline.degraded
+        stats = upstream.breaker_stats()[upstream.UPSTREAM_OMDB]
+        assert stats["state"] == upstream.BREAKER_OPEN
+        assert stats["trips"] == 1
+        assert stats["rejected"] == 1
+        assert upstream.upstream_stats()[upstream.UPSTREAM_OMDB]["requests"] == upstream.BREAKER_MIN_CALLS
+        assert upstream.breaker_stats()[upstream.UPSTREAM_TMDB]["state"] == upstream.BREAKER_CLOSED
+
+    def test_trips_on_slow_p90(self, monkeypatch):
+        """Consistently slow answers trip the breaker even when they succeed."""
+        clock = iter(range(0, 1000, 10))
+        monkeypatch.setattr("webapp.upstream.time.monotonic", lambda: float(next(clock)))
+        monkeypatch.setattr(
+            upstream.get_session(upstream.UPSTREAM_IMDB), "get", lambda url, **kwargs: _ok_response()
+        )
+
+        for _ in range(upstream.BREAKER_MIN_CALLS):
+            upstream.http_get(upstream.UPSTREAM_IMDB, "https://example.invalid/")
+
+        assert upstream.breaker_stats()[upstream.UPSTREAM_IMDB]["state"] == upstream.BREAKER_OPEN
+
+    def test_half_open_probe_closes_breaker(self, monkeypatch):
+        """After the cool-down a single probe is let through and closes the breaker on success."""
+        self._fail_calls(monkeypatch, upstream.BREAKER_MIN_CALLS)
+        monkeypatch.setattr("webapp.upstream.BREAKER_COOLDOWN_SECONDS", 0)
+        entered = threading.Event()
+        release = threading.Event()
+
+        def slow_ok(url, **kwargs):
+            entered.set()
+            release.wait(timeout=5)
+            return _ok_response()
+
+        monkeypatch.setattr(upstream.get_session(upstream.UPSTREAM_OMDB), "get", slow_ok)
+        probe = threading.Thread(target=upstream.http_get, args=(upstream.UPSTREAM_OMDB, "https://example.invalid/"))
+        probe.start()
+        assert entered.wait(timeout=5)
+        try:
+            with pytest.raises(upstream.CircuitOpen):
+                upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/")
+        finally:
+            release.set()
+            probe.join(timeout=5)
+
+        assert upstream.breaker_stats()[upstream.UPSTREAM_OMDB]["state"] == upstream.BREAKER_CLOSED
+        assert upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/").status_code == 200
+
+
+class TestQuota:
+    """Tests for shared upstream call budgets."""
+
+    @pytest.fixture(autouse=True)
+    def omdb_budget(self, app, monkeypatch):
+        """Give OMDB a small budget that refills slowly."""
+        monkeypatch.setattr("webapp.quota.DEFAULT_LIMITS", {"omdb": (0.01, 4.0)})
+        monkeypatch.setattr("webapp.quota.BACKGROUND_MAX_WAIT_SECONDS", 0)
+        monkeypatch.setattr("webapp.quota.INTERACTIVE_MAX_WAIT_SECONDS", 0)
+        monkeypatch.setattr(
+            upstream.get_session(upstream.UPSTREAM_OMDB), "get", lambda url, **kwargs: _ok_response()
+        )
+
+    def test_background_calls_leave_reserve_for_interactive(self):
+        """Background work stops at the reserve, which interactive requests can still use."""
+        for _ in range(3):
+            upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/")
+        with pytest.raises(upstream.QuotaExhausted):
+            upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/")
+
+        deadline = upstream.Deadline(5)
+        assert upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/", deadline=deadline).ok
+        with pytest.raises(upstream.QuotaExhausted):
+            upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/", deadline=deadline)
+        assert deadline.degraded
+
+        stats = quota.quota_stats()["upstreams"]["omdb"]
+        assert stats["granted"] == 4
+        assert stats["throttled"] == 2
+        assert stats["remaining"] < 1
+
+    def test_budget_is_shared_through_sqlite(self):
+        """Tokens taken in one process are gone for every other process."""
+        from webapp import database
+
+        with database.get_db_context() as conn:
+            for _ in range(4):
+                assert database.quota_take(conn, "omdb", 0.01, 4.0) == 0
+            conn.commit()
+
+        with pytest.raises(upstream.QuotaExhausted):
+            upstream.http_get(upstream.UPSTREAM_OMDB, "https://example.invalid/", deadline=upstream.Deadline(5))
+
+    def test_unbudgeted_upstreams_are_not_throttled(self, monkeypatch):
+        """Upstreams without a configured rate never wait for tokens."""
+        monkeypatch.setattr(
+            upstream.get_session(upstream.UPSTREAM_IMDB), "get", lambda url, **kwargs: _ok_response()
+        )
+        for _ in range(10):
+            upstream.http_get(upstream.UPSTREAM_IMDB, "https://example.invalid/")
+        assert "imdb" not in quota.quota_stats()["upstreams"]
+
+
+class TestStatsAPI:
+    """Tests for the operator stats endpoint."""
+
+    def test_stats_hidden_without_token(self, client, monkeypatch):
+        """Stats are not exposed unless an operator token is configured and supplied."""
+        monkeypatch.delenv("SHOVO_STATS_TOKEN", raising=False)
+        assert client.get("/api/stats").status_code == 404
+
+        monkeypatch.setenv("SHOVO_STATS_TOKEN", "secret")
+        assert client.get("/api/stats", headers={"X-Stats-Token": "wrong"}).status_code == 404
+
+    def test_stats_reports_upstream_counters(self, client, monkeypatch):
+        """Stats include per-upstream connection counters."""
+        monkeypatch.setenv("SHOVO_STATS_TOKEN", "secret")
+        response = client.get("/api/stats", headers={"X-Stats-Token": "secret"})
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert set(data["upstream"]) >= {"imdb", "imdb_suggest", "omdb", "tmdb"}
+        assert "connections_reused" in data["upstream"]["omdb"]
+        assert data["breakers"]["omdb"]["state"] == "closed"
+        assert "upstreams" in data["quotas"]
@@ -0,0 +1,242 @@
+"""Trending snapshot shared by all uWSGI processes and restarts through SQLite."""
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from typing import Any
+
+# Support both package and standalone imports
+try:
+    from .database import (
+        get_db_context,
+        lease_acquire,
+        lease_release,
+        trending_snapshot_get,
+        trending_snapshot_set,
+        trending_snapshot_version,
+    )
+    from .external_api import enrich_from_cache, enrich_with_details, fetch_trending
+    from .models import SearchResult
+    from .singleflight import single_flight
+    from .upstream import Deadline, DeadlineExceeded, capped_timeout, deadline_expired
+    from .utils import env_float, env_int, serialize_result
+    from .workers import BackgroundPool
+except ImportError:
+    from database import (
+        get_db_context,
+        lease_acquire,
+        lease_release,
+        trending_snapshot_get,
+        trending_snapshot_set,
+        trending_snapshot_version,
+    )
+    from external_api import enrich_from_cache, enrich_with_details, fetch_trending
+    from models import SearchResult
+    from singleflight import single_flight
+    from upstream import Deadline, DeadlineExceeded, capped_timeout, deadline_expired
+    from utils import env_float, env_int, serialize_result
+    from workers import BackgroundPool
+
+TRENDING_TTL_SECONDS = env_int("SHOVO_TRENDING_TTL", 60 * 60, minimum=60)
+REFRESH_LEASE_NAME = "trending:refresh"
+REFRESH_LEASE_TTL_SECONDS = env_float("SHOVO_TRENDING_LEASE_TTL", 120.0, minimum=5.0)
+ENRICH_DEADLINE_SECONDS = env_float("SHOVO_TRENDING_ENRICH_DEADLINE", 60.0, minimum=1.0)
+WAIT_POLL_SECONDS = 0.05
+WAIT_POLL_MAX_SECONDS = 0.5
+
+_lock = threading.Lock()
+# Parsed copy of the snapshot, reused until any process stores a new revision.
+_memo: dict[str, Any] = {"version": None, "results": []}
+_stats = {"refreshes": 0, "empty_fetches": 0, "enrichments": 0, "lease_waits": 0}
+_refresh_pool = BackgroundPool("shovo-trending-refresh", max_workers=1, max_pending=2)
+
+
+def _count(key: str) -> None:
+    with _lock:
+        _stats[key] += 1
+
+
+def _load_snapshot() -> tuple[list[SearchResult], int] | None:
+    """Return the shared snapshot and its fetch time, parsing it only when it changed."""
+    with get_db_context() as conn:
+        version = trending_snapshot_version(conn)
+        if version is None:
+            return None
+        with _lock:
+            if _memo["version"] == version:
+                return list(_memo["results"]), version[0]
+        snapshot = trending_snapshot_get(conn)
+    if snapshot is None:
+        return None
+    items, fetched_at, revision = snapshot
+    try:
+        results = [SearchResult(**item) for item in items]
+    except TypeError:
+        # Written by a release with a different SearchResult shape; treat as missing.
+        return None
+    with _lock:
+        _memo.update(version=(fetched_at, revision), results=results)
+    return list(results), fetched_at
+
+
+def _is_fresh(fetched_at: int) -> bool:
+    return fetched_at + TRENDING_TTL_SECONDS > time.time()
+
+
+def _store_snapshot(results: list[SearchResult], fetched_at: int | None = None) -> None:
+    """Swap in a new snapshot in one statement, so readers never see a half-enriched list."""
+    with get_db_context() as conn:
+        version = trending_snapshot_set(conn, [serialize_result(result) for result in results], fetched_at)
+        conn.commit()
+    with _lock:
+        _memo.update(version=version, results=list(results))
+
+
+def _acquire_refresh_lease() -> str | None:
+    """Take the refresh lease, returning its owner token, or None while another process holds it."""
+    owner = secrets.token_hex(8)
+    with get_db_context() as conn:
+        acquired = lease_acquire(conn, REFRESH_LEASE_NAME, owner, REFRESH_LEASE_TTL_SECONDS)
+        conn.commit()
+    return owner if acquired else None
+
+
+def _release_refresh_lease(owner: str) -> None:
+    with get_db_context() as conn:
+        lease_release(conn, REFRESH_LEASE_NAME, owner)
+        conn.commit()
+
+
+def _refresh(user_agent: str, deadline: Deadline | None = None) -> list[SearchResult] | None:
+    """Fetch and store a new snapshot while holding the refresh lease.
+
+    Background refreshes (no deadline) fill in every card's details before the new
+    snapshot is swapped in. A request-time cold start only uses cached details and
+    leaves the rest to a background enrichment. Returns None without fetching when
+    another process holds the lease. A list cut short by the request budget, or an
+    empty one (upstream errors come back as no results), is returned but not stored,
+    so the previous snapshot keeps being served and is refreshed again later.
+    """
+    owner = _acquire_refresh_lease()
+    if owner is None:
+        return None
+    try:
+        snapshot = _load_snapshot()
+        if snapshot is not None and _is_fresh(snapshot[1]):
+            # Another process finished a refresh while we were queued.
+            return snapshot[0]
+        results = fetch_trending(user_agent, deadline)
+        if deadline is None:
+            results = enrich_with_details(results, user_agent, timeout=ENRICH_DEADLINE_SECONDS)
+        else:
+            results = enrich_from_cache(results)
+        stored = bool(results) and not deadline_expired(deadline)
+        if stored:
+            _store_snapshot(results)
+        _count("refreshes" if results else "empty_fetches")
+    finally:
+        _release_refresh_lease(owner)
+    if stored and deadline is not None:
+        # Scheduled only once the lease is free, so the enrichment can take it.
+        _refresh_pool.submit("trending-enrich", _enrich_snapshot, user_agent)
+    return results
+
+
+def _enrich_snapshot(user_agent: str) -> None:
+    """Fill missing details into the stored snapshot and swap it in under the same fetch time."""
+    owner = _acquire_refresh_lease()
+    if owner is None:
+        return
+    try:
+        snapshot = _load_snapshot()
+        if snapshot is None or all(result.details_complete for result in snapshot[0]):
+            return
+        results, fetched_at = snapshot
+        # Enrich copies; the parsed snapshot is shared with request threads.
+        copies = [SearchResult(**serialize_result(result)) for result in results]
+        _store_snapshot(enrich_with_details(copies, user_agent, timeout=ENRICH_DEADLINE_SECONDS), fetched_at)
+        _count("enrichments")
+    finally:
+        _release_refresh_lease(owner)
+
+
+def _fetch_or_wait(user_agent: str, deadline: Deadline | None) -> list[SearchResult]:
+    """Fetch the first snapshot, or wait for the process holding the refresh lease to store it.
+
+    If the holder gives up without storing a snapshot, the lease is taken over.
+    """
+    delay = WAIT_POLL_SECONDS
+    waited = False
+    while True:
+        results = _refresh(user_agent, deadline)
+        if results is not None:
+            return results
+        if not waited:
+            waited = True
+            _count("lease_waits")
+        snapshot = _load_snapshot()
+        if snapshot is not None:
+            return snapshot[0]
+        if deadline_expired(deadline):
+            raise DeadlineExceeded("Timed out waiting for the trending refresh")
+        time.sleep(capped_timeout(deadline, delay))
+        delay = min(delay * 2, WAIT_POLL_MAX_SECONDS)
+
+
+def schedule_refresh(user_agent: str) -> None:
+    """Refresh the snapshot on a background thread unless a refresh is already queued here."""
+    _refresh_pool.submit("trending", _refresh, user_agent)
+
+
+def ensure_trending_preload(user_agent: str) -> None:
+    """Start a background refresh when the snapshot is missing or stale."""
+    with get_db_context() as conn:
+        version = trending_snapshot_version(conn)
+    if version is None or not _is_fresh(version[0]):
+        schedule_refresh(user_agent)
+
+
+def get_trending(user_agent: str, deadline: Deadline | None = None) -> list[SearchResult]:
+    """Return the shared trending snapshot, refreshing it in the background once stale.
+
+    Only a cold start with no snapshot in any process fetches synchronously. Concurrent
+    cold requests in this process share one fetch; other processes wait for the lease
+    holder to store its snapshot.
+    """
+    snapshot = _load_snapshot()
+    if snapshot is not None:
+        results, fetched_at = snapshot
+        if not _is_fresh(fetched_at):
+            schedule_refresh(user_agent)
+        return results
+    try:
+        return single_flight(
+            ("trending",),
+            lambda: _fetch_or_wait(user_agent, deadline),
+            wait_timeout=deadline.remaining() if deadline is not None else None,
+        )
+    except TimeoutError as exc:
+        raise DeadlineExceeded("Timed out waiting for the trending refresh") from exc
+
+
+def trending_stats() -> dict[str, Any]:
+    """Return snapshot age and refresh counters."""
+    with get_db_context() as conn:
+        version = trending_snapshot_version(conn)
+    fetched_at = version[0] if version is not None else None
+    with _lock:
+        stats: dict[str, Any] = dict(_stats)
+    stats["fetched_at"] = fetched_at
+    stats["age_seconds"] = int(time.time()) - fetched_at if fetched_at is not None else None
+    stats["background"] = _refresh_pool.stats()
+    return stats
+
+
+def reset_trending_memo() -> None:
+    """Forget the parsed snapshot and counters (used by tests)."""
+    with _lock:
+        _memo.update(version=None, results=[])
+        for key in _stats:
+            _stats[key] = 0
+    _refresh_pool.reset_stats()
@@ -0,0 +1,404 @@
+"""Pooled keep-alive HTTP client shared by all upstream metadata fetchers."""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Support both package and standalone imports
+try:
+    from .quota import (
+        BACKGROUND_MAX_WAIT_SECONDS,
+        INTERACTIVE_MAX_WAIT_SECONDS,
+        PRIORITY_BACKGROUND,
+        PRIORITY_INTERACTIVE,
+        acquire,
+    )
+    from .utils import env_flag, env_float, env_int
+except ImportError:
+    from quota import (
+        BACKGROUND_MAX_WAIT_SECONDS,
+        INTERACTIVE_MAX_WAIT_SECONDS,
+        PRIORITY_BACKGROUND,
+        PRIORITY_INTERACTIVE,
+        acquire,
+    )
+    from utils import env_flag, env_float, env_int
+
+UPSTREAM_IMDB_SUGGEST = "imdb_suggest"
+UPSTREAM_IMDB = "imdb"
+UPSTREAM_OMDB = "omdb"
+UPSTREAM_TMDB = "tmdb"
+UPSTREAM_BASE_URLS = {
+    UPSTREAM_IMDB_SUGGEST: "https://v3.sg.media-imdb.com/",
+    UPSTREAM_IMDB: "https://www.imdb.com/",
+    UPSTREAM_OMDB: "https://www.omdbapi.com/",
+    UPSTREAM_TMDB: "https://api.themoviedb.org/",
+}
+DEFAULT_TIMEOUT_SECONDS = env_float("SHOVO_UPSTREAM_TIMEOUT", 10.0, minimum=0.1)
+POOL_SIZE = env_int("SHOVO_UPSTREAM_POOL_SIZE", 10, minimum=1)
+PREWARM_TIMEOUT_SECONDS = 3.0
+MIN_CALL_SECONDS = 0.05
+BREAKER_ENABLED = env_flag("SHOVO_BREAKER_ENABLED", True)
+BREAKER_WINDOW = env_int("SHOVO_BREAKER_WINDOW", 20, minimum=1)
+BREAKER_MIN_CALLS = env_int("SHOVO_BREAKER_MIN_CALLS", 10, minimum=1)
+BREAKER_ERROR_RATE = env_float("SHOVO_BREAKER_ERROR_RATE", 0.5, minimum=0.01)
+BREAKER_SLOW_P90_SECONDS = env_float("SHOVO_BREAKER_SLOW_P90", 5.0, minimum=0.1)
+BREAKER_COOLDOWN_SECONDS = env_float("SHOVO_BREAKER_COOLDOWN", 30.0, minimum=0.1)
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class UpstreamError(requests.RequestException):
+    """An upstream answered but reported a failure (quota, bad key, incomplete data)."""
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The request's latency budget ran out before an upstream call could be made."""
+
+
+class CircuitOpen(UpstreamError):
+    """The upstream's circuit breaker is open, so the call was not attempted."""
+
+
+class QuotaExhausted(UpstreamError):
+    """The upstream's call budget had no token left in time, so the call was not attempted."""
+
+
+class Deadline:
+    """Latency budget of one incoming request, shared by every upstream call it makes.
+
+    degraded is set once a call was skipped because an upstream's circuit breaker
+    is open or its quota ran dry, so the response can tell clients it was served from
+    caches only, and exceeded once a call was refused because the budget was spent.
+    Calls made under a deadline count as interactive for quota purposes.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.degraded = False
+        self.exceeded = False
+
+    def remaining(self) -> float:
+        """Return the seconds left in the budget (never negative)."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < MIN_CALL_SECONDS
+
+    def cap(self, seconds: float) -> float:
+        """Return seconds limited to the remaining budget, raising DeadlineExceeded once it is spent."""
+        remaining = self.remaining()
+        if remaining < MIN_CALL_SECONDS:
+            self.exceeded = True
+            raise DeadlineExceeded(f"Request budget of {self.seconds:g}s spent")
+        return min(seconds, remaining)
+
+    def child(self) -> Deadline:
+        """Return a deadline with the same expiry whose flags track one of several concurrent calls."""
+        child = Deadline(self.seconds)
+        child.expires_at = self.expires_at
+        return child
+
+
+def deadline_expired(deadline: Deadline | None) -> bool:
+    """Return whether an optional deadline has run out."""
+    return deadline is not None and deadline.expired
+
+
+def upstream_skipped(deadline: Deadline | None) -> bool:
+    """Return whether calls under an optional deadline were skipped by the budget or a breaker."""
+    return deadline is not None and (deadline.degraded or deadline.expired)
+
+
+def capped_timeout(deadline: Deadline | None, seconds: float) -> float:
+    """Limit a wait to an optional deadline's remaining budget (0 once it is spent)."""
+    if deadline is None:
+        return seconds
+    return min(seconds, deadline.remaining())
+
+
+class CircuitBreaker:
+    """Per-upstream breaker that trips on a high error rate or slow 90th percentile latency.
+
+    Outcomes of the last BREAKER_WINDOW calls are kept. Once the breaker is open, calls
+    are refused until the cool-down has passed; then a single half-open probe decides
+    whether it closes again or stays open for another cool-down.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._samples: deque[tuple[bool, float]] = deque(maxlen=BREAKER_WINDOW)
+        self._state = BREAKER_CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = {"trips": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        """Return whether a call may be made now, claiming the probe slot when half-open."""
+        with self._lock:
+            if self._state == BREAKER_OPEN and time.monotonic() - self._opened_at >= BREAKER_COOLDOWN_SECONDS:
+                self._state = BREAKER_HALF_OPEN
+                self._probing = False
+            if self._state == BREAKER_CLOSED:
+                return True
+            if self._state == BREAKER_HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot that allow() granted but that was not used."""
+        with self._lock:
+            self._probing = False
+
+    def record(self, ok: bool, latency: float) -> None:
+        """Record the outcome of a call that allow() let through."""
+        with self._lock:
+            if self._state == BREAKER_HALF_OPEN:
+                if ok and latency < BREAKER_SLOW_P90_SECONDS:
+                    self._state = BREAKER_CLOSED
+                    self._samples.clear()
+                else:
+                    self._trip()
+                return
+            if self._state == BREAKER_OPEN:
+                return
+            self._samples.append((ok, latency))
+            if len(self._samples) < BREAKER_MIN_CALLS:
+                return
+            error_rate, p90 = self._window()
+            if error_rate >= BREAKER_ERROR_RATE or p90 >= BREAKER_SLOW_P90_SECONDS:
+                self._trip()
+
+    def _trip(self) -> None:
+        self._state = BREAKER_OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self._samples.clear()
+        self._stats["trips"] += 1
+
+    def _window(self) -> tuple[float, float]:
+        """Return (error rate, 90th percentile latency) of the sampled calls."""
+        if not self._samples:
+            return 0.0, 0.0
+        failures = sum(1 for ok, _ in self._samples if not ok)
+        latencies = sorted(latency for _, latency in self._samples)
+        p90 = latencies[max(math.ceil(len(latencies) * 0.9) - 1, 0)]
+        return failures / len(self._samples), p90
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def stats(self) -> dict[str, Any]:
+        """Return the breaker state, window statistics and trip counters."""
+        with self._lock:
+            error_rate, p90 = self._window()
+            return {
+                "state": self._state,
+                "calls": len(self._samples),
+                "error_rate": round(error_rate, 3),
+                "p90_ms": round(p90 * 1000),
+                **self._stats,
+            }
+
+    def reset(self) -> None:
+        """Close the breaker and forget all samples (used by tests)."""
+        with self._lock:
+            self._state = BREAKER_CLOSED
+            self._probing = False
+            self._samples.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+_breakers = {name: CircuitBreaker(name) for name in UPSTREAM_BASE_URLS}
+_lock = threading.Lock()
+_sessions: dict[str, requests.Session] = {}
+_sessions_pid = 0
+_counters: dict[str, dict[str, int]] = {}
+
+
+def upstream_timeout(upstream: str) -> float:
+    """Return the configured request timeout for an upstream, e.g. SHOVO_UPSTREAM_TIMEOUT_OMDB."""
+    return env_float(f"SHOVO_UPSTREAM_TIMEOUT_{upstream.upper()}", DEFAULT_TIMEOUT_SECONDS, minimum=0.1)
+
+
+def _new_session(upstream: str) -> requests.Session:
+    """Build a session with a dedicated connection pool for one upstream host."""
+    session = requests.Session()
+    # Upstream cookies must never leak between users sharing a pooled session.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    pool_size = env_int(f"SHOVO_UPSTREAM_POOL_SIZE_{upstream.upper()}", POOL_SIZE, minimum=1)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(upstream: str) -> requests.Session:
+    """Return the pooled session for an upstream, recreating pools after a fork."""
+    global _sessions_pid
+    with _lock:
+        pid = os.getpid()
+        if _sessions_pid != pid:
+            # Sockets inherited from the uWSGI master must not be shared by workers.
+            _sessions.clear()
+            _sessions_pid = pid
+        session = _sessions.get(upstream)
+        if session is None:
+            session = _new_session(upstream)
+            _sessions[upstream] = session
+        return session
+
+
+def _count(upstream: str, key: str) -> None:
+    with _lock:
+        counters = _counters.setdefault(upstream, {"requests": 0, "errors": 0, "deadline_exceeded": 0})
+        counters[key] = counters.get(key, 0) + 1
+
+
+def http_get(
+    upstream: str,
+    url: str,
+    timeout: float | None = None,
+    deadline: Deadline | None = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """Issue a GET request through the pooled session of an upstream.
+
+    With a deadline, the timeout is cut to the remaining request budget and
+    DeadlineExceeded is raised without contacting the upstream once it is spent.
+    CircuitOpen is raised while the upstream's circuit breaker refuses calls, and
+    QuotaExhausted when its shared call budget has no token left in time.
+    """
+    configured_timeout = timeout if timeout is not None else upstream_timeout(upstream)
+    timeout = configured_timeout
+    if deadline is not None:
+        try:
+            timeout = deadline.cap(timeout)
+        except DeadlineExceeded:
+            _count(upstream, "deadline_exceeded")
+            raise
+    breaker = _breakers.get(upstream) if BREAKER_ENABLED else None
+    if breaker is not None and not breaker.allow():
+        if deadline is not None:
+            deadline.degraded = True
+        raise CircuitOpen(f"{upstream} circuit breaker is open")
+    if deadline is not None:
+        allowed = acquire(upstream, PRIORITY_INTERACTIVE, min(INTERACTIVE_MAX_WAIT_SECONDS, deadline.remaining()))
+    else:
+        allowed = acquire(upstream, PRIORITY_BACKGROUND, BACKGROUND_MAX_WAIT_SECONDS)
+    if not allowed:
+        if breaker is not None:
+            breaker.release()
+        if deadline is not None:
+            deadline.degraded = True
+        _count(upstream, "throttled")
+        raise QuotaExhausted(f"{upstream} call budget exhausted")
+    session = get_session(upstream)
+    _count(upstream, "requests")
+    started = time.monotonic()
+    try:
+        response = session.get(url, timeout=timeout, **kwargs)
+    except requests.RequestException as exc:
+        _count(upstream, "errors")
+        if breaker is not None:
+            # A timeout cut short by the request budget says the upstream is slow, not broken.
+            budget_timeout = isinstance(exc, requests.Timeout) and timeout < configured_timeout
+            breaker.record(budget_timeout, time.monotonic() - started)
+        raise
+    if breaker is not None:
+        breaker.record(response.status_code < 500 and response.status_code != 429, time.monotonic() - started)
+    return response
+
+
+def _pool_usage(session: requests.Session) -> tuple[int, int]:
+    """Return (connections opened, requests served) across a session's pools."""
+    opened = served = 0
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += getattr(pool, "num_connections", 0)
+            served += getattr(pool, "num_requests", 0)
+    return opened, served
+
+
+def upstream_stats() -> dict[str, dict[str, int]]:
+    """Return request, error, budget and connection reuse counters per upstream."""
+    with _lock:
+        snapshot = {name: dict(counters) for name, counters in _counters.items()}
+        sessions = dict(_sessions)
+    for name in UPSTREAM_BASE_URLS:
+        entry = snapshot.setdefault(name, {"requests": 0, "errors": 0, "deadline_exceeded": 0})
+        session = sessions.get(name)
+        opened, served = _pool_usage(session) if session is not None else (0, 0)
+        entry["connections_opened"] = opened
+        entry["connections_reused"] = max(served - opened, 0)
+    return snapshot
+
+
+def reset_upstream_stats() -> None:
+    """Clear upstream counters (used by tests)."""
+    with _lock:
+        _counters.clear()
+
+
+def breaker_stats() -> dict[str, dict[str, Any]]:
+    """Return circuit breaker state per upstream."""
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
+
+
+def reset_breakers() -> None:
+    """Close every circuit breaker (used by tests)."""
+    for breaker in _breakers.values():
+        breaker.reset()
+
+
+def prewarm_upstreams() -> None:
+    """Open one keep-alive connection to every upstream host."""
+    for upstream, base_url in UPSTREAM_BASE_URLS.items():
+        try:
+            get_session(upstream).head(base_url, timeout=PREWARM_TIMEOUT_SECONDS, allow_redirects=False)
+        except requests.RequestException:
+            continue
+
+
+def _start_prewarm_thread() -> None:
+    thread = threading.Thread(target=prewarm_upstreams, daemon=True)
+    thread.start()
+
+
+def schedule_prewarm() -> None:
+    """Pre-warm upstream connections in each serving process (disable with SHOVO_UPSTREAM_PREWARM=0)."""
+    if not env_flag("SHOVO_UPSTREAM_PREWARM", True):
+        return
+    try:
+        import uwsgi
+        from uwsgidecorators import postfork
+    except ImportError:
+        _start_prewarm_thread()
+        return
+    if uwsgi.worker_id() > 0:
+        # lazy-apps: the app is loaded inside the worker itself.
+        _start_prewarm_thread()
+    else:
+        postfork(_start_prewarm_thread)
@@ -3,6 +3,9 @@ from __future__ import annotations
 import hashlib
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 from flask import request
@@ -14,6 +17,7 @@ except ImportError:
     from models import SearchResult
 
 DEFAULT_USER_AGENT = "shovo-movielist/1.0 (+https://example.com)"
+TRUTHY_VALUES = {"1", "true", "yes", "on"}
 
 
 def request_user_agent() -> str:
@@ -36,6 +40,7 @@ def serialize_result(result: SearchResult) -> dict[str, Any]:
         "total_seasons": result.total_seasons,
         "total_episodes": result.total_episodes,
         "avg_episode_length": result.avg_episode_length,
+        "details_complete": result.details_complete,
     }
 
 
@@ -71,3 +76,73 @@ def parse_watched(value: Any) -> int:
     if isinstance(value, str):
         return 1 if value.lower() in {"1", "true", "yes", "watched"} else 0
     return 0
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in TRUTHY_VALUES
+
+
+def env_int(name: str, default: int, minimum: int | None = None) -> int:
+    """Read an integer setting from the environment, falling back to a default."""
+    try:
+        value = int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    if minimum is not None:
+        value = max(value, minimum)
+    return value
+
+
+def env_float(name: str, default: float, minimum: float | None = None) -> float:
+    """Read a float setting from the environment, falling back to a default."""
+    try:
+        value = float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    if minimum is not None:
+        value = max(value, minimum)
+    return value
+
+
+class LRUCache:
+    """Small thread-safe in-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        """Return a cached value, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if stored_at + self.ttl_seconds < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, stored_at: float | None = None) -> None:
+        """Store a value, evicting the least recently used entries beyond capacity."""
+        with self._lock:
+            self._entries[key] = (time.time() if stored_at is None else stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
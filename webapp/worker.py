@@ -0,0 +1,37 @@
+"""Refresh worker entry point: runs queued room refreshes outside uWSGI.
+
+Start it next to uWSGI (`python worker.py` from this directory) and set
+SHOVO_REFRESH_IN_PROCESS=0 for the web processes so only workers fetch.
+"""
+from __future__ import annotations
+
+import signal
+import sys
+import threading
+
+# Support both package and standalone imports
+try:
+    from webapp.database import init_db
+    from webapp.refresh import run_refresh_worker
+    from webapp.utils import env_flag
+except ImportError:
+    from database import init_db
+    from refresh import run_refresh_worker
+    from utils import env_flag
+
+
+def main() -> int:
+    """Run refresh jobs until SIGTERM or SIGINT; jobs left unfinished resume elsewhere."""
+    pending = init_db(migrate=env_flag("SHOVO_MIGRATE_ON_STARTUP", True))
+    if pending:
+        print(f"Database schema is {pending} migration(s) behind; run `flask shovo migrate`.", file=sys.stderr)
+        return 1
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    run_refresh_worker(stop)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Bounded thread helpers for concurrent and background upstream work."""
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import as_completed
+from typing import Any, Callable, Hashable, Iterable, TypeVar
+
+import requests
+
+T = TypeVar("T", bound=Hashable)
+R = TypeVar("R")
+
+
+def bounded_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int,
+    timeout: float | None = None,
+    until: Callable[[dict[T, R]], bool] | None = None,
+) -> dict[T, R]:
+    """Run func over unique items on at most max_workers threads.
+
+    Returns the results that completed before the overall timeout, keyed by item.
+    Items whose call raised requests.RequestException are left out. Remaining work
+    is abandoned as soon as until(results) is true or the timeout expires.
+    """
+    unique = list(dict.fromkeys(items))
+    results: dict[T, R] = {}
+    if not unique:
+        return results
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique))), thread_name_prefix="shovo-fanout")
+    futures = {executor.submit(func, item): item for item in unique}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            try:
+                results[futures[future]] = future.result()
+            except requests.RequestException:
+                continue
+            if until is not None and until(results):
+                break
+    except FuturesTimeoutError:
+        pass
+    finally:
+        # Never block the caller on stragglers; they finish within their own HTTP timeout.
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+class BackgroundPool:
+    """Bounded background executor that de-duplicates pending work by key.
+
+    The executor is created lazily and rebuilt after a fork, so pools created in the
+    uWSGI master never leak dead threads into workers.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid = 0
+        self._pending: set[Hashable] = set()
+        self._stats = {"submitted": 0, "deduplicated": 0, "rejected": 0, "failed": 0}
+
+    def submit(self, key: Hashable, func: Callable[..., Any], *args: Any) -> bool:
+        """Queue func(*args) unless the same key is pending or the queue is full."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = None
+                self._pending.clear()
+                self._pid = os.getpid()
+            if key in self._pending:
+                self._stats["deduplicated"] += 1
+                return False
+            if len(self._pending) >= self.max_pending:
+                self._stats["rejected"] += 1
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._pending.add(key)
+            self._stats["submitted"] += 1
+            executor = self._executor
+        executor.submit(self._run, key, func, args)
+        return True
+
+    def _run(self, key: Hashable, func: Callable[..., Any], args: tuple[Any, ...]) -> None:
+        try:
+            func(*args)
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def stats(self) -> dict[str, int]:
+        """Return queue counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        return stats
+
+    def reset_stats(self) -> None:
+        """Clear queue counters (used by tests)."""
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0